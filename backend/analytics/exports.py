@@ -0,0 +1,205 @@
+"""
+Data exports for landlords and admins (streamed CSV and background XLSX).
+Each dataset is a values() projection so rows are fetched as plain tuples
+in server-side chunks and never materialized as model instances.
+
+XLSX files are kept outside MEDIA_ROOT under a random name in a per-user
+directory, served only to their owner and deleted after EXPORT_RETENTION_HOURS.
+"""
+import csv
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+from tempfile import NamedTemporaryFile
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from .utils import datetime_range
+
+
+def _bookings_queryset(user, start_date=None, end_date=None):
+    """Bookings on the user's properties (all bookings for admins), by creation date."""
+    from bookings.models import Booking
+
+    queryset = Booking.objects.all()
+    if not user.is_admin():
+        queryset = queryset.filter(property__landlord=user)
+    if start_date and end_date:
+        start, end = datetime_range(start_date, end_date)
+        queryset = queryset.filter(created_at__gte=start, created_at__lt=end)
+    return queryset.order_by('-created_at')
+
+
+def _expenses_queryset(user, start_date=None, end_date=None):
+    """Expenses (including recurring occurrences) on the user's properties."""
+    from properties.models import PropertyExpense
+
+    queryset = PropertyExpense.objects.all()
+    if not user.is_admin():
+        queryset = queryset.filter(property__landlord=user)
+    if start_date and end_date:
+        queryset = queryset.filter(expense_date__gte=start_date, expense_date__lte=end_date)
+    return queryset.order_by('-expense_date')
+
+
+def _revenue_queryset(user, start_date=None, end_date=None):
+    """Monthly confirmed booking revenue per property, bucketed by confirmed_at."""
+    from bookings.models import Booking
+
+    queryset = Booking.objects.filter(
+        status__in=['confirmed', 'completed'],
+        confirmed_at__isnull=False
+    )
+    if not user.is_admin():
+        queryset = queryset.filter(property__landlord=user)
+    if start_date and end_date:
+        start, end = datetime_range(start_date, end_date)
+        queryset = queryset.filter(confirmed_at__gte=start, confirmed_at__lt=end)
+    return queryset.annotate(
+        month=TruncMonth('confirmed_at')
+    ).values('month', 'property_id', 'property__title').annotate(
+        bookings=Count('id'),
+        revenue=Sum('total_price')
+    ).order_by('month', 'property__title')
+
+
+# dataset name -> (queryset builder, [(column header, values() field), ...])
+EXPORT_DATASETS = {
+    'bookings': (_bookings_queryset, [
+        ('Booking ID', 'id'),
+        ('Property', 'property__title'),
+        ('City', 'property__city'),
+        ('Tenant Email', 'tenant__email'),
+        ('Check In', 'check_in'),
+        ('Check Out', 'check_out'),
+        ('Guests', 'guests_count'),
+        ('Total Price', 'total_price'),
+        ('Status', 'status'),
+        ('Created At', 'created_at'),
+        ('Confirmed At', 'confirmed_at'),
+        ('Cancelled At', 'cancelled_at'),
+        ('Completed At', 'completed_at'),
+    ]),
+    'expenses': (_expenses_queryset, [
+        ('Expense ID', 'id'),
+        ('Property', 'property__title'),
+        ('Category', 'category'),
+        ('Description', 'description'),
+        ('Amount', 'amount'),
+        ('Expense Date', 'expense_date'),
+        ('Recurring', 'is_recurring'),
+        ('Frequency', 'recurrence_frequency'),
+        ('Recurrence Of', 'recurrence_parent_id'),
+    ]),
+    'revenue': (_revenue_queryset, [
+        ('Month', 'month'),
+        ('Property ID', 'property_id'),
+        ('Property', 'property__title'),
+        ('Bookings', 'bookings'),
+        ('Revenue', 'revenue'),
+    ]),
+}
+
+
+def get_export_rows(dataset, user, start_date=None, end_date=None):
+    """
+    Return (headers, row iterator) for an export dataset.
+    Rows are tuples in header order, fetched with .iterator(chunk_size).
+    """
+    build_queryset, columns = EXPORT_DATASETS[dataset]
+    headers = [header for header, _ in columns]
+    fields = [field for _, field in columns]
+    queryset = build_queryset(user, start_date, end_date).values_list(*fields)
+    return headers, queryset.iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+
+
+class _Echo:
+    """File-like object whose write() returns the value, for streaming csv.writer output."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(headers, rows):
+    """Yield CSV-encoded lines, header first."""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(headers)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def _xlsx_value(value):
+    """Convert a value into a type openpyxl can write."""
+    if isinstance(value, datetime):
+        # Excel cells have no timezone
+        return timezone.localtime(value).replace(tzinfo=None) if timezone.is_aware(value) else value
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def get_export_storage():
+    """Storage for XLSX exports; kept outside MEDIA_ROOT so files are not publicly served."""
+    return FileSystemStorage(location=settings.EXPORT_ROOT)
+
+
+def get_export_file_name(user_id, file_id):
+    """Storage path of an export; the user's directory scopes downloads to its owner."""
+    return f'{user_id}/{file_id}.xlsx'
+
+
+def get_export_expiry(storage, file_name):
+    """Return when an export stops being downloadable."""
+    return storage.get_modified_time(file_name) + timedelta(hours=settings.EXPORT_RETENTION_HOURS)
+
+
+def write_xlsx_export(dataset, user, start_date=None, end_date=None):
+    """
+    Write an export dataset to an XLSX file in export storage.
+    Uses openpyxl's write-only mode so rows are streamed to the workbook.
+    Returns (file_id, row_count); the file ID ends in a random token.
+    """
+    from openpyxl import Workbook
+
+    headers, rows = get_export_rows(dataset, user, start_date, end_date)
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=dataset.capitalize())
+    sheet.append(headers)
+    row_count = 0
+    for row in rows:
+        sheet.append([_xlsx_value(value) for value in row])
+        row_count += 1
+
+    file_id = f'{dataset}_{timezone.now().strftime("%Y%m%d%H%M%S")}_{uuid.uuid4().hex}'
+    with NamedTemporaryFile(suffix='.xlsx') as tmp:
+        workbook.save(tmp.name)
+        get_export_storage().save(get_export_file_name(user.id, file_id), File(tmp))
+
+    return file_id, row_count
+
+
+def delete_expired_exports():
+    """Delete XLSX exports older than EXPORT_RETENTION_HOURS. Returns the number deleted."""
+    storage = get_export_storage()
+    if not storage.exists(''):
+        return 0
+
+    now = timezone.now()
+    deleted = 0
+    user_dirs, _ = storage.listdir('')
+    for user_dir in user_dirs:
+        _, file_names = storage.listdir(user_dir)
+        for file_name in file_names:
+            path = f'{user_dir}/{file_name}'
+            if get_export_expiry(storage, path) <= now:
+                storage.delete(path)
+                deleted += 1
+    return deleted
@@ -0,0 +1,280 @@
+"""
+Columnar analytics extracts for BI tools.
+
+Each dataset is written incrementally: only rows whose updated_at is past the
+dataset's watermark are read, and they are appended as a new part file in a
+Hive-style month partition, e.g. bookings/month=2026-10/part-20261019T010000.parquet.
+A row that changes after it was extracted appears again in a later part file,
+so readers should keep the latest version of each id (highest updated_at).
+
+updated_at is set when a row is saved, not when its transaction commits, so a
+row can become visible after a run has moved the watermark past it. Each run
+therefore re-reads ANALYTICS_EXTRACT_OVERLAP_MINUTES before the watermark, and
+the same (id, updated_at) can appear in two part files; readers dedupe on that
+pair. QuerySet.update() calls that do not set updated_at themselves (data
+backfills, for instance) are never extracted incrementally; run a full extract
+after them.
+
+Parquet is written with pyarrow when it is installed; otherwise CSV is used.
+"""
+import csv
+import json
+import os
+import uuid
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.utils import timezone
+
+
+# dataset -> (model label, partition date field, exported fields)
+EXTRACT_DATASETS = {
+    'bookings': ('bookings.Booking', 'created_at', [
+        'id', 'property_id', 'tenant_id', 'check_in', 'check_out', 'guests_count',
+        'total_price', 'status', 'created_at', 'updated_at',
+        'confirmed_at', 'cancelled_at', 'completed_at',
+    ]),
+    'expenses': ('properties.PropertyExpense', 'expense_date', [
+        'id', 'property_id', 'category', 'amount', 'expense_date', 'is_recurring',
+        'recurrence_frequency', 'recurrence_parent_id', 'created_at', 'updated_at',
+    ]),
+    'maintenance': ('maintenance.MaintenanceRequest', 'reported_at', [
+        'id', 'rental_property_id', 'reported_by_id', 'priority', 'status', 'category',
+        'booking_type', 'service_catalog_id', 'assigned_to_id', 'cost', 'service_price',
+        'effective_cost', 'reported_at', 'assigned_at', 'admin_confirmed_at',
+        'resolved_at', 'updated_at',
+    ]),
+    'properties': ('properties.Property', 'created_at', [
+        'id', 'landlord_id', 'property_type', 'city', 'state', 'country',
+        'bedrooms', 'bathrooms', 'max_guests', 'price_per_night', 'approval_type',
+        'status', 'created_at', 'approved_at', 'updated_at',
+    ]),
+}
+
+MANIFEST_NAME = 'manifest.json'
+
+
+def get_extract_storage():
+    """Storage for extracts; kept outside MEDIA_ROOT so files are not publicly served."""
+    return FileSystemStorage(location=settings.ANALYTICS_EXTRACT_ROOT)
+
+
+def get_extract_format(requested=None):
+    """Return 'parquet' if requested (or configured) and pyarrow is importable, else 'csv'."""
+    extract_format = requested or settings.ANALYTICS_EXTRACT_FORMAT
+    if extract_format == 'parquet':
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            return 'csv'
+    return extract_format
+
+
+def load_manifest(storage=None):
+    """Return the extract manifest (watermarks and last run details per dataset)."""
+    storage = storage or get_extract_storage()
+    if not storage.exists(MANIFEST_NAME):
+        return {'datasets': {}}
+    with storage.open(MANIFEST_NAME, 'rb') as manifest_file:
+        return json.load(manifest_file)
+
+
+def _save_manifest(storage, manifest):
+    """Atomically replace the manifest file."""
+    path = storage.path(MANIFEST_NAME)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(f'{path}.tmp', 'w') as manifest_file:
+        json.dump(manifest, manifest_file, indent=2)
+    os.replace(f'{path}.tmp', path)
+
+
+def _field_for_path(model, name):
+    """Return the model field behind a values() name (FK attnames resolve to the FK)."""
+    for field in model._meta.concrete_fields:
+        if name in (field.name, field.attname):
+            return field
+    raise ValueError(f'{model.__name__} has no field {name}')
+
+
+def _arrow_type(field):
+    """Map a Django field to a pyarrow type."""
+    import pyarrow as pa
+
+    internal_type = field.get_internal_type()
+    if field.is_relation or internal_type in ('UUIDField', 'CharField', 'TextField', 'EmailField', 'URLField', 'JSONField'):
+        return pa.string()
+    if internal_type == 'DateTimeField':
+        return pa.timestamp('us', tz='UTC')
+    if internal_type == 'DateField':
+        return pa.date32()
+    if internal_type == 'TimeField':
+        return pa.time64('us')
+    if internal_type == 'DecimalField':
+        return pa.decimal128(field.max_digits, field.decimal_places)
+    if internal_type == 'BooleanField':
+        return pa.bool_()
+    if internal_type in ('IntegerField', 'PositiveIntegerField', 'BigIntegerField', 'SmallIntegerField', 'BigAutoField', 'AutoField'):
+        return pa.int64()
+    return pa.string()
+
+
+def _csv_value(value):
+    """Format a value for the CSV fallback (ISO dates, UTC timestamps)."""
+    if isinstance(value, datetime):
+        return value.astimezone(dt_timezone.utc).isoformat() if timezone.is_aware(value) else value.isoformat()
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    return value
+
+
+def _arrow_value(value):
+    """Convert values pyarrow cannot take directly."""
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value
+
+
+class _PartitionWriter:
+    """Writes one partition file; Parquet rows are buffered into row groups."""
+
+    def __init__(self, storage, path, fields, extract_format, schema=None):
+        self.path = path
+        self.extract_format = extract_format
+        self.schema = schema
+        full_path = storage.path(path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+
+        if extract_format == 'parquet':
+            import pyarrow.parquet as pq
+            self.batch = []
+            self.writer = pq.ParquetWriter(full_path, schema, compression='snappy')
+        else:
+            self.file = open(full_path, 'w', newline='')
+            self.writer = csv.writer(self.file)
+            self.writer.writerow(fields)
+
+    def write(self, row):
+        if self.extract_format == 'parquet':
+            self.batch.append(row)
+            if len(self.batch) >= settings.ANALYTICS_EXTRACT_BATCH_SIZE:
+                self._flush()
+        else:
+            self.writer.writerow([_csv_value(value) for value in row])
+
+    def _flush(self):
+        import pyarrow as pa
+
+        if not self.batch:
+            return
+        arrays = [
+            pa.array([_arrow_value(value) for value in column], type=self.schema.field(index).type)
+            for index, column in enumerate(zip(*self.batch))
+        ]
+        self.writer.write_table(pa.Table.from_arrays(arrays, schema=self.schema))
+        self.batch = []
+
+    def close(self):
+        if self.extract_format == 'parquet':
+            self._flush()
+            self.writer.close()
+        else:
+            self.file.close()
+
+
+def _partition_month(value):
+    """Return the YYYY-MM partition key of a date or (UTC) datetime."""
+    if isinstance(value, datetime) and timezone.is_aware(value):
+        value = value.astimezone(dt_timezone.utc)
+    return value.strftime('%Y-%m')
+
+
+def write_extract(dataset, extract_format=None, full=False, storage=None, manifest=None):
+    """
+    Write the rows of one dataset changed since its watermark to month partitions.
+    With full=True the watermark is ignored and every row is exported again.
+    Updates the dataset's entry in `manifest`; the caller saves it.
+    Returns the run summary.
+    """
+    model_label, partition_field, fields = EXTRACT_DATASETS[dataset]
+    model = apps.get_model(model_label)
+    extract_format = get_extract_format(extract_format)
+    storage = storage or get_extract_storage()
+    manifest = manifest if manifest is not None else load_manifest(storage)
+    state = manifest['datasets'].get(dataset, {})
+
+    # Fix the upper bound up front; rows saved during the run are picked up next time
+    run_started = timezone.now()
+    queryset = model.objects.filter(updated_at__lte=run_started)
+    watermark = None if full else state.get('watermark')
+    if watermark:
+        # Overlap the previous run to catch rows committed after it with an earlier updated_at
+        overlap = timedelta(minutes=settings.ANALYTICS_EXTRACT_OVERLAP_MINUTES)
+        queryset = queryset.filter(updated_at__gt=datetime.fromisoformat(watermark) - overlap)
+
+    schema = None
+    if extract_format == 'parquet':
+        import pyarrow as pa
+        schema = pa.schema([(name, _arrow_type(_field_for_path(model, name))) for name in fields])
+
+    partition_index = fields.index(partition_field)
+    updated_index = fields.index('updated_at')
+    run_id = run_started.strftime('%Y%m%dT%H%M%S')
+
+    files = []
+    row_count = 0
+    writer = None
+    writer_month = None
+    new_watermark = datetime.fromisoformat(watermark) if watermark else None
+    rows = queryset.order_by(partition_field).values_list(*fields).iterator(
+        chunk_size=settings.ANALYTICS_EXTRACT_BATCH_SIZE
+    )
+    try:
+        for row in rows:
+            month = _partition_month(row[partition_index])
+            # Rows arrive ordered by the partition field, so each month gets one file per run
+            if month != writer_month:
+                if writer is not None:
+                    writer.close()
+                writer_month = month
+                writer = _PartitionWriter(
+                    storage,
+                    f'{dataset}/month={month}/part-{run_id}.{extract_format}',
+                    fields,
+                    extract_format,
+                    schema
+                )
+                files.append(writer.path)
+            writer.write(row)
+            row_count += 1
+            if new_watermark is None or row[updated_index] > new_watermark:
+                new_watermark = row[updated_index]
+    finally:
+        if writer is not None:
+            writer.close()
+
+    if new_watermark is not None:
+        state['watermark'] = new_watermark.isoformat()
+    state['last_run_at'] = run_started.isoformat()
+    state['last_run'] = {'format': extract_format, 'full': full, 'rows': row_count, 'files': files}
+    manifest['datasets'][dataset] = state
+
+    return {'dataset': dataset, **state['last_run'], 'watermark': state.get('watermark')}
+
+
+def write_extracts(datasets=None, extract_format=None, full=False):
+    """
+    Run incremental extracts for the given datasets (all by default) and save the manifest.
+    Returns a list of per-dataset summaries.
+    """
+    storage = get_extract_storage()
+    manifest = load_manifest(storage)
+    summaries = []
+    for dataset in datasets or EXTRACT_DATASETS:
+        summaries.append(write_extract(dataset, extract_format, full, storage, manifest))
+        # Save after each dataset so a failure later on does not re-extract finished ones
+        _save_manifest(storage, manifest)
+    return summaries
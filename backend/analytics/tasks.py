@@ -0,0 +1,54 @@
+"""
+Celery tasks for Analytics app.
+"""
+from datetime import date
+
+from celery import shared_task
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from .exports import (
+    delete_expired_exports,
+    get_export_expiry,
+    get_export_file_name,
+    get_export_storage,
+    write_xlsx_export,
+)
+from .extracts import write_extracts
+
+
+@shared_task
+def export_xlsx(user_id, dataset, start_date=None, end_date=None):
+    """
+    Generate an XLSX export into export storage.
+    Dates are ISO strings so the task arguments stay JSON-serializable.
+    Returns the owner, the (authenticated) download URL, its expiry and the row count.
+    """
+    user = get_user_model().objects.get(id=user_id)
+    file_id, row_count = write_xlsx_export(
+        dataset,
+        user,
+        date.fromisoformat(start_date) if start_date else None,
+        date.fromisoformat(end_date) if end_date else None
+    )
+    expires_at = get_export_expiry(get_export_storage(), get_export_file_name(user.id, file_id))
+
+    return {
+        'user_id': str(user_id),
+        'dataset': dataset,
+        'rows': row_count,
+        'file_url': reverse('export_download', args=[file_id]),
+        'expires_at': expires_at.isoformat(),
+    }
+
+
+@shared_task
+def delete_expired_export_files():
+    """Delete XLSX exports past their retention period."""
+    return delete_expired_exports()
+
+
+@shared_task
+def write_analytics_extracts(datasets=None, extract_format=None, full=False):
+    """Write incremental Parquet/CSV extracts for BI tools (see analytics.extracts)."""
+    return write_extracts(datasets, extract_format, full)
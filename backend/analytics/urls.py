@@ -2,9 +2,20 @@
 URL configuration for Analytics app.
 """
 from django.urls import path
-from .views import LandlordDashboardView, AdminDashboardView
+from .views import (
+    LandlordDashboardView,
+    AdminDashboardView,
+    CSVExportView,
+    XLSXExportView,
+    ExportStatusView,
+    ExportDownloadView
+)
 
 urlpatterns = [
     path('landlord/dashboard/', LandlordDashboardView.as_view(), name='landlord_dashboard'),
     path('admin/dashboard/', AdminDashboardView.as_view(), name='admin_dashboard'),
+    path('exports/<str:dataset>/csv/', CSVExportView.as_view(), name='export_csv'),
+    path('exports/<str:dataset>/xlsx/', XLSXExportView.as_view(), name='export_xlsx'),
+    path('exports/status/<str:task_id>/', ExportStatusView.as_view(), name='export_status'),
+    path('exports/files/<slug:file_id>/', ExportDownloadView.as_view(), name='export_download'),
 ]
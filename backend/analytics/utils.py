@@ -3,9 +3,46 @@ Utility functions for analytics and KPI calculations.
 """
 from django.db.models import Sum, Count, Avg, Q, F
 from django.utils import timezone
-from datetime import timedelta
+from datetime import datetime, time, timedelta
 from decimal import Decimal
 
+from propertree.tracing import traced
+
+
+def datetime_range(start_date, end_date):
+    """
+    Convert an inclusive date range into a half-open [start, end) pair of aware datetimes.
+    Filtering timestamps with __gte/__lt on these bounds can use a plain index,
+    unlike __date lookups which cast the column.
+    """
+    start = timezone.make_aware(datetime.combine(start_date, time.min))
+    end = timezone.make_aware(datetime.combine(end_date + timedelta(days=1), time.min))
+    return start, end
+
+
+def costed_maintenance(queryset, start_date=None, end_date=None):
+    """
+    Restrict maintenance requests to those that carry a cost:
+    resolved requests with an actual cost, or admin-confirmed service bookings.
+    When a date range is given, a request is dated by resolved_at, falling back
+    to admin_confirmed_at and then reported_at.
+    Totals should be taken with Sum('effective_cost').
+    """
+    queryset = queryset.filter(
+        Q(status='resolved', cost__isnull=False) |
+        (Q(admin_confirmed_at__isnull=False) & ~Q(status='cancelled'))
+    )
+
+    if start_date and end_date:
+        start, end = datetime_range(start_date, end_date)
+        queryset = queryset.filter(
+            Q(resolved_at__gte=start, resolved_at__lt=end) |
+            Q(resolved_at__isnull=True, admin_confirmed_at__gte=start, admin_confirmed_at__lt=end) |
+            Q(resolved_at__isnull=True, admin_confirmed_at__isnull=True, reported_at__gte=start, reported_at__lt=end)
+        )
+
+    return queryset
+
 
 class LandlordAnalytics:
     """Analytics for landlord dashboard."""
@@ -13,6 +50,7 @@ class LandlordAnalytics:
     def __init__(self, landlord):
         self.landlord = landlord
 
+    @traced()
     def get_occupancy_rate(self, start_date=None, end_date=None):
         """
         Calculate occupancy rate: (Rented Units ÷ Total Units) × 100%
@@ -51,6 +89,7 @@ class LandlordAnalytics:
         occupancy_rate = (booked_days / (total_units * total_days)) * 100 if total_units > 0 else 0
         return round(occupancy_rate, 2)
 
+    @traced()
     def get_rental_income(self, start_date=None, end_date=None):
         """
         Calculate total rental income for a period.
@@ -70,6 +109,7 @@ class LandlordAnalytics:
         total_income = bookings.aggregate(total=Sum('total_price'))['total'] or Decimal('0.00')
         return float(total_income)
 
+    @traced()
     def get_pending_bookings(self):
         """
         Get count and total value of pending bookings.
@@ -89,6 +129,7 @@ class LandlordAnalytics:
             'pending_value': float(total_value)
         }
 
+    @traced()
     def get_maintenance_costs(self, start_date=None, end_date=None):
         """
         Calculate total maintenance costs for a period.
@@ -99,45 +140,17 @@ class LandlordAnalytics:
         """
         from maintenance.models import MaintenanceRequest
 
-        # Get resolved maintenance with costs
-        resolved_maintenance = MaintenanceRequest.objects.filter(
-            rental_property__landlord=self.landlord,
-            status='resolved',
-            cost__isnull=False
+        # Resolved maintenance with costs OR admin-confirmed service bookings
+        maintenance = costed_maintenance(
+            MaintenanceRequest.objects.filter(rental_property__landlord=self.landlord),
+            start_date,
+            end_date
         )
 
-        # Get confirmed service bookings (admin confirmed)
-        confirmed_bookings = MaintenanceRequest.objects.filter(
-            rental_property__landlord=self.landlord,
-            admin_confirmed_at__isnull=False
-        ).exclude(status='cancelled')
-
-        # Combine both querysets
-        maintenance = MaintenanceRequest.objects.filter(
-            Q(id__in=resolved_maintenance.values_list('id', flat=True)) |
-            Q(id__in=confirmed_bookings.values_list('id', flat=True))
-        ).distinct()
-
-        if start_date and end_date:
-            # Use resolved_at if available, otherwise use admin_confirmed_at, otherwise use reported_at
-            maintenance = maintenance.filter(
-                Q(resolved_at__isnull=False, resolved_at__date__gte=start_date, resolved_at__date__lte=end_date) |
-                Q(resolved_at__isnull=True, admin_confirmed_at__isnull=False, admin_confirmed_at__date__gte=start_date, admin_confirmed_at__date__lte=end_date) |
-                Q(resolved_at__isnull=True, admin_confirmed_at__isnull=True, reported_at__date__gte=start_date, reported_at__date__lte=end_date)
-            )
-
-        # Calculate total cost: use actual cost if available, otherwise use service catalog price
-        total_cost = Decimal('0.00')
-        count = 0
-        
-        for req in maintenance:
-            count += 1
-            if req.cost is not None:
-                # Use actual cost if available
-                total_cost += req.cost
-            elif req.service_catalog and req.service_catalog.price:
-                # Use price from service catalog
-                total_cost += req.service_catalog.price
+        # effective_cost is the actual cost if available, otherwise the catalog price at booking time
+        totals = maintenance.aggregate(total=Sum('effective_cost'), count=Count('id'))
+        total_cost = totals['total'] or Decimal('0.00')
+        count = totals['count']
 
         return {
             'total_cost': float(total_cost),
@@ -145,6 +158,7 @@ class LandlordAnalytics:
             'average_cost': float(total_cost / count) if count > 0 else 0
         }
 
+    @traced()
     def get_property_expenses(self, start_date=None, end_date=None):
         """
         Calculate total property operating expenses for a period.
@@ -161,51 +175,28 @@ class LandlordAnalytics:
 
         if start_date and end_date:
             expenses = expenses.filter(expense_date__range=[start_date, end_date])
+        else:
+            # Recurring expenses are materialized ahead of time; leave out costs not yet incurred
+            expenses = expenses.filter(expense_date__lte=timezone.now().date())
 
         # Group property expenses by category
         expense_by_category = expenses.values('category').annotate(
             total=Sum('amount')
         ).order_by('-total')
 
-        # Get maintenance costs by category (resolved with costs OR confirmed bookings)
+        # Get maintenance costs (resolved with costs OR confirmed bookings)
         # This is only for the category breakdown display, not for the total
-        resolved_maintenance = MaintenanceRequest.objects.filter(
-            rental_property__landlord=self.landlord,
-            status='resolved',
-            cost__isnull=False
+        maintenance = costed_maintenance(
+            MaintenanceRequest.objects.filter(rental_property__landlord=self.landlord),
+            start_date,
+            end_date
         )
+        maintenance_totals = maintenance.aggregate(total=Sum('effective_cost'), count=Count('id'))
 
-        confirmed_bookings = MaintenanceRequest.objects.filter(
-            rental_property__landlord=self.landlord,
-            admin_confirmed_at__isnull=False
-        ).exclude(status='cancelled')
-
-        maintenance = MaintenanceRequest.objects.filter(
-            Q(id__in=resolved_maintenance.values_list('id', flat=True)) |
-            Q(id__in=confirmed_bookings.values_list('id', flat=True))
-        ).distinct()
-
-        if start_date and end_date:
-            maintenance = maintenance.filter(
-                Q(resolved_at__isnull=False, resolved_at__date__gte=start_date, resolved_at__date__lte=end_date) |
-                Q(resolved_at__isnull=True, admin_confirmed_at__isnull=False, admin_confirmed_at__date__gte=start_date, admin_confirmed_at__date__lte=end_date) |
-                Q(resolved_at__isnull=True, admin_confirmed_at__isnull=True, reported_at__date__gte=start_date, reported_at__date__lte=end_date)
-            )
-
-        # Calculate maintenance costs by category (using actual cost or estimated)
-        # This is for display in the category breakdown only
+        # All maintenance is shown under a single 'maintenance' category
         maintenance_by_category = {}
-        for req in maintenance:
-            category = 'maintenance'  # Use 'maintenance' as the category
-            if category not in maintenance_by_category:
-                maintenance_by_category[category] = Decimal('0.00')
-            
-            if req.cost is not None:
-                # Use actual cost if available
-                maintenance_by_category[category] += req.cost
-            elif req.service_catalog and req.service_catalog.price:
-                # Use price from service catalog
-                maintenance_by_category[category] += req.service_catalog.price
+        if maintenance_totals['count']:
+            maintenance_by_category['maintenance'] = maintenance_totals['total'] or Decimal('0.00')
 
         # Combine both expense types by category (for display purposes)
         category_totals = {}
@@ -240,6 +231,7 @@ class LandlordAnalytics:
             'by_category': by_category  # Includes maintenance for display purposes
         }
 
+    @traced()
     def get_property_performance(self):
         """
         Get individual property performance metrics.
@@ -251,6 +243,17 @@ class LandlordAnalytics:
 
         properties = Property.objects.filter(landlord=self.landlord)
         performance = []
+        today = timezone.now().date()
+
+        # Maintenance costs for all properties in one grouped query
+        # Include resolved with costs OR confirmed bookings
+        maintenance_by_property = dict(
+            costed_maintenance(
+                MaintenanceRequest.objects.filter(rental_property__landlord=self.landlord)
+            ).values('rental_property').annotate(
+                total=Sum('effective_cost')
+            ).values_list('rental_property', 'total')
+        )
 
         for prop in properties:
             # Get bookings for this property
@@ -262,34 +265,12 @@ class LandlordAnalytics:
             total_income = bookings.aggregate(total=Sum('total_price'))['total'] or Decimal('0.00')
             booking_count = bookings.count()
             
-            # Get property expenses for this property
-            expenses = prop.expenses.all()
+            # Get property expenses incurred so far (future recurring occurrences are excluded)
+            expenses = prop.expenses.filter(expense_date__lte=today)
             property_expenses = expenses.aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
             
             # Get maintenance costs for this property
-            # Include resolved with costs OR confirmed bookings
-            resolved_maintenance = MaintenanceRequest.objects.filter(
-                rental_property=prop,
-                status='resolved',
-                cost__isnull=False
-            )
-            confirmed_bookings = MaintenanceRequest.objects.filter(
-                rental_property=prop,
-                admin_confirmed_at__isnull=False
-            ).exclude(status='cancelled')
-            
-            maintenance = MaintenanceRequest.objects.filter(
-                Q(id__in=resolved_maintenance.values_list('id', flat=True)) |
-                Q(id__in=confirmed_bookings.values_list('id', flat=True))
-            ).distinct()
-            
-            # Calculate total: use actual cost or service catalog price
-            maintenance_costs = Decimal('0.00')
-            for req in maintenance:
-                if req.cost is not None:
-                    maintenance_costs += req.cost
-                elif req.service_catalog and req.service_catalog.price:
-                    maintenance_costs += req.service_catalog.price
+            maintenance_costs = maintenance_by_property.get(prop.id) or Decimal('0.00')
             
             # Total expenses = property expenses + maintenance costs
             total_expenses = float(property_expenses) + float(maintenance_costs)
@@ -310,6 +291,7 @@ class LandlordAnalytics:
 
         return performance
 
+    @traced()
     def get_average_booking_duration(self):
         """
         Calculate average booking duration in days.
@@ -334,6 +316,7 @@ class LandlordAnalytics:
             'total_bookings': count
         }
 
+    @traced()
     def get_noi(self, start_date=None, end_date=None):
         """
         Calculate Net Operating Income: Total Revenue – Operating Expenses
@@ -354,6 +337,7 @@ class LandlordAnalytics:
             'property_expenses': round(property_expenses, 2)
         }
 
+    @traced()
     def get_total_properties(self):
         """
         Get total count of properties by status.
@@ -370,6 +354,7 @@ class LandlordAnalytics:
             'draft': properties.filter(status='draft').count()
         }
 
+    @traced()
     def get_monthly_cash_flow(self, start_date=None, end_date=None):
         """
         Calculate monthly cash flow (income vs expenses) over time.
@@ -397,13 +382,13 @@ class LandlordAnalytics:
                 month_end = end_date
 
             # Calculate income for this month
-            # Income is counted when booking is confirmed
-            # Use updated_at as proxy for when booking was confirmed (when status became confirmed)
+            # Income is recognised when the booking is confirmed
+            month_start_at, month_end_at = datetime_range(current_date, month_end)
             bookings = Booking.objects.filter(
                 property__landlord=self.landlord,
                 status__in=['confirmed', 'completed'],
-                updated_at__date__gte=current_date,
-                updated_at__date__lte=month_end
+                confirmed_at__gte=month_start_at,
+                confirmed_at__lt=month_end_at
             )
             monthly_income = bookings.aggregate(total=Sum('total_price'))['total'] or Decimal('0.00')
 
@@ -417,32 +402,12 @@ class LandlordAnalytics:
 
             # Calculate maintenance costs for this month
             # Include resolved with costs OR confirmed bookings
-            resolved_maintenance = MaintenanceRequest.objects.filter(
-                rental_property__landlord=self.landlord,
-                status='resolved',
-                cost__isnull=False
+            maintenance = costed_maintenance(
+                MaintenanceRequest.objects.filter(rental_property__landlord=self.landlord),
+                current_date,
+                month_end
             )
-            confirmed_bookings = MaintenanceRequest.objects.filter(
-                rental_property__landlord=self.landlord,
-                admin_confirmed_at__isnull=False
-            ).exclude(status='cancelled')
-            
-            maintenance = MaintenanceRequest.objects.filter(
-                Q(id__in=resolved_maintenance.values_list('id', flat=True)) |
-                Q(id__in=confirmed_bookings.values_list('id', flat=True))
-            ).distinct().filter(
-                Q(resolved_at__isnull=False, resolved_at__date__gte=current_date, resolved_at__date__lte=month_end) |
-                Q(resolved_at__isnull=True, admin_confirmed_at__isnull=False, admin_confirmed_at__date__gte=current_date, admin_confirmed_at__date__lte=month_end) |
-                Q(resolved_at__isnull=True, admin_confirmed_at__isnull=True, reported_at__date__gte=current_date, reported_at__date__lte=month_end)
-            )
-            
-            # Calculate total: use actual cost or service catalog price
-            monthly_maintenance = Decimal('0.00')
-            for req in maintenance:
-                if req.cost is not None:
-                    monthly_maintenance += req.cost
-                elif req.service_catalog and req.service_catalog.price:
-                    monthly_maintenance += req.service_catalog.price
+            monthly_maintenance = maintenance.aggregate(total=Sum('effective_cost'))['total'] or Decimal('0.00')
 
             total_expenses = float(monthly_expenses) + float(monthly_maintenance)
             net_cash_flow = float(monthly_income) - total_expenses
@@ -463,24 +428,28 @@ class LandlordAnalytics:
 
         return monthly_data
 
+    @traced()
     def get_annual_expenses_summary(self, year=None):
         """
         Get annual expenses summary by category.
+        The current year is summed to date, leaving out materialized future occurrences.
         """
         from properties.models import PropertyExpense
         from maintenance.models import MaintenanceRequest
         from datetime import datetime
 
+        today = timezone.now().date()
         if not year:
-            year = timezone.now().year
+            year = today.year
 
         start_date = datetime(year, 1, 1).date()
-        end_date = datetime(year, 12, 31).date()
+        end_date = min(datetime(year, 12, 31).date(), today)
 
         # Get property expenses by category
         expenses = PropertyExpense.objects.filter(
             property__landlord=self.landlord,
-            expense_date__year=year
+            expense_date__gte=start_date,
+            expense_date__lte=end_date
         )
 
         expense_by_category = expenses.values('category').annotate(
@@ -489,38 +458,19 @@ class LandlordAnalytics:
 
         # Get maintenance costs for the year
         # Include resolved with costs OR confirmed bookings
-        resolved_maintenance = MaintenanceRequest.objects.filter(
-            rental_property__landlord=self.landlord,
-            status='resolved',
-            cost__isnull=False
-        )
-        confirmed_bookings = MaintenanceRequest.objects.filter(
-            rental_property__landlord=self.landlord,
-            admin_confirmed_at__isnull=False
-        ).exclude(status='cancelled')
-        
-        maintenance = MaintenanceRequest.objects.filter(
-            Q(id__in=resolved_maintenance.values_list('id', flat=True)) |
-            Q(id__in=confirmed_bookings.values_list('id', flat=True))
-        ).distinct().filter(
-            Q(resolved_at__isnull=False, resolved_at__year=year) |
-            Q(resolved_at__isnull=True, admin_confirmed_at__isnull=False, admin_confirmed_at__year=year) |
-            Q(resolved_at__isnull=True, admin_confirmed_at__isnull=True, reported_at__year=year)
+        maintenance = costed_maintenance(
+            MaintenanceRequest.objects.filter(rental_property__landlord=self.landlord),
+            start_date,
+            end_date
         )
-        
-        # Calculate total: use actual cost or service catalog price
-        maintenance_total = Decimal('0.00')
-        for req in maintenance:
-            if req.cost is not None:
-                maintenance_total += req.cost
-            elif req.service_catalog and req.service_catalog.price:
-                maintenance_total += req.service_catalog.price
+        maintenance_total = maintenance.aggregate(total=Sum('effective_cost'))['total'] or Decimal('0.00')
 
         property_expenses_total = expenses.aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
         total_expenses = float(property_expenses_total) + float(maintenance_total)
 
         return {
             'year': year,
+            'through': end_date.isoformat(),
             'total_expenses': total_expenses,
             'by_category': [
                 {'category': item['category'], 'amount': float(item['total'])}
@@ -535,6 +485,7 @@ class AdminAnalytics:
     """Analytics for admin dashboard."""
 
     @staticmethod
+    @traced()
     def get_open_maintenance_tickets():
         """Get count of open maintenance tickets."""
         from maintenance.models import MaintenanceRequest
@@ -544,6 +495,7 @@ class AdminAnalytics:
         ).count()
 
     @staticmethod
+    @traced()
     def get_average_resolution_time():
         """Calculate average maintenance resolution time."""
         from maintenance.models import MaintenanceRequest
@@ -562,6 +514,7 @@ class AdminAnalytics:
         return round(avg_hours, 2)
 
     @staticmethod
+    @traced()
     def get_occupancy_ratio():
         """Calculate platform-wide occupancy ratio."""
         from properties.models import Property
@@ -580,6 +533,7 @@ class AdminAnalytics:
         return round(ratio, 2)
 
     @staticmethod
+    @traced()
     def get_rent_collection_rate():
         """Calculate rent collection rate."""
         from bookings.models import Booking, Payment
@@ -596,6 +550,7 @@ class AdminAnalytics:
         return round(rate, 2)
 
     @staticmethod
+    @traced()
     def get_platform_statistics():
         """Get general platform statistics."""
         from django.contrib.auth import get_user_model
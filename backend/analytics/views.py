@@ -6,8 +6,19 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from datetime import datetime, timedelta
+from django.http import FileResponse, StreamingHttpResponse
+from django.urls import reverse
 from django.utils import timezone
 
+from .exports import (
+    EXPORT_DATASETS,
+    get_export_expiry,
+    get_export_file_name,
+    get_export_rows,
+    get_export_storage,
+    iter_csv,
+)
+from .tasks import export_xlsx
 from .utils import LandlordAnalytics, AdminAnalytics
 
 
@@ -86,3 +97,134 @@ class AdminDashboardView(APIView):
         }
 
         return Response(dashboard_data, status=status.HTTP_200_OK)
+
+
+def _parse_export_request(request, dataset):
+    """
+    Validate an export request.
+    Returns (start_date, end_date, None) or (None, None, error_response).
+    """
+    if not (request.user.is_landlord() or request.user.is_admin()):
+        return None, None, Response({
+            'error': 'Only landlords and admins can export data.'
+        }, status=status.HTTP_403_FORBIDDEN)
+
+    if dataset not in EXPORT_DATASETS:
+        return None, None, Response({
+            'error': f'Unknown export. Choose one of: {", ".join(EXPORT_DATASETS)}'
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    start_date = request.query_params.get('start_date')
+    end_date = request.query_params.get('end_date')
+    try:
+        start_date = datetime.strptime(start_date, '%Y-%m-%d').date() if start_date else None
+        end_date = datetime.strptime(end_date, '%Y-%m-%d').date() if end_date else None
+    except ValueError:
+        return None, None, Response({
+            'error': 'Invalid date format. Use YYYY-MM-DD'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    return start_date, end_date, None
+
+
+class CSVExportView(APIView):
+    """
+    API endpoint that streams a bookings, expenses or revenue export as CSV.
+    Landlords get their own properties, admins get the whole platform.
+    Optional start_date/end_date query params (YYYY-MM-DD) limit the range.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, dataset):
+        """Stream the export; memory use is independent of the row count."""
+        start_date, end_date, error = _parse_export_request(request, dataset)
+        if error:
+            return error
+
+        headers, rows = get_export_rows(dataset, request.user, start_date, end_date)
+        response = StreamingHttpResponse(iter_csv(headers, rows), content_type='text/csv')
+        filename = f'{dataset}_{timezone.now().strftime("%Y%m%d")}.csv'
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+
+class XLSXExportView(APIView):
+    """
+    API endpoint that queues an XLSX export as a Celery job.
+    The workbook is written to private export storage; poll status_url for the download link.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, dataset):
+        """Queue the export and return the task ID."""
+        start_date, end_date, error = _parse_export_request(request, dataset)
+        if error:
+            return error
+
+        task = export_xlsx.delay(
+            str(request.user.id),
+            dataset,
+            start_date.isoformat() if start_date else None,
+            end_date.isoformat() if end_date else None
+        )
+        return Response({
+            'message': 'Export queued',
+            'task_id': task.id,
+            'status_url': reverse('export_status', args=[task.id])
+        }, status=status.HTTP_202_ACCEPTED)
+
+
+class ExportStatusView(APIView):
+    """API endpoint to poll a queued XLSX export for its download link."""
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, task_id):
+        """Return the task state and, once finished, the file URL."""
+        from celery.result import AsyncResult
+
+        result = AsyncResult(task_id)
+        info = result.info if isinstance(result.info, dict) else {}
+
+        # Only the user who requested the export may download it
+        if info and info.get('user_id') != str(request.user.id):
+            return Response({
+                'error': 'Export not found'
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        data = {'task_id': task_id, 'state': result.state}
+        data.update({key: value for key, value in info.items() if key != 'user_id'})
+        if data.get('file_url'):
+            data['file_url'] = request.build_absolute_uri(data['file_url'])
+        if result.failed():
+            data['error'] = 'Export failed'
+        return Response(data, status=status.HTTP_200_OK)
+
+
+class ExportDownloadView(APIView):
+    """
+    API endpoint to download a finished XLSX export.
+    Files are looked up in the requesting user's own export directory, so
+    only the user who requested an export can download it, until it expires.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, file_id):
+        """Return the workbook as an attachment."""
+        storage = get_export_storage()
+        file_name = get_export_file_name(request.user.id, file_id)
+        if not storage.exists(file_name) or get_export_expiry(storage, file_name) <= timezone.now():
+            return Response({
+                'error': 'Export not found'
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        dataset_and_timestamp = file_id.rsplit('_', 1)[0]
+        return FileResponse(
+            storage.open(file_name, 'rb'),
+            as_attachment=True,
+            filename=f'{dataset_and_timestamp}.xlsx',
+            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        )
@@ -25,11 +25,11 @@ class BookingAdmin(admin.ModelAdmin):
             'fields': ('special_requests', 'cancellation_reason')
         }),
         ('Timestamps', {
-            'fields': ('created_at', 'updated_at')
+            'fields': ('created_at', 'updated_at', 'confirmed_at', 'cancelled_at', 'completed_at')
         }),
     )
     
-    readonly_fields = ('created_at', 'updated_at')
+    readonly_fields = ('created_at', 'updated_at', 'confirmed_at', 'cancelled_at', 'completed_at')
     
     def booking_id(self, obj):
         return f"#{str(obj.id)[:8]}"
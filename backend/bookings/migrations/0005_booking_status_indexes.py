@@ -0,0 +1,29 @@
+# Generated by Django 5.0.1 on 2026-10-19 05:09
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0004_booking_cancellation_reason'),
+        ('properties', '0005_property_approval_type'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='booking',
+            name='cancellation_reason',
+            field=models.TextField(blank=True, help_text='Reason provided by tenant for cancellation', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['status', 'created_at'], name='bookings_status_8f492c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['status', 'check_out'], name='bookings_status_ac1f42_idx'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.0.1 on 2026-10-19 05:10
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_lifecycle_timestamps(apps, schema_editor):
+    """
+    Seed lifecycle timestamps for existing bookings.
+    updated_at is the best record we have of the last status change.
+    """
+    Booking = apps.get_model('bookings', 'Booking')
+
+    Booking.objects.filter(
+        status__in=['confirmed', 'completed'],
+        confirmed_at__isnull=True
+    ).update(confirmed_at=F('updated_at'))
+    Booking.objects.filter(
+        status='cancelled',
+        cancelled_at__isnull=True
+    ).update(cancelled_at=F('updated_at'))
+    Booking.objects.filter(
+        status='completed',
+        completed_at__isnull=True
+    ).update(completed_at=F('updated_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0005_booking_status_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='cancelled_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='booking',
+            name='completed_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='booking',
+            name='confirmed_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.RunPython(backfill_lifecycle_timestamps, migrations.RunPython.noop),
+    ]
@@ -2,8 +2,11 @@
 Simplified Booking model for Propertree.
 """
 import uuid
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
 from django.conf import settings
+from events.outbox import record_event
+from events.realtime import publish_user_event
 from properties.models import Property
 
 
@@ -54,12 +57,21 @@ class Booking(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    # Lifecycle timestamps (used for revenue recognition)
+    confirmed_at = models.DateTimeField(null=True, blank=True, db_index=True)
+    cancelled_at = models.DateTimeField(null=True, blank=True, db_index=True)
+    completed_at = models.DateTimeField(null=True, blank=True, db_index=True)
+    
     class Meta:
         db_table = 'bookings'
         verbose_name = 'Booking'
         verbose_name_plural = 'Bookings'
         ordering = ['-created_at']
-    
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+            models.Index(fields=['status', 'check_out']),
+        ]
+
     def __str__(self):
         return f"Booking #{str(self.id)[:8]} - {self.property.title}"
     
@@ -69,20 +81,53 @@ class Booking(models.Model):
     
     def confirm(self):
         """Confirm the booking."""
+        previous_status = self.status
         self.status = 'confirmed'
-        self.save()
+        # Set on the first transition only, so repeating it does not move the recognition date
+        self.confirmed_at = self.confirmed_at or timezone.now()
+        with transaction.atomic():
+            self.save()
+            self._record_status_event('booking.confirmed', previous_status)
     
     def cancel(self, reason=None):
         """Cancel the booking with optional reason."""
+        previous_status = self.status
         self.status = 'cancelled'
+        self.cancelled_at = self.cancelled_at or timezone.now()
         if reason:
             self.cancellation_reason = reason
-        self.save()
+        with transaction.atomic():
+            self.save()
+            self._record_status_event('booking.cancelled', previous_status, reason=reason or '')
     
     def complete(self):
         """Mark booking as completed."""
+        previous_status = self.status
         self.status = 'completed'
-        self.save()
+        self.completed_at = self.completed_at or timezone.now()
+        with transaction.atomic():
+            self.save()
+            self._record_status_event('booking.completed', previous_status)
+    
+    def _record_status_event(self, event_type, previous_status, **extra):
+        """
+        Write the status change to the outbox (inside the saving transaction)
+        and push it to the tenant's and landlord's realtime streams after commit.
+        """
+        record_event(
+            event_type,
+            self,
+            property_id=str(self.property_id),
+            tenant_id=str(self.tenant_id),
+            previous_status=previous_status,
+            status=self.status,
+            **extra
+        )
+        publish_user_event(
+            [self.tenant_id, self.property.landlord_id],
+            event_type,
+            {'id': str(self.id), 'property_id': str(self.property_id), 'status': self.status, **extra}
+        )
     
     def calculate_total_price(self):
         """Calculate total price based on duration and property price."""
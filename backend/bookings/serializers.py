@@ -5,6 +5,8 @@ from rest_framework import serializers
 from datetime import date
 from .models import Booking
 from properties.serializers import PropertyListSerializer
+from propertree.metrics import record_booking_conflict
+from propertree.tracing import TracedListSerializer
 
 
 class BookingListSerializer(serializers.ModelSerializer):
@@ -20,6 +22,7 @@ class BookingListSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Booking
+        list_serializer_class = TracedListSerializer
         fields = [
             'id', 'property', 'property_title', 'property_city', 'property_country', 'property_approval_type',
             'tenant_name', 'tenant_email', 'check_in', 'check_out', 'guests_count',
@@ -50,9 +53,12 @@ class BookingDetailSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'property', 'property_details', 'tenant', 'tenant_name', 'tenant_email',
             'check_in', 'check_out', 'guests_count', 'total_price', 'status',
-            'special_requests', 'cancellation_reason', 'duration_nights', 'created_at', 'updated_at'
+            'special_requests', 'cancellation_reason', 'duration_nights', 'created_at', 'updated_at',
+            'confirmed_at', 'cancelled_at', 'completed_at'
+        ]
+        read_only_fields = [
+            'id', 'tenant', 'created_at', 'updated_at', 'confirmed_at', 'cancelled_at', 'completed_at'
         ]
-        read_only_fields = ['id', 'tenant', 'created_at', 'updated_at']
     
     def get_tenant_name(self, obj):
         """Get tenant name from profile."""
@@ -93,6 +99,7 @@ class BookingCreateSerializer(serializers.ModelSerializer):
         
         # Check if property is available for the requested dates
         if not property_obj.is_available_for_dates(check_in, check_out):
+            record_booking_conflict()
             raise serializers.ValidationError(
                 'Property is not available for the selected dates. Please choose different dates.'
             )
@@ -0,0 +1,106 @@
+"""
+Celery tasks for Bookings app.
+"""
+from datetime import timedelta
+
+from celery import shared_task
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from events.models import OutboxEvent
+from events.realtime import publish_user_events
+from .models import Booking
+
+
+def _update_in_batches(queryset, batch_size, event_type, extra=None, **updates):
+    """
+    Apply a bulk update to a queryset in primary-key batches.
+    Each batch locks and re-applies the queryset filter, so rows that changed
+    status since they were selected are left untouched, and writes one outbox
+    event per updated booking in the same transaction. The tenant and landlord
+    get the same realtime event as from Booking's status methods, after commit;
+    `extra` is added to both payloads.
+    Returns the number of rows updated.
+    """
+    extra = extra or {}
+    updated = 0
+    while True:
+        with transaction.atomic():
+            batch = list(
+                queryset.select_for_update(skip_locked=True, of=('self',)).order_by()
+                .values_list('id', 'property_id', 'property__landlord_id', 'tenant_id', 'status')[:batch_size]
+            )
+            if not batch:
+                break
+            updated += queryset.filter(id__in=[row[0] for row in batch]).update(**updates)
+            OutboxEvent.objects.bulk_create([
+                OutboxEvent(
+                    event_type=event_type,
+                    aggregate_type='booking',
+                    aggregate_id=str(booking_id),
+                    payload={
+                        'property_id': str(property_id),
+                        'tenant_id': str(tenant_id),
+                        'previous_status': previous_status,
+                        'status': updates['status'],
+                        **extra
+                    }
+                )
+                for booking_id, property_id, _, tenant_id, previous_status in batch
+            ])
+            publish_user_events([
+                (user_id, event_type, {
+                    'id': str(booking_id), 'property_id': str(property_id), 'status': updates['status'], **extra
+                })
+                for booking_id, property_id, landlord_id, tenant_id, _ in batch
+                for user_id in (tenant_id, landlord_id)
+            ])
+    return updated
+
+
+@shared_task
+def expire_stale_pending_bookings():
+    """
+    Cancel pending bookings that were not confirmed within the configured TTL.
+    Releases the blocked dates for availability checks.
+    """
+    ttl_hours = settings.BOOKING_PENDING_TTL_HOURS
+    now = timezone.now()
+
+    stale_bookings = Booking.objects.filter(
+        status='pending',
+        created_at__lt=now - timedelta(hours=ttl_hours)
+    )
+
+    reason = f'Automatically cancelled: not confirmed within {ttl_hours} hours'
+    return _update_in_batches(
+        stale_bookings,
+        settings.BOOKING_EXPIRY_BATCH_SIZE,
+        'booking.cancelled',
+        extra={'reason': reason},
+        status='cancelled',
+        cancellation_reason=reason,
+        cancelled_at=now,
+        updated_at=now,
+    )
+
+
+@shared_task
+def complete_past_bookings():
+    """Mark confirmed bookings whose check-out date has passed as completed."""
+    now = timezone.now()
+
+    past_bookings = Booking.objects.filter(
+        status='confirmed',
+        check_out__lt=now.date()
+    )
+
+    return _update_in_batches(
+        past_bookings,
+        settings.BOOKING_EXPIRY_BATCH_SIZE,
+        'booking.completed',
+        status='completed',
+        completed_at=now,
+        updated_at=now,
+    )
@@ -0,0 +1,161 @@
+"""
+Tests for the booking lifecycle timestamps and the periodic lifecycle tasks.
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from events.models import OutboxEvent
+from propertree.tests.dataset import build_dataset
+
+from .models import Booking
+from .serializers import BookingDetailSerializer
+from .tasks import complete_past_bookings, expire_stale_pending_bookings
+
+
+@override_settings(BOOKING_PENDING_TTL_HOURS=48, BOOKING_EXPIRY_BATCH_SIZE=2)
+class BookingLifecycleTaskTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = build_dataset()
+
+    def create_booking(self, status, check_in, created_hours_ago=0):
+        booking = Booking.objects.create(
+            property=self.data['property'],
+            tenant=self.data['tenant'],
+            check_in=check_in,
+            check_out=check_in + timedelta(days=2),
+            guests_count=1,
+            total_price=Decimal('160.00'),
+            status=status,
+        )
+        Booking.objects.filter(pk=booking.pk).update(created_at=timezone.now() - timedelta(hours=created_hours_ago))
+        return booking
+
+    def published(self, publish):
+        """Return the (user id, event type, booking id) triples sent through the patched publisher."""
+        return sorted(
+            (str(user_id), event_type, data['id'])
+            for call in publish.call_args_list for user_id, event_type, data in call.args[0]
+        )
+
+    @patch('bookings.tasks.publish_user_events')
+    def test_expire_cancels_only_stale_pending_bookings_across_batches(self, publish):
+        Booking.objects.filter(status='pending').update(created_at=timezone.now())
+        check_in = date.today() + timedelta(days=200)
+        stale = [self.create_booking('pending', check_in + timedelta(days=3 * i), created_hours_ago=49) for i in range(5)]
+        fresh = self.create_booking('pending', check_in + timedelta(days=30), created_hours_ago=47)
+        old_confirmed = self.create_booking('confirmed', check_in + timedelta(days=40), created_hours_ago=100)
+
+        self.assertEqual(expire_stale_pending_bookings(), 5)
+
+        for booking in stale:
+            booking.refresh_from_db()
+            self.assertEqual(booking.status, 'cancelled')
+            self.assertIsNotNone(booking.cancelled_at)
+            self.assertIn('not confirmed within 48 hours', booking.cancellation_reason)
+        fresh.refresh_from_db()
+        old_confirmed.refresh_from_db()
+        self.assertEqual(fresh.status, 'pending')
+        self.assertEqual(old_confirmed.status, 'confirmed')
+
+        events = OutboxEvent.objects.filter(event_type='booking.cancelled', aggregate_id__in=[str(b.pk) for b in stale])
+        self.assertEqual(events.count(), 5)
+        self.assertEqual(events.first().payload['previous_status'], 'pending')
+
+        # Tenant and landlord get a realtime event per booking, one publish per batch
+        self.assertEqual(publish.call_count, 3)
+        landlord_id = str(self.data['property'].landlord_id)
+        self.assertEqual(self.published(publish), sorted(
+            (user_id, 'booking.cancelled', str(booking.pk))
+            for booking in stale for user_id in (str(self.data['tenant'].pk), landlord_id)
+        ))
+
+        # A second sweep finds nothing left to do
+        self.assertEqual(expire_stale_pending_bookings(), 0)
+
+    @patch('bookings.tasks.publish_user_events')
+    def test_complete_marks_confirmed_stays_that_ended(self, publish):
+        past = self.create_booking('confirmed', date.today() - timedelta(days=5))
+        ongoing = self.create_booking('confirmed', date.today() - timedelta(days=1))
+        cancelled = self.create_booking('cancelled', date.today() - timedelta(days=10))
+
+        self.assertEqual(complete_past_bookings(), 1)
+
+        past.refresh_from_db()
+        ongoing.refresh_from_db()
+        cancelled.refresh_from_db()
+        self.assertEqual(past.status, 'completed')
+        self.assertIsNotNone(past.completed_at)
+        self.assertEqual(ongoing.status, 'confirmed')
+        self.assertEqual(cancelled.status, 'cancelled')
+        self.assertTrue(
+            OutboxEvent.objects.filter(event_type='booking.completed', aggregate_id=str(past.pk)).exists()
+        )
+        self.assertEqual(
+            [event[1:] for event in self.published(publish)], [('booking.completed', str(past.pk))] * 2
+        )
+
+
+class BookingLifecycleTimestampTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = build_dataset(rows=1)
+
+    def setUp(self):
+        check_in = date.today() + timedelta(days=300)
+        self.booking = Booking.objects.create(
+            property=self.data['property'],
+            tenant=self.data['tenant'],
+            check_in=check_in,
+            check_out=check_in + timedelta(days=2),
+            guests_count=1,
+            total_price=Decimal('160.00'),
+        )
+
+    def assert_set_once(self, transition, field):
+        self.assertIsNone(getattr(self.booking, field))
+        transition()
+        first = Booking.objects.values_list(field, flat=True).get(pk=self.booking.pk)
+        self.assertIsNotNone(first)
+
+        transition()
+        self.booking.refresh_from_db()
+        self.assertEqual(getattr(self.booking, field), first)
+
+    def test_confirm_sets_confirmed_at_once(self):
+        self.assert_set_once(self.booking.confirm, 'confirmed_at')
+        self.assertIsNone(self.booking.cancelled_at)
+        self.assertIsNone(self.booking.completed_at)
+
+    def test_cancel_sets_cancelled_at_once(self):
+        self.booking.confirm()
+        self.assert_set_once(lambda: self.booking.cancel('Plans changed'), 'cancelled_at')
+        self.assertIsNotNone(self.booking.confirmed_at)
+
+    def test_complete_sets_completed_at_once(self):
+        self.booking.confirm()
+        self.assert_set_once(self.booking.complete, 'completed_at')
+
+    def test_timestamps_are_read_only_in_detail_serializer(self):
+        self.booking.confirm()
+        confirmed_at = self.booking.confirmed_at
+        serializer = BookingDetailSerializer(self.booking, data={
+            'confirmed_at': '2020-01-01T00:00:00Z',
+            'cancelled_at': '2020-01-01T00:00:00Z',
+            'completed_at': '2020-01-01T00:00:00Z',
+            'special_requests': 'Late arrival',
+        }, partial=True)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        serializer.save()
+
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.special_requests, 'Late arrival')
+        self.assertEqual(self.booking.confirmed_at, confirmed_at)
+        self.assertIsNone(self.booking.cancelled_at)
+        self.assertIsNone(self.booking.completed_at)
@@ -261,6 +261,8 @@ class BookingStatusUpdateView(APIView):
                         status=status.HTTP_400_BAD_REQUEST
                     )
                 booking.cancel()
+            elif new_status == 'completed':
+                booking.complete()
             else:
                 booking.status = new_status
                 booking.save()
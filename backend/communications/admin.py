@@ -2,7 +2,7 @@
 Admin configuration for Communications app.
 """
 from django.contrib import admin
-from .models import Message, Conversation, Notification, EmailTemplate, EmailLog
+from .models import Message, Conversation, Notification, EmailTemplate, EmailLog, UnreadCounter
 
 
 @admin.register(Message)
@@ -19,7 +19,7 @@ class MessageAdmin(admin.ModelAdmin):
 class ConversationAdmin(admin.ModelAdmin):
     """Admin interface for Conversation model."""
 
-    list_display = ('participant1', 'participant2', 'booking', 'created_at', 'updated_at')
+    list_display = ('participant1', 'participant2', 'booking', 'last_message_at', 'created_at')
     search_fields = ('participant1__email', 'participant2__email')
     readonly_fields = ('created_at', 'updated_at')
 
@@ -52,3 +52,12 @@ class EmailLogAdmin(admin.ModelAdmin):
     list_filter = ('status', 'sent_at', 'created_at')
     search_fields = ('recipient_email', 'subject', 'body')
     readonly_fields = ('sent_at', 'created_at')
+
+
+@admin.register(UnreadCounter)
+class UnreadCounterAdmin(admin.ModelAdmin):
+    """Admin interface for UnreadCounter model."""
+
+    list_display = ('user', 'notifications', 'messages', 'updated_at')
+    search_fields = ('user__email',)
+    readonly_fields = ('updated_at',)
@@ -0,0 +1,156 @@
+"""
+Per-user unread counters for notifications and messages.
+
+Badge polling reads one UnreadCounter row instead of counting the Notification
+and Message tables. Every path that creates or reads notifications and messages
+adjusts the counters with F() updates in the same transaction. A user without a
+counter row gets one counted from the tables, inserted with an upsert so that a
+concurrent adjustment is never lost, and rebuild_unread_counters() repairs drift
+(e.g. after rows are deleted in the admin).
+"""
+from collections import defaultdict
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.db.models import Count, F, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from propertree.metrics import record_cache_lookup
+
+from .models import Message, Notification, UnreadCounter
+
+User = get_user_model()
+
+COUNTER_FIELDS = ('notifications', 'messages')
+
+REBUILD_CHUNK_SIZE = 1000
+
+
+def adjust_unread_counts(field, deltas):
+    """
+    Add per-user deltas ({user_id: delta}) to a counter field, never going below zero.
+    Issues one UPDATE per distinct delta. Users without a counter row get one counted
+    from the tables, which already include the change being counted; if another
+    transaction inserts the same row first, the delta is added to that row instead.
+    """
+    user_ids_by_delta = defaultdict(list)
+    for user_id, delta in deltas.items():
+        if delta:
+            user_ids_by_delta[delta].append(User._meta.pk.to_python(user_id))
+
+    now = timezone.now()
+    for delta, user_ids in user_ids_by_delta.items():
+        updated = UnreadCounter.objects.filter(user_id__in=user_ids).update(**{
+            field: Greatest(F(field) + delta, Value(0)),
+            'updated_at': now,
+        })
+        if updated < len(user_ids):
+            existing = set(UnreadCounter.objects.filter(user_id__in=user_ids).values_list('user_id', flat=True))
+            _upsert_counters([user_id for user_id in user_ids if user_id not in existing], field, delta, now)
+
+
+def _count_unread(user_ids):
+    """Return ({user_id: unread notifications}, {user_id: unread messages}) from the tables."""
+    notifications = dict(
+        Notification.objects.filter(user_id__in=user_ids, is_read=False)
+        .values('user_id').annotate(count=Count('id')).values_list('user_id', 'count')
+    )
+    messages = dict(
+        Message.objects.filter(recipient_id__in=user_ids, is_read=False)
+        .values('recipient_id').annotate(count=Count('id')).values_list('recipient_id', 'count')
+    )
+    return notifications, messages
+
+
+def _upsert_counters(user_ids, field, delta, now):
+    """
+    Insert counted rows for users without one; on conflict with a row inserted
+    concurrently, add `delta` to its `field` instead (INSERT ... ON CONFLICT DO UPDATE).
+    """
+    notifications, messages = _count_unread(user_ids)
+    table = connection.ops.quote_name(UnreadCounter._meta.db_table)
+    column = connection.ops.quote_name(field)
+    user_field = UnreadCounter._meta.get_field('user')
+    rows, params = [], []
+    for user_id in user_ids:
+        rows.append('(%s, %s, %s, %s)')
+        params += [
+            user_field.get_db_prep_value(user_id, connection),
+            notifications.get(user_id, 0),
+            messages.get(user_id, 0),
+            UnreadCounter._meta.get_field('updated_at').get_db_prep_value(now, connection),
+        ]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {table} (user_id, notifications, messages, updated_at) VALUES {", ".join(rows)} '
+            f'ON CONFLICT (user_id) DO UPDATE SET '
+            f'{column} = CASE WHEN {table}.{column} + %s > 0 THEN {table}.{column} + %s ELSE 0 END, '
+            f'updated_at = EXCLUDED.updated_at',
+            params + [delta, delta]
+        )
+
+
+def rebuild_unread_counters(user_ids=None):
+    """
+    Recount unread notifications and messages from the tables and write the counter
+    rows of the given users (all users by default). Returns the number of rows written.
+    """
+    if user_ids is None:
+        user_ids = User.objects.order_by('pk').values_list('pk', flat=True).iterator(chunk_size=REBUILD_CHUNK_SIZE)
+
+    written = 0
+    chunk = []
+    for user_id in user_ids:
+        chunk.append(user_id)
+        if len(chunk) >= REBUILD_CHUNK_SIZE:
+            written += _rebuild_chunk(chunk)
+            chunk = []
+    if chunk:
+        written += _rebuild_chunk(chunk)
+    return written
+
+
+def _rebuild_chunk(user_ids):
+    """
+    Recount a chunk of users while holding their counter rows locked. Adjustments
+    that committed earlier are in the count; later ones wait for the lock and are
+    applied on top. Missing rows are inserted only if no adjustment created them first.
+    """
+    user_ids = [User._meta.pk.to_python(user_id) for user_id in user_ids]
+    now = timezone.now()
+    with transaction.atomic():
+        counters = list(
+            UnreadCounter.objects.select_for_update().filter(user_id__in=user_ids).order_by('pk')
+        )
+        notifications, messages = _count_unread(user_ids)
+        for counter in counters:
+            counter.notifications = notifications.get(counter.user_id, 0)
+            counter.messages = messages.get(counter.user_id, 0)
+            counter.updated_at = now
+        UnreadCounter.objects.bulk_update(counters, ['notifications', 'messages', 'updated_at'])
+
+        existing = {counter.user_id for counter in counters}
+        UnreadCounter.objects.bulk_create(
+            [
+                UnreadCounter(
+                    user_id=user_id,
+                    notifications=notifications.get(user_id, 0),
+                    messages=messages.get(user_id, 0),
+                    updated_at=now
+                )
+                for user_id in user_ids if user_id not in existing
+            ],
+            ignore_conflicts=True
+        )
+    return len(user_ids)
+
+
+def get_unread_counts(user):
+    """Return {'notifications': n, 'messages': m} for a user from their counter row."""
+    counts = UnreadCounter.objects.filter(user=user).values(*COUNTER_FIELDS).first()
+    record_cache_lookup('unread_counters', hit=counts is not None)
+    if counts is None:
+        rebuild_unread_counters([user.pk])
+        counts = UnreadCounter.objects.filter(user=user).values(*COUNTER_FIELDS).first()
+    return counts
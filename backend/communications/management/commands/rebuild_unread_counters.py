@@ -0,0 +1,32 @@
+"""
+Recount the denormalized unread notification and message counters.
+
+Usage:
+    python manage.py rebuild_unread_counters
+    python manage.py rebuild_unread_counters --email tenant@example.com
+"""
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from communications.counters import rebuild_unread_counters
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Recompute UnreadCounter rows from the Notification and Message tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--email',
+            action='append',
+            help='Only rebuild the counters of this user (repeatable)',
+        )
+
+    def handle(self, *args, **options):
+        user_ids = None
+        if options['email']:
+            user_ids = list(User.objects.filter(email__in=options['email']).values_list('pk', flat=True))
+
+        written = rebuild_unread_counters(user_ids)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt unread counters for {written} users'))
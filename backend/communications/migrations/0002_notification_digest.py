@@ -0,0 +1,30 @@
+# Generated by Django 5.0.1 on 2026-10-19 05:24
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0006_booking_lifecycle_timestamps'),
+        ('communications', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='emailed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='emailtemplate',
+            name='template_type',
+            field=models.CharField(choices=[('welcome', 'Welcome Email'), ('verification', 'Email Verification'), ('password_reset', 'Password Reset'), ('booking_confirmation', 'Booking Confirmation'), ('booking_reminder', 'Booking Reminder'), ('payment_receipt', 'Payment Receipt'), ('review_request', 'Review Request'), ('maintenance_update', 'Maintenance Update'), ('notification_digest', 'Notification Digest')], max_length=50, unique=True),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['emailed_at', 'user'], name='communicati_emailed_35a635_idx'),
+        ),
+    ]
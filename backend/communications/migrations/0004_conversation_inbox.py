@@ -0,0 +1,112 @@
+# Generated by Django 5.0.1 on 2026-10-19 05:30
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def link_messages_to_conversations(apps, schema_editor):
+    """
+    File existing messages under a conversation per (participant pair, booking),
+    reusing existing conversations in either participant order, and seed the
+    denormalized last message and unread fields.
+    """
+    Conversation = apps.get_model('communications', 'Conversation')
+    Message = apps.get_model('communications', 'Message')
+
+    conversations = {}
+    for conversation in Conversation.objects.all():
+        key = (frozenset([conversation.participant1_id, conversation.participant2_id]), conversation.booking_id)
+        conversations.setdefault(key, conversation)
+
+    pending = []
+    for message in Message.objects.filter(conversation__isnull=True).order_by('sent_at').iterator(chunk_size=2000):
+        key = (frozenset([message.sender_id, message.recipient_id]), message.booking_id)
+        conversation = conversations.get(key)
+        if conversation is None:
+            conversation = Conversation.objects.create(
+                participant1_id=message.sender_id,
+                participant2_id=message.recipient_id,
+                booking_id=message.booking_id
+            )
+            conversations[key] = conversation
+
+        message.conversation_id = conversation.id
+        pending.append(message)
+        if len(pending) >= 2000:
+            Message.objects.bulk_update(pending, ['conversation'])
+            pending = []
+
+        # Messages arrive oldest first, so the last one seen wins
+        conversation.last_message_at = message.sent_at
+        conversation.last_message_preview = message.message_text[:255]
+        conversation.last_message_sender_id = message.sender_id
+        if not message.is_read:
+            if message.recipient_id == conversation.participant1_id:
+                conversation.participant1_unread_count += 1
+            else:
+                conversation.participant2_unread_count += 1
+
+    if pending:
+        Message.objects.bulk_update(pending, ['conversation'])
+    Conversation.objects.bulk_update(
+        list(conversations.values()),
+        ['last_message_at', 'last_message_preview', 'last_message_sender',
+         'participant1_unread_count', 'participant2_unread_count'],
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0006_booking_lifecycle_timestamps'),
+        ('communications', '0003_unreadcounter'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conversation',
+            name='last_message_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='last_message_preview',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='last_message_sender',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='participant1_unread_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='participant2_unread_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='message',
+            name='conversation',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='messages', to='communications.conversation'),
+        ),
+        migrations.AddIndex(
+            model_name='conversation',
+            index=models.Index(fields=['participant1', 'last_message_at', 'id'], name='communicati_partici_b2b93a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='conversation',
+            index=models.Index(fields=['participant2', 'last_message_at', 'id'], name='communicati_partici_91bf16_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['conversation', 'sent_at', 'id'], name='communicati_convers_71eded_idx'),
+        ),
+        migrations.RunPython(link_messages_to_conversations, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.0.1 on 2026-10-19 05:32
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('communications', '0004_conversation_inbox'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='message',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.SearchVector('subject', config='english', weight='A'), '||', django.contrib.postgres.search.SearchVector('message_text', config='english', weight='B'), django.contrib.postgres.search.SearchConfig('english')), name='message_search_idx'),
+        ),
+    ]
@@ -0,0 +1,87 @@
+from django.db import migrations, models
+
+
+def canonicalize_conversations(apps, schema_editor):
+    """
+    Store every conversation's participants smaller ID first, and merge the
+    conversations that then share a (pair, booking) key into the oldest one,
+    moving their messages and recomputing its last message and unread counts.
+    """
+    Conversation = apps.get_model('communications', 'Conversation')
+    Message = apps.get_model('communications', 'Message')
+
+    kept = {}
+    merged = set()
+    for conversation in Conversation.objects.order_by('created_at', 'id').iterator(chunk_size=2000):
+        if str(conversation.participant1_id) > str(conversation.participant2_id):
+            conversation.participant1_id, conversation.participant2_id = (
+                conversation.participant2_id, conversation.participant1_id
+            )
+            conversation.participant1_unread_count, conversation.participant2_unread_count = (
+                conversation.participant2_unread_count, conversation.participant1_unread_count
+            )
+            Conversation.objects.filter(pk=conversation.pk).update(
+                participant1_id=conversation.participant1_id,
+                participant2_id=conversation.participant2_id,
+                participant1_unread_count=conversation.participant1_unread_count,
+                participant2_unread_count=conversation.participant2_unread_count,
+            )
+
+        key = (conversation.participant1_id, conversation.participant2_id, conversation.booking_id)
+        target = kept.setdefault(key, conversation)
+        if target.pk != conversation.pk:
+            Message.objects.filter(conversation_id=conversation.pk).update(conversation_id=target.pk)
+            Conversation.objects.filter(pk=conversation.pk).delete()
+            merged.add(target.pk)
+
+    for conversation in Conversation.objects.filter(pk__in=merged):
+        messages = Message.objects.filter(conversation_id=conversation.pk)
+        last = messages.order_by('-sent_at', '-id').first()
+        conversation.last_message_at = last.sent_at if last else None
+        conversation.last_message_preview = last.message_text[:255] if last else ''
+        conversation.last_message_sender_id = last.sender_id if last else None
+        unread = messages.filter(is_read=False)
+        conversation.participant1_unread_count = unread.filter(recipient_id=conversation.participant1_id).count()
+        conversation.participant2_unread_count = unread.filter(recipient_id=conversation.participant2_id).count()
+        conversation.save(update_fields=[
+            'last_message_at', 'last_message_preview', 'last_message_sender',
+            'participant1_unread_count', 'participant2_unread_count',
+        ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('communications', '0005_search_index'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='conversation',
+            unique_together=set(),
+        ),
+        migrations.RunPython(canonicalize_conversations, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='conversation',
+            constraint=models.CheckConstraint(
+                check=models.Q(('participant1__lte', models.F('participant2'))),
+                name='conversation_participants_ordered',
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name='conversation',
+            constraint=models.UniqueConstraint(
+                condition=models.Q(('booking__isnull', False)),
+                fields=('participant1', 'participant2', 'booking'),
+                name='conversation_unique_booking_pair',
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name='conversation',
+            constraint=models.UniqueConstraint(
+                condition=models.Q(('booking__isnull', True)),
+                fields=('participant1', 'participant2'),
+                name='conversation_unique_direct_pair',
+            ),
+        ),
+    ]
@@ -4,16 +4,30 @@ Communication models for Propertree platform.
 import uuid
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
 from bookings.models import Booking
+from propertree.search import SEARCH_CONFIG
 
 User = get_user_model()
 
 
+def message_search_vector():
+    """Search document of a message (subject weighted above the body); also the GIN index expression."""
+    return (
+        SearchVector('subject', weight='A', config=SEARCH_CONFIG)
+        + SearchVector('message_text', weight='B', config=SEARCH_CONFIG)
+    )
+
+
 class Message(models.Model):
     """Message model for communication between users."""
 
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     booking = models.ForeignKey(Booking, on_delete=models.CASCADE, null=True, blank=True, related_name='messages')
+    conversation = models.ForeignKey(
+        'Conversation', on_delete=models.CASCADE, null=True, blank=True, related_name='messages'
+    )
     sender = models.ForeignKey(User, on_delete=models.CASCADE, related_name='sent_messages')
     recipient = models.ForeignKey(User, on_delete=models.CASCADE, related_name='received_messages')
 
@@ -38,18 +52,57 @@ class Message(models.Model):
         indexes = [
             models.Index(fields=['sender', 'recipient']),
             models.Index(fields=['booking']),
+            models.Index(fields=['conversation', 'sent_at', 'id']),
+            GinIndex(message_search_vector(), name='message_search_idx'),
         ]
 
     def __str__(self):
         return f"Message from {self.sender.email} to {self.recipient.email}"
 
+    def save(self, *args, **kwargs):
+        """
+        Save the message; a new one is filed in its conversation (created on first
+        message), counted as unread for the recipient and pushed to their realtime
+        stream after commit.
+        """
+        from django.db import transaction
+        from events.realtime import publish_user_event
+        from .counters import adjust_unread_counts
+        adding = self._state.adding
+        with transaction.atomic():
+            if adding and self.conversation_id is None:
+                self.conversation = Conversation.get_or_create_for(self.sender_id, self.recipient_id, self.booking_id)
+            super().save(*args, **kwargs)
+            if adding:
+                self.conversation.record_message(self)
+            if adding and not self.is_read:
+                adjust_unread_counts('messages', {self.recipient_id: 1})
+            if adding:
+                publish_user_event([self.recipient_id], 'message.received', {
+                    'id': str(self.id),
+                    'conversation_id': str(self.conversation_id),
+                    'sender_id': str(self.sender_id),
+                    'booking_id': str(self.booking_id) if self.booking_id else None,
+                    'subject': self.subject,
+                    'preview': self.message_text[:140],
+                })
+
     def mark_as_read(self):
         """Mark message as read."""
+        from django.db import transaction
         from django.utils import timezone
+        from .counters import adjust_unread_counts
         if not self.is_read:
             self.is_read = True
             self.read_at = timezone.now()
-            self.save(update_fields=['is_read', 'read_at'])
+            with transaction.atomic():
+                # Conditional update so concurrent reads only decrement the counter once
+                updated = Message.objects.filter(pk=self.pk, is_read=False).update(
+                    is_read=True, read_at=self.read_at
+                )
+                adjust_unread_counts('messages', {self.recipient_id: -updated})
+                if updated and self.conversation_id:
+                    self.conversation.adjust_unread(self.recipient_id, -updated)
 
 
 class Conversation(models.Model):
@@ -60,6 +113,15 @@ class Conversation(models.Model):
     participant2 = models.ForeignKey(User, on_delete=models.CASCADE, related_name='conversations_as_participant2')
     booking = models.ForeignKey(Booking, on_delete=models.CASCADE, null=True, blank=True, related_name='conversations')
 
+    # Denormalized from the latest message so the inbox never reads the messages table
+    last_message_at = models.DateTimeField(null=True, blank=True)
+    last_message_preview = models.CharField(max_length=255, blank=True)
+    last_message_sender = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+
+    # Unread messages per participant
+    participant1_unread_count = models.PositiveIntegerField(default=0)
+    participant2_unread_count = models.PositiveIntegerField(default=0)
+
     # Metadata
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -67,28 +129,101 @@ class Conversation(models.Model):
     class Meta:
         verbose_name = 'Conversation'
         verbose_name_plural = 'Conversations'
-        unique_together = ['participant1', 'participant2', 'booking']
         ordering = ['-updated_at']
+        indexes = [
+            models.Index(fields=['participant1', 'last_message_at', 'id']),
+            models.Index(fields=['participant2', 'last_message_at', 'id']),
+        ]
+        # The pair is stored in canonical order (see ordered_participants), and NULL
+        # bookings never collide in a plain unique index, so they get their own
+        constraints = [
+            models.CheckConstraint(
+                check=models.Q(participant1__lte=models.F('participant2')),
+                name='conversation_participants_ordered',
+            ),
+            models.UniqueConstraint(
+                fields=['participant1', 'participant2', 'booking'],
+                condition=models.Q(booking__isnull=False),
+                name='conversation_unique_booking_pair',
+            ),
+            models.UniqueConstraint(
+                fields=['participant1', 'participant2'],
+                condition=models.Q(booking__isnull=True),
+                name='conversation_unique_direct_pair',
+            ),
+        ]
 
     def __str__(self):
         return f"Conversation between {self.participant1.email} and {self.participant2.email}"
 
+    @staticmethod
+    def ordered_participants(user_id, other_user_id):
+        """Return the two user IDs as (participant1_id, participant2_id), smaller ID first."""
+        to_python = User._meta.pk.to_python
+        return tuple(sorted((to_python(user_id), to_python(other_user_id)), key=str))
+
+    @classmethod
+    def get_or_create_for(cls, sender_id, recipient_id, booking_id=None):
+        """Return the conversation between two users (in either order) about a booking."""
+        from django.db import IntegrityError, transaction
+        participant1_id, participant2_id = cls.ordered_participants(sender_id, recipient_id)
+        pair = {'participant1_id': participant1_id, 'participant2_id': participant2_id, 'booking_id': booking_id}
+        conversation = cls.objects.filter(**pair).first()
+        if conversation is None:
+            try:
+                with transaction.atomic():
+                    conversation = cls.objects.create(**pair)
+            except IntegrityError:
+                # Created concurrently by either participant
+                conversation = cls.objects.get(**pair)
+        return conversation
+
     def get_messages(self):
         """Get all messages in this conversation."""
-        return Message.objects.filter(
-            models.Q(sender=self.participant1, recipient=self.participant2) |
-            models.Q(sender=self.participant2, recipient=self.participant1),
-            booking=self.booking
-        ).order_by('sent_at')
+        return self.messages.order_by('sent_at')
+
+    def get_unread_field(self, user_id):
+        """Return the name of the unread counter field of a participant."""
+        return 'participant1_unread_count' if str(user_id) == str(self.participant1_id) else 'participant2_unread_count'
 
-    @property
     def unread_count(self, user):
         """Get unread message count for a specific user."""
-        return Message.objects.filter(
-            conversation=self,
-            recipient=user,
-            is_read=False
-        ).count()
+        return getattr(self, self.get_unread_field(user.pk))
+
+    def record_message(self, message):
+        """Update the denormalized last message fields and the recipient's unread count."""
+        from django.utils import timezone
+        updates = {
+            'last_message_at': message.sent_at,
+            'last_message_preview': message.message_text[:255],
+            'last_message_sender_id': message.sender_id,
+            'updated_at': timezone.now(),
+        }
+        if not message.is_read:
+            unread_field = self.get_unread_field(message.recipient_id)
+            updates[unread_field] = models.F(unread_field) + 1
+        Conversation.objects.filter(pk=self.pk).update(**updates)
+
+    def adjust_unread(self, user_id, delta):
+        """Add delta to a participant's unread count, never going below zero."""
+        from django.db.models.functions import Greatest
+        unread_field = self.get_unread_field(user_id)
+        Conversation.objects.filter(pk=self.pk).update(
+            **{unread_field: Greatest(models.F(unread_field) + delta, models.Value(0))}
+        )
+
+    def mark_read(self, user):
+        """Mark every message to the user in this conversation as read. Returns the number updated."""
+        from django.db import transaction
+        from django.utils import timezone
+        from .counters import adjust_unread_counts
+        with transaction.atomic():
+            updated = self.messages.filter(recipient=user, is_read=False).update(
+                is_read=True, read_at=timezone.now()
+            )
+            Conversation.objects.filter(pk=self.pk).update(**{self.get_unread_field(user.pk): 0})
+            adjust_unread_counts('messages', {user.pk: -updated})
+        return updated
 
 
 class Notification(models.Model):
@@ -127,6 +262,9 @@ class Notification(models.Model):
     is_read = models.BooleanField(default=False)
     read_at = models.DateTimeField(null=True, blank=True)
 
+    # Set once the notification has been emailed (immediately or in a digest)
+    emailed_at = models.DateTimeField(null=True, blank=True)
+
     # Metadata
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -137,18 +275,52 @@ class Notification(models.Model):
         indexes = [
             models.Index(fields=['user', 'is_read']),
             models.Index(fields=['notification_type']),
+            models.Index(fields=['emailed_at', 'user']),
         ]
 
     def __str__(self):
         return f"{self.notification_type} for {self.user.email}"
 
+    def save(self, *args, **kwargs):
+        """Save the notification and count it as unread for the user when new."""
+        from django.db import transaction
+        from .counters import adjust_unread_counts
+        adding = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if adding and not self.is_read:
+                adjust_unread_counts('notifications', {self.user_id: 1})
+
     def mark_as_read(self):
         """Mark notification as read."""
+        from django.db import transaction
         from django.utils import timezone
+        from .counters import adjust_unread_counts
         if not self.is_read:
             self.is_read = True
             self.read_at = timezone.now()
-            self.save(update_fields=['is_read', 'read_at'])
+            with transaction.atomic():
+                # Conditional update so concurrent reads only decrement the counter once
+                updated = Notification.objects.filter(pk=self.pk, is_read=False).update(
+                    is_read=True, read_at=self.read_at
+                )
+                adjust_unread_counts('notifications', {self.user_id: -updated})
+
+
+class UnreadCounter(models.Model):
+    """Denormalized unread notification and message counts for one user."""
+
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='unread_counter')
+    notifications = models.PositiveIntegerField(default=0)
+    messages = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Unread Counter'
+        verbose_name_plural = 'Unread Counters'
+
+    def __str__(self):
+        return f"Unread counts for {self.user_id}"
 
 
 class EmailTemplate(models.Model):
@@ -163,6 +335,7 @@ class EmailTemplate(models.Model):
         ('payment_receipt', 'Payment Receipt'),
         ('review_request', 'Review Request'),
         ('maintenance_update', 'Maintenance Update'),
+        ('notification_digest', 'Notification Digest'),
     ]
 
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
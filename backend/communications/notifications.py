@@ -0,0 +1,437 @@
+"""
+Notification service: turns domain events into in-app notifications and emails.
+
+The outbox consumer only enqueues a Celery task; all database and SMTP work
+happens in the worker, in bulk:
+- related bookings, maintenance requests, properties and users are loaded
+  with one query per kind for the whole batch,
+- notifications are inserted with bulk_create and the recipients' unread
+  counters are bumped with one UPDATE,
+- each EmailTemplate is compiled once per batch and rendered per recipient,
+- emails go out over one SMTP connection and EmailLog rows are bulk-created.
+
+Users on an hourly or daily digest only get the in-app notification at event
+time; send_notification_digest() later emails them one summary per cadence.
+"""
+import logging
+from collections import Counter
+from itertools import groupby
+from operator import itemgetter
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.template import Context, Template
+from django.utils import timezone
+
+from events.realtime import publish_user_events
+
+from .counters import adjust_unread_counts
+from .models import EmailLog, EmailTemplate, Notification
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+# Outbox event types that produce notifications
+NOTIFIED_EVENT_TYPES = {
+    'booking.confirmed',
+    'booking.cancelled',
+    'property.approved',
+    'property.rejected',
+    'maintenance.created',
+    'maintenance.assigned',
+    'maintenance.cancelled',
+    'maintenance.resolved',
+}
+
+
+def enqueue_notifications(events):
+    """
+    Outbox consumer: hand notification-worthy events to a Celery task.
+    Events are passed as plain dicts so the task does not depend on outbox retention.
+    The task is queued when the relay's transaction commits, so a rolled-back
+    batch (which the next relay run delivers again) queues nothing.
+    """
+    from .tasks import send_event_notifications
+
+    relevant = [
+        {
+            'event_type': event.event_type,
+            'aggregate_id': event.aggregate_id,
+            'payload': event.payload,
+        }
+        for event in events if event.event_type in NOTIFIED_EVENT_TYPES
+    ]
+    if relevant:
+        transaction.on_commit(lambda: send_event_notifications.delay(relevant))
+
+
+def _frontend_link(path):
+    return f"{settings.FRONTEND_URL.rstrip('/')}{path}"
+
+
+class _BatchContext:
+    """Related objects for a batch of events, each kind loaded with a single query."""
+
+    def __init__(self, events):
+        from bookings.models import Booking
+        from maintenance.models import MaintenanceRequest
+        from properties.models import Property
+
+        ids = {'booking': set(), 'maintenance': set(), 'property': set()}
+        for event in events:
+            ids[event['event_type'].split('.')[0]].add(event['aggregate_id'])
+
+        # Keyed by the string form of the primary key, as carried by outbox events
+        self.objects = {
+            'booking': {
+                str(pk): obj for pk, obj in
+                Booking.objects.select_related('property').in_bulk(ids['booking']).items()
+            },
+            'maintenance': {
+                str(pk): obj for pk, obj in
+                MaintenanceRequest.objects.select_related('rental_property', 'service_catalog').in_bulk(ids['maintenance']).items()
+            },
+            'property': {
+                str(pk): obj for pk, obj in Property.objects.in_bulk(ids['property']).items()
+            },
+        }
+        self._admin_ids = None
+
+    @property
+    def admin_ids(self):
+        if self._admin_ids is None:
+            self._admin_ids = list(
+                User.objects.filter(role='admin', is_active=True).values_list('id', flat=True)
+            )
+        return self._admin_ids
+
+    def get(self, event):
+        """Return the object an event refers to, or None if it was deleted since."""
+        return self.objects[event['event_type'].split('.')[0]].get(event['aggregate_id'])
+
+
+def _build_specs(event, obj, batch):
+    """
+    Return (recipient_id, spec) pairs for one event.
+    A spec holds the notification fields, the email template type and its context.
+    """
+    event_type = event['event_type']
+    specs = []
+
+    if event_type.startswith('booking.'):
+        booking = obj
+        context = {
+            'property_title': booking.property.title,
+            'check_in': booking.check_in,
+            'check_out': booking.check_out,
+            'total_price': booking.total_price,
+            'booking_id': booking.id,
+        }
+        if event_type == 'booking.confirmed':
+            specs.append((booking.tenant_id, {
+                'notification_type': 'booking_confirmed',
+                'title': 'Booking confirmed',
+                'message': f'Your booking at {booking.property.title} from {booking.check_in} to {booking.check_out} is confirmed.',
+                'link': _frontend_link('/tenant/bookings'),
+                'booking': booking,
+                'template_type': 'booking_confirmation',
+                'context': context,
+            }))
+        else:
+            reason = event['payload'].get('reason') or booking.cancellation_reason or ''
+            message = f'The booking at {booking.property.title} from {booking.check_in} to {booking.check_out} was cancelled.'
+            if reason:
+                message += f' Reason: {reason}'
+            for recipient_id, path in ((booking.tenant_id, '/tenant/bookings'), (booking.property.landlord_id, '/landlord/bookings')):
+                specs.append((recipient_id, {
+                    'notification_type': 'booking_cancelled',
+                    'title': 'Booking cancelled',
+                    'message': message,
+                    'link': _frontend_link(path),
+                    'booking': booking,
+                    'template_type': None,
+                    'context': context,
+                }))
+
+    elif event_type.startswith('property.'):
+        prop = obj
+        if event_type == 'property.approved':
+            title, message = 'Property approved', f'{prop.title} is approved and now visible to tenants.'
+            notification_type = 'property_approved'
+        else:
+            title = 'Property rejected'
+            message = f'{prop.title} was not approved. Reason: {prop.rejection_reason}'
+            notification_type = 'system'
+        specs.append((prop.landlord_id, {
+            'notification_type': notification_type,
+            'title': title,
+            'message': message,
+            'link': _frontend_link('/landlord/properties'),
+            'booking': None,
+            'template_type': None,
+            'context': {'property_title': prop.title},
+        }))
+
+    elif event_type.startswith('maintenance.'):
+        request = obj
+        service_name = request.service_catalog.name if request.service_catalog_id else request.title
+        context = {
+            'property_title': request.rental_property.title,
+            'service_name': service_name,
+            'status': request.get_status_display(),
+            'requested_date': request.requested_date,
+        }
+        if event_type == 'maintenance.created':
+            for admin_id in batch.admin_ids:
+                specs.append((admin_id, {
+                    'notification_type': 'maintenance_request',
+                    'title': 'New service booking',
+                    'message': f'{service_name} requested for {request.rental_property.title}.',
+                    'link': _frontend_link('/admin/service-bookings'),
+                    'booking': None,
+                    'template_type': None,
+                    'context': context,
+                }))
+        else:
+            messages = {
+                'maintenance.assigned': ('Service booking confirmed', f'{service_name} at {request.rental_property.title} has been confirmed.'),
+                'maintenance.cancelled': ('Service booking rejected', f'{service_name} at {request.rental_property.title} was rejected. {request.admin_rejection_reason}'.strip()),
+                'maintenance.resolved': ('Service completed', f'{service_name} at {request.rental_property.title} has been resolved.'),
+            }
+            title, message = messages[event_type]
+            specs.append((request.reported_by_id, {
+                'notification_type': 'maintenance_resolved' if event_type == 'maintenance.resolved' else 'maintenance_request',
+                'title': title,
+                'message': message,
+                'link': _frontend_link('/landlord/services'),
+                'booking': None,
+                'template_type': 'maintenance_update',
+                'context': context,
+            }))
+
+    return specs
+
+
+class _CompiledTemplate:
+    """An EmailTemplate compiled once and rendered per recipient."""
+
+    def __init__(self, email_template):
+        self.email_template = email_template
+        self.subject = Template(email_template.subject)
+        self.body_text = Template(email_template.body_text)
+        self.body_html = Template(email_template.body_html) if email_template.body_html else None
+
+    def render(self, context):
+        context = Context(context, autoescape=False)
+        subject = ' '.join(self.subject.render(context).split())
+        body_text = self.body_text.render(context)
+        context.autoescape = True
+        body_html = self.body_html.render(context) if self.body_html else None
+        return subject, body_text, body_html
+
+
+def deliver_event_notifications(events):
+    """
+    Create notifications and send emails for a batch of events.
+    Returns a summary with the number of notifications created and emails sent/failed.
+    """
+    batch = _BatchContext(events)
+
+    pending = []
+    for event in events:
+        obj = batch.get(event)
+        if obj is None:
+            continue
+        pending.extend(_build_specs(event, obj, batch))
+
+    if not pending:
+        return {'notifications': 0, 'emails_sent': 0, 'emails_failed': 0}
+
+    recipients = User.objects.filter(is_active=True).in_bulk({recipient_id for recipient_id, _ in pending})
+    pending = [(recipients[recipient_id], spec) for recipient_id, spec in pending if recipient_id in recipients]
+
+    # Users on an hourly/daily digest get their email from send_notification_digest later
+    now = timezone.now()
+    with transaction.atomic():
+        Notification.objects.bulk_create([
+            Notification(
+                user=user,
+                notification_type=spec['notification_type'],
+                title=spec['title'],
+                message=spec['message'],
+                link=spec['link'],
+                booking=spec['booking'],
+                emailed_at=now if user.email_digest_frequency == 'immediate' else None,
+            )
+            for user, spec in pending
+        ], batch_size=settings.NOTIFICATION_BATCH_SIZE)
+        new_counts = Counter(user.id for user, _ in pending)
+        adjust_unread_counts('notifications', new_counts)
+        publish_user_events([
+            (user_id, 'notification.created', {'count': count})
+            for user_id, count in new_counts.items()
+        ])
+
+    sent, failed = send_notification_emails([
+        (user, spec) for user, spec in pending if user.email_digest_frequency == 'immediate'
+    ])
+    return {'notifications': len(pending), 'emails_sent': sent, 'emails_failed': failed}
+
+
+def send_notification_emails(pending):
+    """
+    Send one email per (user, spec) over a single SMTP connection and bulk-log the results.
+    Templates are loaded with one query and compiled once; specs without an active
+    template fall back to the notification title and message.
+    Returns (sent, failed).
+    """
+    template_types = {spec['template_type'] for _, spec in pending if spec['template_type']}
+    compiled = {
+        template.template_type: _CompiledTemplate(template)
+        for template in EmailTemplate.objects.filter(template_type__in=template_types, is_active=True)
+    }
+
+    outgoing = []
+    for user, spec in pending:
+        if not user.email:
+            continue
+        template = compiled.get(spec['template_type'])
+        if template:
+            subject, body_text, body_html = template.render({
+                'recipient_email': user.email,
+                'title': spec['title'],
+                'message': spec['message'],
+                'link': spec['link'],
+                **spec['context'],
+            })
+        else:
+            subject, body_text, body_html = spec['title'], f"{spec['message']}\n\n{spec['link']}", None
+
+        message = EmailMultiAlternatives(subject, body_text, settings.DEFAULT_FROM_EMAIL, [user.email])
+        if body_html:
+            message.attach_alternative(body_html, 'text/html')
+        log = EmailLog(
+            recipient=user,
+            template=template.email_template if template else None,
+            subject=subject[:255],
+            body=body_text,
+            recipient_email=user.email,
+        )
+        outgoing.append((message, log))
+
+    return _send_and_log(outgoing)
+
+
+def _send_and_log(outgoing):
+    """
+    Send (message, EmailLog) pairs over a single SMTP connection and bulk-create the logs.
+    Messages are sent individually on the connection so a rejected recipient is
+    logged as failed without aborting the rest. Returns (sent, failed).
+    """
+    if not outgoing:
+        return 0, 0
+
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as e:
+        logger.exception('Could not open email connection')
+        for _, log in outgoing:
+            log.status = 'failed'
+            log.error_message = str(e)
+    else:
+        try:
+            for message, log in outgoing:
+                try:
+                    connection.send_messages([message])
+                    log.status = 'sent'
+                    log.sent_at = timezone.now()
+                except Exception as e:
+                    log.status = 'failed'
+                    log.error_message = str(e)
+        finally:
+            connection.close()
+
+    EmailLog.objects.bulk_create([log for _, log in outgoing], batch_size=settings.NOTIFICATION_BATCH_SIZE)
+    sent = sum(1 for _, log in outgoing if log.status == 'sent')
+    return sent, len(outgoing) - sent
+
+
+def _render_digest(template, user_email, items):
+    """Render one digest email for a user's pending notifications."""
+    if template:
+        return template.render({
+            'recipient_email': user_email,
+            'notifications': items,
+            'count': len(items),
+        })
+
+    lines = [f'You have {len(items)} new notification{"s" if len(items) != 1 else ""} on Propertree:', '']
+    for item in items:
+        lines.append(f"- {item['title']}: {item['message']}")
+        if item['link']:
+            lines.append(f"  {item['link']}")
+    subject = f'Propertree: {len(items)} new notification{"s" if len(items) != 1 else ""}'
+    return subject, '\n'.join(lines), None
+
+
+def send_notification_digest(frequency):
+    """
+    Email each user on the given digest cadence one summary of their unread,
+    not yet emailed notifications.
+    The pending set for all users is read in a single query ordered by user and
+    streamed, one group per user; the included notifications are then stamped
+    emailed_at so they are not sent again. Returns a summary dict.
+    """
+    template = EmailTemplate.objects.filter(template_type='notification_digest', is_active=True).first()
+    compiled = _CompiledTemplate(template) if template else None
+
+    pending = Notification.objects.filter(
+        user__email_digest_frequency=frequency,
+        user__is_active=True,
+        is_read=False,
+        emailed_at__isnull=True
+    ).order_by('user_id', 'created_at').values(
+        'id', 'user_id', 'user__email', 'notification_type', 'title', 'message', 'link', 'created_at'
+    )
+
+    outgoing = []
+    notification_ids = []
+    for user_id, rows in groupby(pending.iterator(chunk_size=settings.NOTIFICATION_BATCH_SIZE), key=itemgetter('user_id')):
+        items = list(rows)
+        user_email = items[0]['user__email']
+        notification_ids.extend(item['id'] for item in items)
+        if not user_email:
+            continue
+
+        subject, body_text, body_html = _render_digest(compiled, user_email, items)
+        message = EmailMultiAlternatives(subject, body_text, settings.DEFAULT_FROM_EMAIL, [user_email])
+        if body_html:
+            message.attach_alternative(body_html, 'text/html')
+        log = EmailLog(
+            recipient_id=user_id,
+            template=template,
+            subject=subject[:255],
+            body=body_text,
+            recipient_email=user_email,
+        )
+        outgoing.append((message, log))
+
+    sent, failed = _send_and_log(outgoing)
+
+    # Failed sends are logged in EmailLog and not retried in the next digest
+    now = timezone.now()
+    batch_size = settings.NOTIFICATION_BATCH_SIZE
+    for start in range(0, len(notification_ids), batch_size):
+        Notification.objects.filter(id__in=notification_ids[start:start + batch_size]).update(emailed_at=now)
+
+    return {
+        'frequency': frequency,
+        'users': len(outgoing),
+        'notifications': len(notification_ids),
+        'emails_sent': sent,
+        'emails_failed': failed,
+    }
@@ -0,0 +1,113 @@
+"""
+Keyset pagination for the inbox and message threads.
+"""
+import base64
+import heapq
+import itertools
+import json
+from operator import attrgetter
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+
+class KeysetPagination(BasePagination):
+    """
+    Newest-first pagination on a unique (value, tiebreak) ordering such as (sent_at, id).
+    The cursor holds the last row's key, so every page is one index range scan of
+    page_size + 1 rows no matter how far back the client pages.
+
+    A view whose rows are an OR across two indexed columns (which neither index can
+    serve) defines get_keyset_partitions(queryset), returning disjoint querysets that
+    each use one index; every partition is paged on its own and the results merged.
+    """
+
+    ordering = None
+    page_size = api_settings.PAGE_SIZE
+    max_page_size = 100
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except ValueError:
+            return self.page_size
+        return max(1, min(page_size, self.max_page_size))
+
+    def encode_cursor(self, instance):
+        field, tiebreak = self.ordering
+        key = [getattr(instance, field).isoformat(), str(getattr(instance, tiebreak))]
+        return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+    def decode_cursor(self, cursor, model):
+        field, tiebreak = self.ordering
+        try:
+            value, tiebreak_value = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            return (
+                model._meta.get_field(field).to_python(value),
+                model._meta.get_field(tiebreak).to_python(tiebreak_value),
+            )
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_partitions(self, queryset, view):
+        if view is not None and hasattr(view, 'get_keyset_partitions'):
+            return view.get_keyset_partitions(queryset)
+        return [queryset]
+
+    def get_partition_rows(self, queryset, key, page_size):
+        """Return up to page_size rows of one partition after the cursor key, newest first."""
+        field, tiebreak = self.ordering
+        if key is not None:
+            value, tiebreak_value = key
+            # The redundant <= bound keeps the seek an index range condition
+            queryset = queryset.filter(**{f'{field}__lte': value}).filter(
+                Q(**{f'{field}__lt': value}) | Q(**{field: value, f'{tiebreak}__lt': tiebreak_value})
+            )
+        return list(queryset.order_by(f'-{field}', f'-{tiebreak}')[:page_size])
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        key = self.decode_cursor(cursor, queryset.model) if cursor else None
+
+        partitions = [
+            self.get_partition_rows(partition, key, page_size + 1)
+            for partition in self.get_partitions(queryset, view)
+        ]
+        merged = heapq.merge(*partitions, key=attrgetter(*self.ordering), reverse=True)
+        rows = list(itertools.islice(merged, page_size + 1))
+        self.page = rows[:page_size]
+        self.has_next = len(rows) > page_size
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        params = self.request.query_params.copy()
+        params[self.cursor_query_param] = self.encode_cursor(self.page[-1])
+        return self.request.build_absolute_uri(f'{self.request.path}?{params.urlencode()}')
+
+    def get_paginated_response(self, data):
+        return Response({'next': self.get_next_link(), 'results': data})
+
+
+class InboxPagination(KeysetPagination):
+    """Conversations by most recent message."""
+
+    ordering = ('last_message_at', 'id')
+
+
+class ThreadPagination(KeysetPagination):
+    """Messages of a conversation, newest first."""
+
+    ordering = ('sent_at', 'id')
+    page_size = 50
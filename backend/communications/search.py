@@ -0,0 +1,44 @@
+"""
+Full-text search over message subjects and bodies.
+"""
+from django.contrib.postgres.search import SearchRank
+from django.db.models import F
+
+from propertree.search import build_search_query, highlight, render_highlight
+
+from .models import message_search_vector
+
+
+def search_messages(queryset, text, limit):
+    """
+    Return the best `limit` matches in `queryset` as dicts, ranked with ts_rank.
+    The filter uses the same expression as the GIN index, and headlines are only
+    computed for the returned rows.
+    """
+    query = build_search_query(text)
+    rows = queryset.alias(
+        search=message_search_vector()
+    ).filter(
+        search=query
+    ).annotate(
+        rank=SearchRank(F('search'), query),
+        subject_highlight=highlight('subject', query, highlight_all=True),
+        snippet=highlight('message_text', query, max_words=35, min_words=15, max_fragments=2)
+    ).order_by('-rank', '-sent_at').values(
+        'id', 'conversation_id', 'sender_id', 'recipient_id', 'sent_at',
+        'rank', 'subject_highlight', 'snippet'
+    )[:limit]
+
+    return [
+        {
+            'id': row['id'],
+            'conversation_id': row['conversation_id'],
+            'sender_id': row['sender_id'],
+            'recipient_id': row['recipient_id'],
+            'sent_at': row['sent_at'],
+            'rank': round(row['rank'], 4),
+            'subject': render_highlight(row['subject_highlight']),
+            'snippet': render_highlight(row['snippet']),
+        }
+        for row in rows
+    ]
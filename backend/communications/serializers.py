@@ -2,7 +2,8 @@
 Serializers for Communications app.
 """
 from rest_framework import serializers
-from .models import Message, Notification
+from .models import Conversation, Message, Notification
+from propertree.tracing import TracedListSerializer
 
 
 class MessageSerializer(serializers.ModelSerializer):
@@ -10,8 +11,9 @@ class MessageSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Message
+        list_serializer_class = TracedListSerializer
         fields = '__all__'
-        read_only_fields = ['id', 'sender', 'sent_at', 'is_read', 'read_at']
+        read_only_fields = ['id', 'conversation', 'sender', 'sent_at', 'is_read', 'read_at']
 
 
 class NotificationSerializer(serializers.ModelSerializer):
@@ -19,5 +21,29 @@ class NotificationSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Notification
+        list_serializer_class = TracedListSerializer
         fields = '__all__'
         read_only_fields = ['id', 'user', 'created_at', 'is_read', 'read_at']
+
+
+class ConversationSerializer(serializers.ModelSerializer):
+    """Inbox entry: the other participant, last message preview and the user's unread count."""
+
+    other_participant = serializers.SerializerMethodField()
+    unread_count = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Conversation
+        list_serializer_class = TracedListSerializer
+        fields = [
+            'id', 'booking', 'other_participant', 'last_message_at', 'last_message_preview',
+            'last_message_sender', 'unread_count', 'created_at'
+        ]
+
+    def get_other_participant(self, obj):
+        user = self.context['request'].user
+        other = obj.participant2 if obj.participant1_id == user.pk else obj.participant1
+        return {'id': str(other.id), 'email': other.email, 'role': other.role}
+
+    def get_unread_count(self, obj):
+        return obj.unread_count(self.context['request'].user)
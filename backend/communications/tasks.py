@@ -0,0 +1,18 @@
+"""
+Celery tasks for Communications app.
+"""
+from celery import shared_task
+
+from .notifications import deliver_event_notifications, send_notification_digest
+
+
+@shared_task
+def send_event_notifications(events):
+    """Create notifications and send emails for a batch of outbox events."""
+    return deliver_event_notifications(events)
+
+
+@shared_task
+def send_notification_digests(frequency):
+    """Flush pending notifications as one digest email per user on the 'hourly' or 'daily' cadence."""
+    return send_notification_digest(frequency)
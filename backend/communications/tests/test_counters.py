@@ -0,0 +1,90 @@
+"""
+Tests for the per-user unread counters.
+"""
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from propertree.tests.dataset import build_dataset
+
+from ..counters import _upsert_counters, adjust_unread_counts, get_unread_counts, rebuild_unread_counters
+from ..models import Message, Notification, UnreadCounter
+
+
+class UnreadCounterTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = build_dataset()
+        cls.tenant, cls.landlord = cls.data['tenant'], cls.data['landlord']
+
+    def table_counts(self, user):
+        return {
+            'notifications': Notification.objects.filter(user=user, is_read=False).count(),
+            'messages': Message.objects.filter(recipient=user, is_read=False).count(),
+        }
+
+    def counter(self, user):
+        return UnreadCounter.objects.filter(user=user).values('notifications', 'messages').first()
+
+    def send(self, text='Hello'):
+        return Message.objects.create(sender=self.landlord, recipient=self.tenant, message_text=text)
+
+    def test_counters_follow_creation_and_reads(self):
+        rebuild_unread_counters([self.tenant.pk])
+        message = self.send()
+        notification = Notification.objects.create(user=self.tenant, notification_type='system', title='Hi', message='Hi')
+        self.assertEqual(self.counter(self.tenant), self.table_counts(self.tenant))
+
+        message.mark_as_read()
+        message.mark_as_read()
+        notification.mark_as_read()
+        self.assertEqual(self.counter(self.tenant), self.table_counts(self.tenant))
+
+    def test_first_adjustment_counts_existing_unread_rows(self):
+        UnreadCounter.objects.filter(user=self.tenant).delete()
+        unread_before = self.table_counts(self.tenant)['messages']
+        self.assertGreater(unread_before, 0)
+
+        self.send()
+
+        self.assertEqual(self.counter(self.tenant), self.table_counts(self.tenant))
+        self.assertEqual(self.counter(self.tenant)['messages'], unread_before + 1)
+
+    def test_upsert_adds_delta_to_a_row_inserted_concurrently(self):
+        # A row inserted by another transaction between the UPDATE and the INSERT keeps its value plus the delta
+        UnreadCounter.objects.update_or_create(user=self.tenant, defaults={'messages': 7, 'notifications': 3})
+
+        _upsert_counters([self.tenant.pk], 'messages', 1, timezone.now())
+        _upsert_counters([self.tenant.pk], 'notifications', -5, timezone.now())
+
+        self.assertEqual(self.counter(self.tenant), {'notifications': 0, 'messages': 8})
+
+    def test_adjust_accepts_string_ids_without_double_counting(self):
+        rebuild_unread_counters([self.tenant.pk])
+        before = self.counter(self.tenant)['messages']
+
+        adjust_unread_counts('messages', {str(self.tenant.pk): 2})
+
+        self.assertEqual(self.counter(self.tenant)['messages'], before + 2)
+
+    def test_missing_row_is_counted_on_first_read_and_rebuild_repairs_drift(self):
+        UnreadCounter.objects.filter(user=self.tenant).delete()
+        self.assertEqual(get_unread_counts(self.tenant), self.table_counts(self.tenant))
+
+        UnreadCounter.objects.filter(user=self.tenant).update(messages=99)
+        self.assertEqual(rebuild_unread_counters([str(self.tenant.pk)]), 1)
+        self.assertEqual(self.counter(self.tenant), self.table_counts(self.tenant))
+
+    def test_endpoint_and_mark_all_read(self):
+        client = APIClient()
+        client.force_authenticate(self.tenant)
+
+        response = client.get(reverse('unread_counts'))
+        self.assertEqual(response.data, self.table_counts(self.tenant))
+
+        client.post(reverse('notification_mark_all_read'))
+        response = client.get(reverse('unread_counts'))
+        self.assertEqual(response.data['notifications'], 0)
+        self.assertEqual(response.data, self.table_counts(self.tenant))
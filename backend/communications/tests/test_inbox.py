@@ -0,0 +1,171 @@
+"""
+Tests for the inbox: keyset paging over both participant columns and the per-conversation unread counts.
+"""
+import uuid
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from propertree.tests.dataset import create_user
+from users.models import CustomUser
+
+from ..models import Conversation, Message
+
+
+def create_user_with_id(email, id_value):
+    """Create a user with a fixed ID, to control which participant column they land in."""
+    return CustomUser.objects.create_user(
+        email=email, password='budget-pass-123', role='landlord', id=uuid.UUID(int=id_value)
+    )
+
+
+class InboxPaginationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user('ivy.inbox@example.com', 'tenant')
+        # IDs below and above any uuid4, so the user is participant1 in some conversations and participant2 in others
+        others = [
+            create_user_with_id(f'olly.other{i}@example.com', (1 << 128) - 1 - i if i % 2 else i + 1)
+            for i in range(8)
+        ]
+        now = timezone.now()
+        cls.expected = []
+        for i, other in enumerate(others[:7]):
+            # Most conversations share the same timestamp
+            participant1_id, participant2_id = Conversation.ordered_participants(cls.user.pk, other.pk)
+            last_message_at = now if i < 5 else now - timedelta(hours=i)
+            conversation = Conversation.objects.create(
+                participant1_id=participant1_id, participant2_id=participant2_id, last_message_at=last_message_at
+            )
+            cls.expected.append((last_message_at, conversation.id))
+
+        # Conversations of other users and ones without messages are not listed
+        Conversation.objects.create(participant1=others[0], participant2=others[1], last_message_at=now)
+        Conversation.objects.create(participant1=cls.user, participant2=others[7])
+
+        cls.expected = [conversation_id for _, conversation_id in sorted(cls.expected, reverse=True)]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_user_is_on_both_participant_columns(self):
+        listed = Conversation.objects.filter(id__in=self.expected)
+        self.assertEqual(listed.filter(participant1=self.user).count(), 3)
+        self.assertEqual(listed.filter(participant2=self.user).count(), 4)
+
+    def test_pages_cover_every_conversation_once_across_equal_timestamps(self):
+        url, seen = f"{reverse('conversation_list')}?page_size=2", []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.data['results']), 2)
+            seen += [result['id'] for result in response.data['results']]
+            url = response.data['next']
+
+        self.assertEqual(seen, [str(conversation_id) for conversation_id in self.expected])
+
+    def test_each_participant_column_is_paged_separately(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(f"{reverse('conversation_list')}?page_size=3")
+
+        inbox_queries = [q['sql'] for q in queries if 'communications_conversation' in q['sql']]
+        self.assertEqual(len(inbox_queries), 2)
+        for sql in inbox_queries:
+            self.assertIn('LIMIT 4', sql)
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get(f"{reverse('conversation_list')}?cursor=not-a-cursor")
+        self.assertEqual(response.status_code, 404)
+
+
+class ConversationUnreadTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.tenant = create_user('tom.tenant@example.com', 'tenant')
+        cls.landlord = create_user('lily.landlord@example.com', 'landlord')
+
+    def send(self, sender, recipient, text='Hello'):
+        return Message.objects.create(sender=sender, recipient=recipient, message_text=text)
+
+    def test_messages_count_for_their_recipient_only(self):
+        first = self.send(self.landlord, self.tenant, 'First')
+        self.send(self.landlord, self.tenant, 'Second')
+        self.send(self.tenant, self.landlord, 'Reply')
+
+        conversation = Conversation.objects.get(pk=first.conversation_id)
+        self.assertEqual(conversation.unread_count(self.tenant), 2)
+        self.assertEqual(conversation.unread_count(self.landlord), 1)
+        self.assertEqual(conversation.last_message_preview, 'Reply')
+        self.assertEqual(conversation.last_message_sender_id, self.tenant.pk)
+
+    def test_reading_decrements_once_and_never_below_zero(self):
+        message = self.send(self.landlord, self.tenant)
+        conversation = message.conversation
+
+        message.mark_as_read()
+        Message.objects.get(pk=message.pk).mark_as_read()
+        conversation.refresh_from_db()
+        self.assertEqual(conversation.unread_count(self.tenant), 0)
+
+        conversation.adjust_unread(self.tenant.pk, -3)
+        conversation.refresh_from_db()
+        self.assertEqual(conversation.unread_count(self.tenant), 0)
+
+    def test_mark_read_endpoint_clears_the_users_side(self):
+        message = self.send(self.landlord, self.tenant)
+        self.send(self.landlord, self.tenant)
+        self.send(self.tenant, self.landlord)
+
+        client = APIClient()
+        client.force_authenticate(self.tenant)
+        response = client.post(reverse('conversation_mark_read', args=[message.conversation_id]))
+        self.assertEqual(response.data['updated'], 2)
+
+        conversation = Conversation.objects.get(pk=message.conversation_id)
+        self.assertEqual(conversation.unread_count(self.tenant), 0)
+        self.assertEqual(conversation.unread_count(self.landlord), 1)
+        inbox = client.get(reverse('conversation_list')).data['results']
+        self.assertEqual(inbox[0]['unread_count'], 0)
+
+
+class ConversationPairTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.low = create_user_with_id('lou.low@example.com', 1)
+        cls.high = create_user_with_id('hal.high@example.com', (1 << 128) - 1)
+
+    def test_both_directions_share_one_canonical_conversation(self):
+        first = Message.objects.create(sender=self.high, recipient=self.low, message_text='Hi')
+        reply = Message.objects.create(sender=self.low, recipient=self.high, message_text='Hello')
+
+        self.assertEqual(first.conversation_id, reply.conversation_id)
+        conversation = Conversation.objects.get()
+        self.assertEqual((conversation.participant1_id, conversation.participant2_id), (self.low.pk, self.high.pk))
+        self.assertEqual(conversation.unread_count(self.low), 1)
+        self.assertEqual(conversation.unread_count(self.high), 1)
+
+    def test_pair_without_booking_is_unique(self):
+        Conversation.get_or_create_for(self.low.pk, self.high.pk)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Conversation.objects.create(participant1=self.low, participant2=self.high, booking=None)
+
+    def test_reversed_pair_is_rejected(self):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Conversation.objects.create(participant1=self.high, participant2=self.low)
+
+    def test_concurrent_creation_falls_back_to_the_existing_row(self):
+        existing = Conversation.objects.create(participant1=self.low, participant2=self.high)
+        # As if the lookup ran before the other transaction's insert committed
+        with patch('django.db.models.query.QuerySet.first', return_value=None):
+            conversation = Conversation.get_or_create_for(str(self.high.pk), str(self.low.pk))
+        self.assertEqual(conversation.pk, existing.pk)
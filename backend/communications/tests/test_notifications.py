@@ -0,0 +1,54 @@
+"""
+Tests for the notification outbox consumer.
+"""
+from unittest.mock import patch
+
+from django.db import transaction
+from django.test import TestCase, override_settings
+
+from events.models import OutboxEvent
+from events.outbox import record_event
+from events.relay import relay_pending_events
+from propertree.tests.dataset import build_dataset
+
+from ..tasks import send_event_notifications
+
+
+@override_settings(OUTBOX_CONSUMERS=['communications.notifications.enqueue_notifications'])
+class EnqueueNotificationsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = build_dataset(rows=1)
+
+    def setUp(self):
+        OutboxEvent.objects.all().delete()
+        with transaction.atomic():
+            record_event('booking.confirmed', self.data['booking'])
+            record_event('booking.created', self.data['booking'])
+        patcher = patch.object(send_event_notifications, 'delay')
+        self.delay = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_task_is_queued_after_the_relay_commits(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            relay_pending_events()
+            self.delay.assert_not_called()
+
+        for callback in callbacks:
+            callback()
+        self.delay.assert_called_once()
+        [events] = self.delay.call_args.args
+        self.assertEqual([event['event_type'] for event in events], ['booking.confirmed'])
+
+    def test_rolled_back_relay_queues_nothing(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    relay_pending_events()
+                    raise RuntimeError('relay transaction aborted')
+            except RuntimeError:
+                pass
+
+        self.delay.assert_not_called()
+        self.assertEqual(OutboxEvent.objects.filter(processed_at__isnull=True).count(), 2)
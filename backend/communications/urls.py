@@ -3,20 +3,34 @@ URL configuration for Communications app.
 """
 from django.urls import path
 from .views import (
+    ConversationListView,
+    ConversationMessageListView,
+    ConversationMarkReadView,
     MessageListCreateView,
     MessageDetailView,
+    MessageSearchView,
     NotificationListView,
     NotificationMarkReadView,
-    NotificationMarkAllReadView
+    NotificationMarkAllReadView,
+    UnreadCountsView
 )
 
 urlpatterns = [
     # Messages
     path('', MessageListCreateView.as_view(), name='message_list_create'),
     path('<uuid:pk>/', MessageDetailView.as_view(), name='message_detail'),
+    path('search/', MessageSearchView.as_view(), name='message_search'),
+
+    # Conversations (inbox and threads)
+    path('conversations/', ConversationListView.as_view(), name='conversation_list'),
+    path('conversations/<uuid:pk>/messages/', ConversationMessageListView.as_view(), name='conversation_messages'),
+    path('conversations/<uuid:pk>/read/', ConversationMarkReadView.as_view(), name='conversation_mark_read'),
 
     # Notifications
     path('notifications/', NotificationListView.as_view(), name='notification_list'),
     path('notifications/<uuid:pk>/read/', NotificationMarkReadView.as_view(), name='notification_mark_read'),
     path('notifications/read-all/', NotificationMarkAllReadView.as_view(), name='notification_mark_all_read'),
+
+    # Unread badge counts
+    path('unread-counts/', UnreadCountsView.as_view(), name='unread_counts'),
 ]
@@ -1,12 +1,20 @@
 """
 Views for Communications app.
 """
+from django.db import transaction
+from django.utils import timezone
+from django.db.models import Q
+from django.shortcuts import get_object_or_404
 from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
-from .models import Message, Notification
-from .serializers import MessageSerializer, NotificationSerializer
+from propertree.search import get_search_params
+from .counters import adjust_unread_counts, get_unread_counts
+from .models import Conversation, Message, Notification
+from .pagination import InboxPagination, ThreadPagination
+from .search import search_messages
+from .serializers import ConversationSerializer, MessageSerializer, NotificationSerializer
 
 
 class MessageListCreateView(generics.ListCreateAPIView):
@@ -45,6 +53,85 @@ class MessageDetailView(generics.RetrieveAPIView):
         return Response(serializer.data)
 
 
+class MessageSearchView(APIView):
+    """API endpoint for full-text search over the user's messages (all messages for admins)."""
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """Return ranked matches with highlighted subject and snippet."""
+        text, limit, error = get_search_params(request)
+        if error:
+            return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+
+        user = request.user
+        queryset = Message.objects.all()
+        if not user.is_admin():
+            queryset = queryset.filter(Q(sender=user) | Q(recipient=user))
+
+        return Response({
+            'query': text,
+            'results': search_messages(queryset, text, limit)
+        }, status=status.HTTP_200_OK)
+
+
+class ConversationListView(generics.ListAPIView):
+    """API endpoint for the inbox: the user's conversations by most recent message."""
+
+    serializer_class = ConversationSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = InboxPagination
+
+    def get_queryset(self):
+        """Return conversations with at least one message that the user takes part in."""
+        user = self.request.user
+        return Conversation.objects.filter(
+            Q(participant1=user) | Q(participant2=user),
+            last_message_at__isnull=False
+        ).select_related('participant1', 'participant2')
+
+    def get_keyset_partitions(self, queryset):
+        """Page the user's side of each (participant, last_message_at, id) index separately."""
+        user = self.request.user
+        return [
+            queryset.filter(participant1=user),
+            queryset.filter(participant2=user).exclude(participant1=user),
+        ]
+
+
+def get_user_conversation(user, pk):
+    """Return a conversation the user takes part in, or raise Http404."""
+    return get_object_or_404(Conversation.objects.filter(Q(participant1=user) | Q(participant2=user)), pk=pk)
+
+
+class ConversationMessageListView(generics.ListAPIView):
+    """API endpoint for the messages of one conversation, newest first."""
+
+    serializer_class = MessageSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = ThreadPagination
+
+    def get_queryset(self):
+        """Return the conversation's messages."""
+        conversation = get_user_conversation(self.request.user, self.kwargs['pk'])
+        return Message.objects.filter(conversation=conversation)
+
+
+class ConversationMarkReadView(APIView):
+    """API endpoint for marking a whole conversation as read."""
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, pk):
+        """Mark the user's unread messages in the conversation as read."""
+        conversation = get_user_conversation(request.user, pk)
+        updated = conversation.mark_read(request.user)
+        return Response({
+            'message': 'Conversation marked as read.',
+            'updated': updated
+        }, status=status.HTTP_200_OK)
+
+
 class NotificationListView(generics.ListAPIView):
     """API endpoint for listing notifications."""
 
@@ -82,7 +169,21 @@ class NotificationMarkAllReadView(APIView):
 
     def post(self, request):
         """Mark all notifications as read."""
-        Notification.objects.filter(user=request.user, is_read=False).update(is_read=True)
+        with transaction.atomic():
+            updated = Notification.objects.filter(user=request.user, is_read=False).update(
+                is_read=True, read_at=timezone.now()
+            )
+            adjust_unread_counts('notifications', {request.user.id: -updated})
         return Response({
             'message': 'All notifications marked as read.'
         }, status=status.HTTP_200_OK)
+
+
+class UnreadCountsView(APIView):
+    """API endpoint for unread notification and message counts (badge polling)."""
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """Return unread counts from the user's counter row."""
+        return Response(get_unread_counts(request.user), status=status.HTTP_200_OK)
@@ -0,0 +1,16 @@
+"""
+Admin configuration for outbox events.
+"""
+from django.contrib import admin
+from .models import OutboxEvent
+
+
+@admin.register(OutboxEvent)
+class OutboxEventAdmin(admin.ModelAdmin):
+    """Read-only admin for inspecting and debugging event delivery."""
+
+    list_display = ('id', 'event_type', 'aggregate_type', 'aggregate_id', 'attempts', 'created_at', 'processed_at')
+    list_filter = ('event_type', 'aggregate_type', 'processed_at')
+    search_fields = ('aggregate_id', 'event_type')
+    ordering = ('-id',)
+    readonly_fields = ('event_type', 'aggregate_type', 'aggregate_id', 'payload', 'delivered_to', 'attempts', 'last_error', 'created_at', 'processed_at')
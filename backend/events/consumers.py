@@ -0,0 +1,22 @@
+"""
+Built-in outbox consumers.
+"""
+import logging
+
+logger = logging.getLogger('propertree.events')
+
+
+def log_events(events):
+    """Analytics consumer: emit one structured log line per event for the log pipeline."""
+    for event in events:
+        logger.info(
+            event.event_type,
+            extra={
+                'event_id': event.id,
+                'event_type': event.event_type,
+                'aggregate_type': event.aggregate_type,
+                'aggregate_id': event.aggregate_id,
+                'payload': event.payload,
+                'occurred_at': event.created_at.isoformat(),
+            }
+        )
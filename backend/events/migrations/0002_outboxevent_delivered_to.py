@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-19 14:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outboxevent',
+            name='delivered_to',
+            field=models.JSONField(blank=True, default=list, help_text='Dotted paths of the consumers that have handled this event'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+"""
+Models for Events app.
+"""
+from django.db import models
+
+
+class OutboxEvent(models.Model):
+    """
+    Transactional outbox entry for a domain state change.
+    Rows are written in the same transaction as the change they describe and
+    delivered to consumers by the relay task, so a committed change is never
+    missed and a rolled-back one is never announced.
+    """
+
+    # Sequential primary key gives the relay a stable delivery order
+    id = models.BigAutoField(primary_key=True)
+
+    event_type = models.CharField(max_length=100, help_text="e.g. booking.confirmed")
+    aggregate_type = models.CharField(max_length=50)
+    aggregate_id = models.CharField(max_length=64)
+    payload = models.JSONField(default=dict, blank=True)
+
+    # Delivery state
+    processed_at = models.DateTimeField(null=True, blank=True)
+    delivered_to = models.JSONField(
+        default=list,
+        blank=True,
+        help_text="Dotted paths of the consumers that have handled this event"
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'outbox_events'
+        verbose_name = 'Outbox Event'
+        verbose_name_plural = 'Outbox Events'
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['processed_at', 'id']),
+            models.Index(fields=['aggregate_type', 'aggregate_id']),
+        ]
+
+    def __str__(self):
+        return f"{self.event_type} {self.aggregate_type}:{self.aggregate_id}"
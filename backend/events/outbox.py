@@ -0,0 +1,29 @@
+"""
+Helpers for writing domain events to the transactional outbox.
+"""
+from django.db import transaction
+
+from .models import OutboxEvent
+
+
+def build_event(event_type, instance, **payload):
+    """Return an unsaved OutboxEvent for a model instance."""
+    return OutboxEvent(
+        event_type=event_type,
+        aggregate_type=instance._meta.model_name,
+        aggregate_id=str(instance.pk),
+        payload=payload,
+    )
+
+
+def record_event(event_type, instance, **payload):
+    """
+    Write an outbox event for a model instance.
+    Must be called inside the transaction that saves the change; raises if
+    there is no open transaction so an event can never outlive a rollback.
+    """
+    if not transaction.get_connection().in_atomic_block:
+        raise RuntimeError('record_event() must be called inside transaction.atomic()')
+    event = build_event(event_type, instance, **payload)
+    event.save()
+    return event
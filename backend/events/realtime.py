@@ -0,0 +1,106 @@
+"""
+Realtime push: per-user events published to Redis pub/sub and streamed to
+browsers over Server-Sent Events by events.views.event_stream.
+
+Events are published after the surrounding transaction commits, so clients
+never see a change that was rolled back. Pub/sub is fire-and-forget: a client
+that is not connected misses the event and refetches when it reconnects.
+Redis errors are logged and never raised into the request that made the change.
+
+Browsers authenticate the stream with a short-lived, single-use ticket from
+issue_stream_ticket(), since EventSource cannot send an Authorization header
+and a JWT in the query string would end up in access logs.
+"""
+import json
+import logging
+import secrets
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+_redis_client = None
+
+
+def user_channel(user_id):
+    """Return the pub/sub channel name of a user."""
+    return f'{settings.REALTIME_CHANNEL_PREFIX}:user:{user_id}'
+
+
+def get_redis():
+    """Return the shared (sync) Redis client used for publishing."""
+    global _redis_client
+    if _redis_client is None:
+        import redis
+        _redis_client = redis.Redis.from_url(
+            settings.REALTIME_REDIS_URL,
+            socket_connect_timeout=1,
+            socket_timeout=1
+        )
+    return _redis_client
+
+
+def encode_event(event_type, data):
+    """Serialize an event for the wire (dates, decimals and UUIDs included)."""
+    return json.dumps({'type': event_type, 'data': data}, cls=DjangoJSONEncoder)
+
+
+def publish_user_events(events):
+    """
+    Publish (user_id, event_type, data) tuples once the current transaction commits.
+    All events are sent in one Redis pipeline.
+    """
+    if not settings.REALTIME_ENABLED:
+        return
+    messages = [
+        (user_channel(user_id), encode_event(event_type, data))
+        for user_id, event_type, data in events
+        if user_id is not None
+    ]
+    if not messages:
+        return
+
+    def publish():
+        import redis
+        try:
+            pipeline = get_redis().pipeline(transaction=False)
+            for channel, message in messages:
+                pipeline.publish(channel, message)
+            pipeline.execute()
+        except redis.RedisError as e:
+            logger.warning('Could not publish %d realtime events: %s', len(messages), e)
+
+    transaction.on_commit(publish)
+
+
+def publish_user_event(user_ids, event_type, data):
+    """Publish the same event to each of the given users after commit."""
+    publish_user_events([(user_id, event_type, data) for user_id in set(user_ids)])
+
+
+def stream_ticket_key(ticket):
+    """Return the Redis key holding the user ID of a stream ticket."""
+    return f'{settings.REALTIME_CHANNEL_PREFIX}:stream-ticket:{ticket}'
+
+
+def issue_stream_ticket(user_id):
+    """
+    Store a random ticket for a user that expires after SSE_TICKET_TTL_SECONDS
+    and return it. Raises redis.RedisError if Redis is unavailable.
+    """
+    ticket = secrets.token_urlsafe(32)
+    get_redis().set(stream_ticket_key(ticket), str(user_id), ex=settings.SSE_TICKET_TTL_SECONDS)
+    return ticket
+
+
+async def redeem_stream_ticket(client, ticket):
+    """
+    Return the user ID of a ticket and delete it in the same MULTI block, so each
+    ticket opens at most one stream; None if it is unknown, used or expired.
+    """
+    key = stream_ticket_key(ticket)
+    async with client.pipeline(transaction=True) as pipeline:
+        user_id, _ = await pipeline.get(key).delete(key).execute()
+    return user_id.decode() if user_id else None
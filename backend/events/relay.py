@@ -0,0 +1,86 @@
+"""
+Outbox relay: delivers pending outbox events to the configured consumers.
+
+A consumer is a callable taking a list of OutboxEvent objects; it is called
+once per batch and should ignore event types it does not handle. Consumers
+are listed by dotted path in settings.OUTBOX_CONSUMERS, and each event records
+the paths of the consumers that have handled it (delivered_to), so a retry
+only reaches the consumers that failed.
+"""
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+
+def get_consumers():
+    """Return the configured consumers as (dotted path, callable) pairs."""
+    return [(path, import_string(path)) for path in settings.OUTBOX_CONSUMERS]
+
+
+def relay_batch(consumers, batch_size):
+    """
+    Deliver one batch of pending events.
+    Rows are locked with SKIP LOCKED so concurrent relays never pick up the same
+    events. Each consumer runs in its own savepoint and receives only the events
+    it has not handled yet; a database error in one consumer is rolled back to
+    its savepoint and does not affect the others or the delivery bookkeeping.
+    Events a consumer failed on are retried for that consumer alone; after
+    OUTBOX_MAX_ATTEMPTS they are closed with the last error kept.
+    Returns the number of events in the batch.
+    """
+    with transaction.atomic():
+        events = list(
+            OutboxEvent.objects.filter(processed_at__isnull=True)
+            .select_for_update(skip_locked=True)
+            .order_by('id')[:batch_size]
+        )
+        if not events:
+            return 0
+
+        errors = {}
+        for path, consumer in consumers:
+            pending = [event for event in events if path not in event.delivered_to]
+            if not pending:
+                continue
+            try:
+                with transaction.atomic():
+                    consumer(pending)
+            except Exception as e:
+                logger.exception('Outbox consumer %s failed', path)
+                for event in pending:
+                    errors[event.id] = f'{path}: {e}'
+            else:
+                for event in pending:
+                    event.delivered_to = event.delivered_to + [path]
+
+        now = timezone.now()
+        for event in events:
+            event.attempts += 1
+            event.last_error = errors.get(event.id, '')
+            if not event.last_error or event.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+                event.processed_at = now
+        OutboxEvent.objects.bulk_update(events, ['delivered_to', 'attempts', 'last_error', 'processed_at'])
+
+    return len(events)
+
+
+def relay_pending_events(max_batches=None):
+    """Drain pending events batch by batch. Returns the number of events handled."""
+    consumers = get_consumers()
+    batch_size = settings.OUTBOX_BATCH_SIZE
+    max_batches = max_batches or settings.OUTBOX_MAX_BATCHES_PER_RUN
+
+    handled = 0
+    for _ in range(max_batches):
+        count = relay_batch(consumers, batch_size)
+        handled += count
+        if count < batch_size:
+            break
+    return handled
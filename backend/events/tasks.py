@@ -0,0 +1,25 @@
+"""
+Celery tasks for Events app.
+"""
+from datetime import timedelta
+
+from celery import shared_task
+from django.conf import settings
+from django.utils import timezone
+
+from .models import OutboxEvent
+from .relay import relay_pending_events
+
+
+@shared_task
+def relay_outbox_events():
+    """Deliver pending outbox events to consumers (run frequently by Celery beat)."""
+    return relay_pending_events()
+
+
+@shared_task
+def purge_processed_outbox_events():
+    """Delete delivered outbox events older than OUTBOX_RETENTION_DAYS."""
+    cutoff = timezone.now() - timedelta(days=settings.OUTBOX_RETENTION_DAYS)
+    deleted, _ = OutboxEvent.objects.filter(processed_at__lt=cutoff).delete()
+    return deleted
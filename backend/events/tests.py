@@ -0,0 +1,256 @@
+"""
+Tests for the transactional outbox relay and the realtime stream tickets.
+"""
+from unittest.mock import patch
+
+from asgiref.sync import sync_to_async
+from django.db import IntegrityError, transaction
+from django.test import AsyncClient, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from propertree.tests.dataset import build_dataset
+
+from .models import OutboxEvent
+from .outbox import record_event
+from .relay import relay_batch, relay_pending_events
+
+# Calls made to the test consumers, as (consumer name, [event ids])
+calls = []
+failures = {'flaky': 0}
+
+
+def recording_consumer(events):
+    calls.append(('recording', [event.id for event in events]))
+
+
+def flaky_consumer(events):
+    """Fails on its first `failures['flaky']` calls."""
+    calls.append(('flaky', [event.id for event in events]))
+    if failures['flaky']:
+        failures['flaky'] -= 1
+        raise RuntimeError('downstream unavailable')
+
+
+def poisoning_consumer(events):
+    """
+    Fails with a database error outside a savepoint, which leaves the
+    enclosing transaction unusable (as any failed statement does on PostgreSQL).
+    """
+    calls.append(('poisoning', [event.id for event in events]))
+    with transaction.atomic(savepoint=False):
+        OutboxEvent.objects.create(id=events[0].id, event_type='duplicate', aggregate_type='x', aggregate_id='x')
+
+
+CONSUMERS = ['events.tests.recording_consumer', 'events.tests.flaky_consumer']
+
+
+@override_settings(OUTBOX_CONSUMERS=CONSUMERS, OUTBOX_MAX_ATTEMPTS=3, OUTBOX_BATCH_SIZE=2)
+class OutboxRelayTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = build_dataset(rows=1)
+
+    def setUp(self):
+        calls.clear()
+        failures['flaky'] = 0
+        OutboxEvent.objects.all().delete()
+        with transaction.atomic():
+            self.events = [record_event('booking.confirmed', self.data['booking'], index=i) for i in range(3)]
+        self.ids = [event.id for event in self.events]
+
+    def test_delivers_all_pending_events_in_batches_in_order(self):
+        self.assertEqual(relay_pending_events(), 3)
+
+        self.assertEqual(calls, [
+            ('recording', self.ids[:2]), ('flaky', self.ids[:2]),
+            ('recording', self.ids[2:]), ('flaky', self.ids[2:]),
+        ])
+        for event in OutboxEvent.objects.all():
+            self.assertIsNotNone(event.processed_at)
+            self.assertEqual(event.delivered_to, CONSUMERS)
+            self.assertEqual(event.attempts, 1)
+
+        self.assertEqual(relay_pending_events(), 0)
+
+    def test_failed_consumer_is_retried_alone(self):
+        failures['flaky'] = 1
+
+        with self.assertLogs('events.relay', 'ERROR'):
+            relay_pending_events(max_batches=1)
+        event = OutboxEvent.objects.get(id=self.ids[0])
+        self.assertIsNone(event.processed_at)
+        self.assertEqual(event.delivered_to, [CONSUMERS[0]])
+        self.assertIn('downstream unavailable', event.last_error)
+
+        calls.clear()
+        relay_pending_events()
+
+        # The consumer that already succeeded is not called again for the first batch
+        self.assertEqual(calls[:1], [('flaky', self.ids[:2])])
+        self.assertNotIn(('recording', self.ids[:2]), calls)
+        event.refresh_from_db()
+        self.assertIsNotNone(event.processed_at)
+        self.assertEqual(event.delivered_to, CONSUMERS)
+        self.assertEqual((event.attempts, event.last_error), (2, ''))
+
+    def test_gives_up_after_max_attempts(self):
+        failures['flaky'] = 100
+
+        consumers = [('events.tests.recording_consumer', recording_consumer), ('events.tests.flaky_consumer', flaky_consumer)]
+        with self.assertLogs('events.relay', 'ERROR'):
+            for _ in range(3):
+                relay_batch(consumers, 2)
+
+        event = OutboxEvent.objects.get(id=self.ids[0])
+        self.assertEqual(event.attempts, 3)
+        self.assertIsNotNone(event.processed_at)
+        self.assertEqual(event.delivered_to, [CONSUMERS[0]])
+        self.assertIn('downstream unavailable', event.last_error)
+        self.assertEqual([name for name, _ in calls].count('recording'), 1)
+
+    @override_settings(OUTBOX_CONSUMERS=['events.tests.poisoning_consumer', 'events.tests.recording_consumer'])
+    def test_database_error_in_consumer_does_not_poison_the_batch(self):
+        with self.assertLogs('events.relay', 'ERROR'):
+            self.assertEqual(relay_pending_events(max_batches=1), 2)
+
+        event = OutboxEvent.objects.get(id=self.ids[0])
+        self.assertEqual(event.attempts, 1)
+        self.assertEqual(event.delivered_to, ['events.tests.recording_consumer'])
+        self.assertIn('events.tests.poisoning_consumer', event.last_error)
+        self.assertIsNone(event.processed_at)
+        self.assertFalse(OutboxEvent.objects.filter(event_type='duplicate').exists())
+
+        # Retries reach only the failing consumer, and stop at the attempt limit
+        calls.clear()
+        with self.assertLogs('events.relay', 'ERROR'):
+            relay_pending_events(max_batches=1)
+            relay_pending_events(max_batches=1)
+        self.assertEqual([name for name, _ in calls], ['poisoning', 'poisoning'])
+        event.refresh_from_db()
+        self.assertEqual(event.attempts, 3)
+        self.assertIsNotNone(event.processed_at)
+
+    def test_rolled_back_change_records_no_event(self):
+        try:
+            with transaction.atomic():
+                record_event('booking.cancelled', self.data['booking'])
+                raise IntegrityError('simulated')
+        except IntegrityError:
+            pass
+        self.assertFalse(OutboxEvent.objects.filter(event_type='booking.cancelled').exists())
+
+
+class FakeRedis:
+    """In-memory stand-in for the sync and asyncio Redis clients used by the ticket flow."""
+
+    def __init__(self):
+        self.values = {}
+        self.expiry = {}
+
+    # sync client
+    def set(self, key, value, ex=None):
+        self.values[key] = value.encode()
+        self.expiry[key] = ex
+
+    # asyncio client
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def pubsub(self):
+        return FakePubSub()
+
+    async def aclose(self):
+        pass
+
+
+class FakePipeline:
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        pass
+
+    def get(self, key):
+        self.commands.append(lambda: self.redis.values.get(key))
+        return self
+
+    def delete(self, key):
+        self.commands.append(lambda: int(self.redis.values.pop(key, None) is not None))
+        return self
+
+    async def execute(self):
+        return [command() for command in self.commands]
+
+
+class FakePubSub:
+
+    async def subscribe(self, channel):
+        pass
+
+
+@override_settings(REALTIME_ENABLED=True, SSE_TICKET_TTL_SECONDS=30)
+class StreamTicketTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = build_dataset(rows=1)['tenant']
+
+    def setUp(self):
+        self.redis = FakeRedis()
+        for target in ('events.realtime.get_redis', 'redis.asyncio.Redis.from_url'):
+            patcher = patch(target, return_value=self.redis)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def issue_ticket(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.post(reverse('event_stream_ticket'))
+        self.assertEqual(response.status_code, 201)
+        return response.data
+
+    def test_ticket_requires_authentication_and_expires(self):
+        self.assertEqual(APIClient().post(reverse('event_stream_ticket')).status_code, 401)
+
+        data = self.issue_ticket()
+        self.assertEqual(data['expires_in'], 30)
+        self.assertEqual(data['stream_url'], f"http://testserver{reverse('event_stream')}?ticket={data['ticket']}")
+        self.assertEqual(list(self.redis.expiry.values()), [30])
+        self.assertEqual(list(self.redis.values.values()), [str(self.user.pk).encode()])
+
+    @override_settings(REALTIME_STREAM_BASE_URL='https://events.example.com/')
+    def test_stream_url_points_at_the_events_service(self):
+        data = self.issue_ticket()
+        self.assertEqual(
+            data['stream_url'], f"https://events.example.com{reverse('event_stream')}?ticket={data['ticket']}"
+        )
+
+    async def test_ticket_opens_one_stream(self):
+        data = await sync_to_async(self.issue_ticket)()
+        client = AsyncClient()
+
+        response = await client.get(data['stream_url'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+
+        reused = await client.get(data['stream_url'])
+        self.assertEqual(reused.status_code, 401)
+        self.assertEqual((await client.get(f"{reverse('event_stream')}?ticket=made-up")).status_code, 401)
+
+    async def test_access_token_is_not_accepted_in_the_url(self):
+        token = await sync_to_async(lambda: str(AccessToken.for_user(self.user)))()
+        client = AsyncClient()
+
+        response = await client.get(f"{reverse('event_stream')}?token={token}")
+        self.assertEqual(response.status_code, 401)
+
+        response = await client.get(reverse('event_stream'), headers={'Authorization': f'Bearer {token}'})
+        self.assertEqual(response.status_code, 200)
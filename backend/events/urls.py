@@ -0,0 +1,10 @@
+"""
+URL configuration for Events app.
+"""
+from django.urls import path
+from .views import StreamTicketView, event_stream
+
+urlpatterns = [
+    path('stream/', event_stream, name='event_stream'),
+    path('stream/ticket/', StreamTicketView.as_view(), name='event_stream_ticket'),
+]
@@ -0,0 +1,135 @@
+"""
+Server-Sent Events stream of a user's realtime events.
+
+The view is async and holds one Redis pub/sub subscription per connection,
+so it must be served by the ASGI application (propertree.asgi); under WSGI
+it answers 501 instead of tying up a worker.
+
+Browsers first POST to the ticket endpoint with their JWT and open the stream
+with ?ticket=; the ticket is short-lived and single-use, so the long-lived
+access token never appears in a URL.
+"""
+import json
+import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+
+from .realtime import issue_stream_ticket, redeem_stream_ticket, user_channel
+
+logger = logging.getLogger(__name__)
+
+
+class StreamTicketView(APIView):
+    """
+    API endpoint that issues a single-use ticket for opening the event stream.
+    The ticket expires after SSE_TICKET_TTL_SECONDS; request a new one for each (re)connection.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        """Return the ticket and the stream URL to pass to EventSource."""
+        import redis
+
+        if not settings.REALTIME_ENABLED:
+            return Response({'error': 'Realtime events are disabled.'}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        try:
+            ticket = issue_stream_ticket(request.user.pk)
+        except redis.RedisError as e:
+            logger.warning('Could not issue a stream ticket: %s', e)
+            return Response({'error': 'Realtime events are unavailable.'}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+        path = f"{reverse('event_stream')}?ticket={ticket}"
+        # The stream is served by the separate ASGI service, not the one answering here
+        base_url = settings.REALTIME_STREAM_BASE_URL.rstrip('/')
+        return Response({
+            'ticket': ticket,
+            'expires_in': settings.SSE_TICKET_TTL_SECONDS,
+            'stream_url': f'{base_url}{path}' if base_url else request.build_absolute_uri(path),
+        }, status=status.HTTP_201_CREATED)
+
+
+def _authenticate_header(request):
+    """Return the user for a JWT access token in the Authorization header, or None."""
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = authentication.get_raw_token(header) if header else None
+    if not raw_token:
+        return None
+    try:
+        user = authentication.get_user(authentication.get_validated_token(raw_token))
+    except (InvalidToken, AuthenticationFailed):
+        return None
+    return user if user.is_active else None
+
+
+def _get_active_user(user_id):
+    return get_user_model().objects.filter(pk=user_id, is_active=True).first()
+
+
+async def _authenticate(request, client):
+    """Return the user from the Authorization header or a stream ticket (?ticket=), or None."""
+    user = await sync_to_async(_authenticate_header)(request)
+    if user is not None:
+        return user
+    ticket = request.GET.get('ticket')
+    if not ticket:
+        return None
+    user_id = await redeem_stream_ticket(client, ticket)
+    return await sync_to_async(_get_active_user)(user_id) if user_id else None
+
+
+async def _iter_events(client, user_id):
+    """Yield SSE frames for a user's channel, with comment keepalives while idle."""
+    pubsub = client.pubsub()
+    await pubsub.subscribe(user_channel(user_id))
+    try:
+        yield f'retry: {settings.SSE_RETRY_MILLISECONDS}\n\n'
+        while True:
+            message = await pubsub.get_message(
+                ignore_subscribe_messages=True,
+                timeout=settings.SSE_KEEPALIVE_SECONDS
+            )
+            if message is None:
+                yield ': keepalive\n\n'
+                continue
+            event = json.loads(message['data'])
+            yield f"event: {event['type']}\ndata: {json.dumps(event['data'])}\n\n"
+    finally:
+        await pubsub.unsubscribe()
+        await pubsub.aclose()
+        await client.aclose()
+
+
+async def event_stream(request):
+    """Stream the authenticated user's booking, service booking and message events."""
+    import redis.asyncio as aioredis
+
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({'error': 'The event stream is only available on the ASGI server.'}, status=501)
+    if not settings.REALTIME_ENABLED:
+        return JsonResponse({'error': 'Realtime events are disabled.'}, status=503)
+
+    client = aioredis.Redis.from_url(settings.REALTIME_REDIS_URL)
+    user = await _authenticate(request, client)
+    if user is None:
+        await client.aclose()
+        return JsonResponse({'error': 'Authentication credentials were not provided or are invalid.'}, status=401)
+
+    response = StreamingHttpResponse(_iter_events(client, user.pk), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx-style proxies from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
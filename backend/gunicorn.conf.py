@@ -0,0 +1,15 @@
+"""
+Gunicorn settings, read automatically when gunicorn starts in this directory.
+
+With PROMETHEUS_MULTIPROC_DIR set, every worker writes its Prometheus samples to
+that directory and /metrics aggregates them (see propertree/metrics.py). The
+files of a worker that exits are marked dead. The directory is emptied by the
+deploy start command, not here, since Celery workers on the host may share it.
+"""
+import os
+
+
+def child_exit(server, worker):
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -56,7 +56,7 @@ class MaintenanceRequestAdmin(admin.ModelAdmin):
     list_filter = ('status', 'priority', 'category', 'reported_at')
     search_fields = ('title', 'description', 'rental_property__title', 'reported_by__email')
     inlines = [MaintenanceImageInline]
-    readonly_fields = ('reported_at', 'updated_at', 'assigned_at', 'resolved_at')
+    readonly_fields = ('reported_at', 'updated_at', 'assigned_at', 'resolved_at', 'effective_cost')
 
     fieldsets = (
         ('Request Information', {
@@ -64,7 +64,7 @@ class MaintenanceRequestAdmin(admin.ModelAdmin):
         }),
         ('Service Booking', {
             'fields': (
-                'service_catalog', 'booking_type', 'requested_date', 'requested_time',
+                'service_catalog', 'service_price', 'booking_type', 'requested_date', 'requested_time',
                 'admin_confirmed_by', 'admin_confirmed_at', 'admin_rejection_reason'
             ),
             'classes': ('collapse',),
@@ -74,7 +74,7 @@ class MaintenanceRequestAdmin(admin.ModelAdmin):
             'fields': ('assigned_to', 'assigned_at')
         }),
         ('Resolution', {
-            'fields': ('resolved_at', 'resolution_notes', 'cost', 'rating', 'rating_notes')
+            'fields': ('resolved_at', 'resolution_notes', 'cost', 'effective_cost', 'rating', 'rating_notes')
         }),
         ('Metadata', {
             'fields': ('reported_at', 'updated_at')
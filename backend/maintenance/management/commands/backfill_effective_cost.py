@@ -0,0 +1,43 @@
+"""
+Recompute the denormalized effective_cost on maintenance requests.
+
+Usage:
+    python manage.py backfill_effective_cost
+    python manage.py backfill_effective_cost --snapshot-missing-prices
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from maintenance.models import MaintenanceRequest, ServiceCatalog
+
+
+class Command(BaseCommand):
+    help = 'Recompute MaintenanceRequest.effective_cost as COALESCE(cost, service_price)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--snapshot-missing-prices',
+            action='store_true',
+            help='Fill service_price from the current catalog price where no snapshot exists',
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if options['snapshot_missing_prices']:
+                snapshotted = MaintenanceRequest.objects.filter(
+                    service_price__isnull=True,
+                    service_catalog__isnull=False
+                ).update(
+                    service_price=Subquery(
+                        ServiceCatalog.objects.filter(id=OuterRef('service_catalog_id')).values('price')[:1]
+                    )
+                )
+                self.stdout.write(f'Snapshotted catalog price on {snapshotted} requests')
+
+            updated = MaintenanceRequest.objects.update(
+                effective_cost=Coalesce('cost', 'service_price')
+            )
+
+        self.stdout.write(self.style.SUCCESS(f'Recomputed effective_cost on {updated} requests'))
@@ -0,0 +1,42 @@
+# Generated by Django 5.0.1 on 2026-10-19 05:20
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_effective_cost(apps, schema_editor):
+    """Snapshot current catalog prices and compute effective_cost for existing requests."""
+    MaintenanceRequest = apps.get_model('maintenance', 'MaintenanceRequest')
+    ServiceCatalog = apps.get_model('maintenance', 'ServiceCatalog')
+
+    MaintenanceRequest.objects.filter(
+        service_price__isnull=True,
+        service_catalog__isnull=False
+    ).update(
+        service_price=Subquery(
+            ServiceCatalog.objects.filter(id=OuterRef('service_catalog_id')).values('price')[:1]
+        )
+    )
+    MaintenanceRequest.objects.update(effective_cost=Coalesce('cost', 'service_price'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('maintenance', '0004_reset_service_catalog_to_new_list'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='maintenancerequest',
+            name='effective_cost',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=10, null=True),
+        ),
+        migrations.AddField(
+            model_name='maintenancerequest',
+            name='service_price',
+            field=models.DecimalField(blank=True, decimal_places=2, help_text='Catalog price at booking time', max_digits=10, null=True),
+        ),
+        migrations.RunPython(backfill_effective_cost, migrations.RunPython.noop),
+    ]
@@ -2,14 +2,28 @@
 Maintenance models for Propertree platform.
 """
 import uuid
-from django.db import models
+from django.db import models, transaction
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
+from events.outbox import record_event
+from events.realtime import publish_user_event
 from properties.models import Property
+from propertree.search import SEARCH_CONFIG
 
 User = get_user_model()
 
 
+def maintenance_search_vector():
+    """Weighted search document of a maintenance request; also the GIN index expression."""
+    return (
+        SearchVector('title', weight='A', config=SEARCH_CONFIG)
+        + SearchVector('description', weight='B', config=SEARCH_CONFIG)
+        + SearchVector('resolution_notes', weight='C', config=SEARCH_CONFIG)
+    )
+
+
 class ServiceCatalog(models.Model):
     """Pre-defined services available for booking by landlords."""
 
@@ -191,6 +205,13 @@ class MaintenanceRequest(models.Model):
         related_name='service_bookings',
         help_text="Pre-defined service from catalog"
     )
+    service_price = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        help_text="Catalog price at booking time"
+    )
     requested_date = models.DateField(null=True, blank=True, help_text="Preferred date for service")
     requested_time = models.TimeField(null=True, blank=True, help_text="Preferred time for service")
     booking_type = models.CharField(
@@ -211,6 +232,9 @@ class MaintenanceRequest(models.Model):
     admin_confirmed_at = models.DateTimeField(null=True, blank=True)
     admin_rejection_reason = models.TextField(blank=True, help_text="Reason if booking was rejected by admin")
 
+    # Denormalized cost for analytics: actual cost if set, otherwise service_price
+    effective_cost = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, editable=False)
+
     # Metadata
     reported_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -223,11 +247,64 @@ class MaintenanceRequest(models.Model):
             models.Index(fields=['rental_property', 'status']),
             models.Index(fields=['reported_by', 'status']),
             models.Index(fields=['assigned_to', 'status']),
+            GinIndex(maintenance_search_vector(), name='maintenance_search_idx'),
         ]
 
     def __str__(self):
         return f"{self.title} - {self.rental_property.title} ({self.status})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored status so save() can detect transitions
+        instance._loaded_status = instance.__dict__.get('status')
+        return instance
+
+    def save(self, *args, **kwargs):
+        """
+        Snapshot the catalog price on first save and keep effective_cost current.
+        Creation and status changes are written to the outbox in the same transaction;
+        status changes are also pushed to the reporter's realtime stream after commit.
+        """
+        if self.service_price is None and self.service_catalog_id:
+            self.service_price = self.service_catalog.price
+        self.effective_cost = self.cost if self.cost is not None else self.service_price
+
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | {'service_price', 'effective_cost'}
+
+        previous_status = getattr(self, '_loaded_status', None)
+        if self._state.adding:
+            event_type = 'maintenance.created'
+        elif previous_status is not None and previous_status != self.status and (
+            update_fields is None or 'status' in update_fields
+        ):
+            event_type = f'maintenance.{self.status}'
+        else:
+            event_type = None
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if event_type:
+                record_event(
+                    event_type,
+                    self,
+                    property_id=str(self.rental_property_id),
+                    reported_by_id=str(self.reported_by_id),
+                    booking_type=self.booking_type,
+                    previous_status=previous_status,
+                    status=self.status
+                )
+                if event_type != 'maintenance.created':
+                    publish_user_event([self.reported_by_id], event_type, {
+                        'id': str(self.id),
+                        'property_id': str(self.rental_property_id),
+                        'is_service_booking': self.service_catalog_id is not None,
+                        'status': self.status,
+                    })
+        self._loaded_status = self.status
+
     @property
     def resolution_time(self):
         """Calculate resolution time in hours."""
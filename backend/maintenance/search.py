@@ -0,0 +1,52 @@
+"""
+Full-text search over maintenance tickets (title, description, resolution notes).
+"""
+from django.contrib.postgres.search import SearchRank
+from django.db.models import F, Value
+from django.db.models.functions import Concat
+
+from propertree.search import build_search_query, highlight, render_highlight
+
+from .models import maintenance_search_vector
+
+
+def search_maintenance_requests(queryset, text, limit):
+    """
+    Return the best `limit` matches in `queryset` as dicts, ranked with ts_rank.
+    The filter uses the same expression as the GIN index, and headlines are only
+    computed for the returned rows.
+    """
+    query = build_search_query(text)
+    rows = queryset.alias(
+        search=maintenance_search_vector()
+    ).filter(
+        search=query
+    ).annotate(
+        rank=SearchRank(F('search'), query),
+        title_highlight=highlight('title', query, highlight_all=True),
+        snippet=highlight(
+            Concat('description', Value(' '), 'resolution_notes'),
+            query,
+            max_words=35,
+            min_words=15,
+            max_fragments=2
+        )
+    ).order_by('-rank', '-reported_at').values(
+        'id', 'rental_property_id', 'status', 'priority', 'category',
+        'reported_at', 'rank', 'title_highlight', 'snippet'
+    )[:limit]
+
+    return [
+        {
+            'id': row['id'],
+            'property_id': row['rental_property_id'],
+            'status': row['status'],
+            'priority': row['priority'],
+            'category': row['category'],
+            'reported_at': row['reported_at'],
+            'rank': round(row['rank'], 4),
+            'title': render_highlight(row['title_highlight']),
+            'snippet': render_highlight(row['snippet']),
+        }
+        for row in rows
+    ]
@@ -5,6 +5,7 @@ from rest_framework import serializers
 from .models import MaintenanceRequest, MaintenanceImage, ServiceProvider, MaintenanceSchedule, ServiceCatalog
 from properties.serializers import PropertyListSerializer
 from users.serializers import UserSerializer
+from propertree.tracing import TracedListSerializer
 
 
 class ServiceCatalogSerializer(serializers.ModelSerializer):
@@ -14,6 +15,7 @@ class ServiceCatalogSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = ServiceCatalog
+        list_serializer_class = TracedListSerializer
         fields = '__all__'
 
 
@@ -22,6 +24,7 @@ class ServiceProviderSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = ServiceProvider
+        list_serializer_class = TracedListSerializer
         fields = '__all__'
 
 
@@ -59,10 +62,12 @@ class MaintenanceRequestSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = MaintenanceRequest
+        list_serializer_class = TracedListSerializer
         fields = '__all__'
         read_only_fields = [
             'id', 'reported_by', 'reported_at', 'updated_at',
-            'assigned_at', 'resolved_at', 'admin_confirmed_by', 'admin_confirmed_at'
+            'assigned_at', 'resolved_at', 'admin_confirmed_by', 'admin_confirmed_at',
+            'service_price', 'effective_cost'
         ]
 
 
@@ -160,4 +165,5 @@ class MaintenanceScheduleSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = MaintenanceSchedule
+        list_serializer_class = TracedListSerializer
         fields = '__all__'
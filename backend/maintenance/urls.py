@@ -6,6 +6,7 @@ from rest_framework.routers import DefaultRouter
 from .views import (
     MaintenanceRequestListCreateView,
     MaintenanceRequestDetailView,
+    MaintenanceSearchView,
     ServiceProviderListView,
     MaintenanceScheduleListCreateView,
     ServiceCatalogViewSet,
@@ -21,6 +22,7 @@ urlpatterns = [
     # Existing maintenance endpoints
     path('', MaintenanceRequestListCreateView.as_view(), name='maintenance_list_create'),
     path('<uuid:pk>/', MaintenanceRequestDetailView.as_view(), name='maintenance_detail'),
+    path('search/', MaintenanceSearchView.as_view(), name='maintenance_search'),
     path('providers/', ServiceProviderListView.as_view(), name='service_provider_list'),
     path('schedules/', MaintenanceScheduleListCreateView.as_view(), name='maintenance_schedule_list'),
 
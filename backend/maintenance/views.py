@@ -5,8 +5,10 @@ from rest_framework import generics, viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.views import APIView
 from django.utils import timezone
 from django.db.models import Q
+from propertree.search import get_search_params
 from .models import MaintenanceRequest, ServiceProvider, MaintenanceSchedule, ServiceCatalog
 from .serializers import (
     MaintenanceRequestSerializer,
@@ -14,6 +16,7 @@ from .serializers import (
     MaintenanceScheduleSerializer,
     ServiceCatalogSerializer
 )
+from .search import search_maintenance_requests
 
 
 class MaintenanceRequestListCreateView(generics.ListCreateAPIView):
@@ -60,6 +63,31 @@ class MaintenanceRequestDetailView(generics.RetrieveUpdateAPIView):
             return MaintenanceRequest.objects.none()
 
 
+class MaintenanceSearchView(APIView):
+    """API endpoint for full-text search over maintenance tickets the user can see."""
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """Return ranked matches with highlighted title and snippet."""
+        text, limit, error = get_search_params(request)
+        if error:
+            return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+
+        user = request.user
+        if user.is_admin():
+            queryset = MaintenanceRequest.objects.all()
+        elif user.is_landlord():
+            queryset = MaintenanceRequest.objects.filter(rental_property__landlord=user)
+        else:
+            queryset = MaintenanceRequest.objects.filter(reported_by=user)
+
+        return Response({
+            'query': text,
+            'results': search_maintenance_requests(queryset, text, limit)
+        }, status=status.HTTP_200_OK)
+
+
 class ServiceProviderListView(generics.ListAPIView):
     """API endpoint for listing service providers."""
 
@@ -201,11 +229,9 @@ class ServiceBookingViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_404_NOT_FOUND
                 )
 
+        # Saving records a maintenance.assigned outbox event for downstream consumers
         booking.save()
 
-        # TODO: Send notification to landlord about confirmation
-        # This can be integrated with the communications app
-
         serializer = self.get_serializer(booking)
         return Response({
             'message': 'Service booking confirmed successfully',
@@ -233,10 +259,9 @@ class ServiceBookingViewSet(viewsets.ModelViewSet):
         booking.status = 'cancelled'
         booking.admin_rejection_reason = reason
         booking.resolution_notes = f"Rejected by admin: {reason}"
+        # Saving records a maintenance.cancelled outbox event for downstream consumers
         booking.save()
 
-        # TODO: Send notification to landlord about rejection
-
         serializer = self.get_serializer(booking)
         return Response({
             'message': 'Service booking rejected',
@@ -11,7 +11,8 @@ from .admin_views import (
     PropertyFilterOptionsView,
     AdminUsersListView,
     PropertyAnalyticsView,
-    AssetPerformanceView
+    AssetPerformanceView,
+    AnalyticsExtractView
     ,AdminDeletePropertyView
 )
 
@@ -20,6 +21,7 @@ urlpatterns = [
     path('dashboard/stats/', AdminDashboardStatsView.as_view(), name='admin_dashboard_stats'),
     path('dashboard/analytics/', PropertyAnalyticsView.as_view(), name='admin_analytics'),
     path('analytics/performance/', AssetPerformanceView.as_view(), name='admin_asset_performance'),
+    path('analytics/extracts/', AnalyticsExtractView.as_view(), name='admin_analytics_extracts'),
     
     # Property management
     path('properties/pending/', PendingPropertiesView.as_view(), name='pending_properties'),
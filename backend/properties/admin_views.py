@@ -12,6 +12,7 @@ from django.conf import settings
 
 from .models import Property
 from .serializers import PropertyDetailSerializer
+from analytics.utils import datetime_range
 from bookings.models import Booking
 from users.models import CustomUser, Profile
 
@@ -56,7 +57,7 @@ class AdminDashboardStatsView(APIView):
             thirty_days_ago = timezone.now() - timedelta(days=30)
             monthly_revenue = Booking.objects.filter(
                 status__in=['confirmed', 'completed'],
-                created_at__gte=thirty_days_ago
+                confirmed_at__gte=thirty_days_ago
             ).aggregate(Sum('total_price'))['total_price__sum'] or 0
             
             # Recent activity (last 7 days)
@@ -125,10 +126,7 @@ class ApprovePropertyView(APIView):
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
-            property_obj.status = 'approved'
-            property_obj.approved_by = request.user
-            property_obj.approved_at = timezone.now()
-            property_obj.save()
+            property_obj.approve(request.user)
             
             return Response({
                 'message': 'Property approved successfully',
@@ -165,9 +163,7 @@ class RejectPropertyView(APIView):
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
-            property_obj.status = 'rejected'
-            property_obj.rejection_reason = reason
-            property_obj.save()
+            property_obj.reject(reason)
             
             return Response({
                 'message': 'Property rejected successfully',
@@ -441,19 +437,18 @@ class PropertyAnalyticsView(APIView):
                         month_date = date(month_date.year, month_date.month - 1, 1)
                 
                 last_day = monthrange(month_date.year, month_date.month)[1]
-                month_start = timezone.make_aware(datetime(month_date.year, month_date.month, 1))
-                month_end = timezone.make_aware(datetime(month_date.year, month_date.month, last_day, 23, 59, 59))
+                month_start, month_end = datetime_range(month_date, month_date.replace(day=last_day))
                 
                 count = filtered_properties.filter(
                     created_at__gte=month_start,
-                    created_at__lte=month_end
+                    created_at__lt=month_end
                 ).count()
                 
-                # Also get bookings and revenue for this month
+                # Also get bookings and revenue for this month (recognised on confirmation)
                 month_bookings = Booking.objects.filter(
                     status__in=['confirmed', 'completed'],
-                    created_at__gte=month_start,
-                    created_at__lte=month_end
+                    confirmed_at__gte=month_start,
+                    confirmed_at__lt=month_end
                 ).filter(property__in=filtered_properties)
                 month_revenue = month_bookings.aggregate(Sum('total_price'))['total_price__sum'] or 0
                 month_booking_count = month_bookings.count()
@@ -548,8 +543,8 @@ class PropertyAnalyticsView(APIView):
             # Last 3 months
             last_3_bookings = Booking.objects.filter(
                 status__in=['confirmed', 'completed'],
-                created_at__gte=last_3_months_start,
-                created_at__lte=now
+                confirmed_at__gte=last_3_months_start,
+                confirmed_at__lt=now
             ).filter(property__in=filtered_properties)
             last_3_revenue = last_3_bookings.aggregate(Sum('total_price'))['total_price__sum'] or 0
             last_3_count = last_3_bookings.count()
@@ -557,8 +552,8 @@ class PropertyAnalyticsView(APIView):
             # Previous 3 months
             prev_3_bookings = Booking.objects.filter(
                 status__in=['confirmed', 'completed'],
-                created_at__gte=prev_3_months_start,
-                created_at__lt=last_3_months_start
+                confirmed_at__gte=prev_3_months_start,
+                confirmed_at__lt=last_3_months_start
             ).filter(property__in=filtered_properties)
             prev_3_revenue = prev_3_bookings.aggregate(Sum('total_price'))['total_price__sum'] or 0
             prev_3_count = prev_3_bookings.count()
@@ -676,6 +671,9 @@ class AssetPerformanceView(APIView):
             end_date = timezone.now()
             start_date = end_date - timedelta(days=days)
         
+        # Half-open upper bound for revenue timestamps: start of the day after end_date
+        period_end = datetime_range(start_date.date(), end_date.date())[1]
+        
         # Build property filter queryset
         property_filter = Q()
         if country:
@@ -698,8 +696,8 @@ class AssetPerformanceView(APIView):
         # Revenue calculations - current period (filtered by property)
         confirmed_bookings = Booking.objects.filter(
             status__in=['confirmed', 'completed'],
-            created_at__gte=start_date,
-            created_at__lte=end_date,
+            confirmed_at__gte=start_date,
+            confirmed_at__lt=period_end,
             property__in=filtered_properties
         )
         
@@ -711,8 +709,8 @@ class AssetPerformanceView(APIView):
         prev_start = start_date - timedelta(days=period_duration)
         prev_bookings = Booking.objects.filter(
             status__in=['confirmed', 'completed'],
-            created_at__gte=prev_start,
-            created_at__lt=start_date,
+            confirmed_at__gte=prev_start,
+            confirmed_at__lt=start_date,
             property__in=filtered_properties
         )
         prev_revenue = prev_bookings.aggregate(Sum('total_price'))['total_price__sum'] or 0
@@ -788,14 +786,13 @@ class AssetPerformanceView(APIView):
             
             # Get first and last day of month
             last_day = monthrange(month_date.year, month_date.month)[1]
-            month_start = timezone.make_aware(datetime(month_date.year, month_date.month, 1))
-            month_end = timezone.make_aware(datetime(month_date.year, month_date.month, last_day, 23, 59, 59))
+            month_start, month_end = datetime_range(month_date, month_date.replace(day=last_day))
             
-            # Revenue for this month (filtered by property)
+            # Revenue for this month (filtered by property, recognised on confirmation)
             month_revenue = Booking.objects.filter(
                 status__in=['confirmed', 'completed'],
-                created_at__gte=month_start,
-                created_at__lte=month_end,
+                confirmed_at__gte=month_start,
+                confirmed_at__lt=month_end,
                 property__in=filtered_properties
             ).aggregate(Sum('total_price'))['total_price__sum'] or 0
             
@@ -820,16 +817,16 @@ class AssetPerformanceView(APIView):
                 'bookings__total_price',
                 filter=Q(
                     bookings__status__in=['confirmed', 'completed'],
-                    bookings__created_at__gte=start_date,
-                    bookings__created_at__lte=end_date
+                    bookings__confirmed_at__gte=start_date,
+                    bookings__confirmed_at__lt=period_end
                 )
             ),
             prop_booking_count=Count(
                 'bookings',
                 filter=Q(
                     bookings__status__in=['confirmed', 'completed'],
-                    bookings__created_at__gte=start_date,
-                    bookings__created_at__lte=end_date
+                    bookings__confirmed_at__gte=start_date,
+                    bookings__confirmed_at__lt=period_end
                 )
             )
         ).order_by('-prop_revenue')[:10]
@@ -925,3 +922,52 @@ class AssetPerformanceView(APIView):
             'expense_categories': expense_categories
         })
 
+
+
+class AnalyticsExtractView(APIView):
+    """
+    API endpoint for admins to inspect and trigger BI extracts.
+    GET returns the extract manifest (watermarks and the latest run per dataset).
+    POST queues an incremental extract run.
+    """
+    
+    permission_classes = [IsAdminUser]
+    
+    def get(self, request):
+        """Return the extract manifest."""
+        from analytics.extracts import EXTRACT_DATASETS, get_extract_format, load_manifest
+        
+        return Response({
+            'datasets': list(EXTRACT_DATASETS),
+            'format': get_extract_format(),
+            'extract_root': settings.ANALYTICS_EXTRACT_ROOT,
+            'manifest': load_manifest()['datasets'],
+        })
+    
+    def post(self, request):
+        """Queue an extract run; accepts optional 'datasets', 'format' and 'full'."""
+        from analytics.extracts import EXTRACT_DATASETS
+        from analytics.tasks import write_analytics_extracts
+        
+        datasets = request.data.get('datasets') or None
+        extract_format = request.data.get('format') or None
+        full = str(request.data.get('full', '')).lower() in ('1', 'true', 'yes')
+        
+        if datasets is not None and (
+            not isinstance(datasets, list) or any(dataset not in EXTRACT_DATASETS for dataset in datasets)
+        ):
+            return Response(
+                {'error': f'datasets must be a list of: {", ".join(EXTRACT_DATASETS)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if extract_format not in (None, 'parquet', 'csv'):
+            return Response(
+                {'error': 'format must be parquet or csv'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        task = write_analytics_extracts.delay(datasets, extract_format, full)
+        return Response({
+            'message': 'Extract queued',
+            'task_id': task.id
+        }, status=status.HTTP_202_ACCEPTED)
@@ -0,0 +1,237 @@
+"""
+Bulk import helpers for landlord data (CSV / JSON uploads).
+"""
+import csv
+import io
+import json
+import os
+from contextlib import nullcontext
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import Property, PropertyExpense
+
+
+SUPPORTED_IMPORT_FORMATS = {
+    '.csv': 'csv',
+    '.json': 'json',
+    '.jsonl': 'jsonl',
+    '.ndjson': 'jsonl',
+}
+
+
+class ImportFormatError(ValueError):
+    """Raised when an uploaded file cannot be parsed."""
+
+
+def get_import_format(file_name):
+    """Return the import format for a file name, or None if unsupported."""
+    extension = os.path.splitext(file_name or '')[1].lower()
+    return SUPPORTED_IMPORT_FORMATS.get(extension)
+
+
+def iter_import_rows(file_obj, import_format):
+    """
+    Yield (line_number, row_dict) pairs from an uploaded file.
+    CSV and JSON Lines are streamed row by row; a JSON document must be a
+    top-level array and is parsed in one go. Empty CSV cells are dropped so
+    optional fields fall back to their defaults.
+    """
+    if import_format == 'csv':
+        text = io.TextIOWrapper(file_obj, encoding='utf-8-sig', newline='')
+        reader = csv.DictReader(text)
+        try:
+            for row in reader:
+                yield reader.line_num, {
+                    key.strip(): value.strip()
+                    for key, value in row.items()
+                    if key and isinstance(value, str) and value.strip() != ''
+                }
+        except (csv.Error, UnicodeDecodeError) as e:
+            raise ImportFormatError(f'Line {reader.line_num}: {e}')
+    elif import_format == 'jsonl':
+        text = io.TextIOWrapper(file_obj, encoding='utf-8-sig')
+        line_number = 0
+        try:
+            for line_number, line in enumerate(text, start=1):
+                if not line.strip():
+                    continue
+                yield line_number, json.loads(line)
+        except ValueError as e:
+            raise ImportFormatError(f'Line {line_number}: invalid JSON ({e})')
+    elif import_format == 'json':
+        try:
+            rows = json.load(io.TextIOWrapper(file_obj, encoding='utf-8-sig'))
+        except ValueError as e:
+            raise ImportFormatError(f'Invalid JSON ({e})')
+        if not isinstance(rows, list):
+            raise ImportFormatError('JSON imports must be an array of objects')
+        for index, row in enumerate(rows, start=1):
+            yield index, row
+    else:
+        raise ImportFormatError('Unsupported file format. Use .csv, .json or .jsonl')
+
+
+def run_import(rows, serializer_class, context, build_instance, save_chunk, chunk_size, progress_callback=None, atomic=False):
+    """
+    Validate import rows one by one and save valid instances in chunks.
+    `build_instance` turns validated data into an unsaved model instance and
+    `save_chunk` persists a list of them, returning the number created.
+    Returns a summary dict with processed/created/failed counts and per-line errors;
+    a file that stops parsing part-way adds an 'error' entry.
+    With `atomic`, the import runs in one transaction that is rolled back when
+    the file stops parsing, so nothing is created and the fixed file can be resent.
+    Otherwise each chunk is committed as it is saved and earlier rows are kept.
+    """
+    summary = {'processed': 0, 'created': 0, 'failed': 0, 'errors': []}
+    pending = []
+
+    def flush():
+        summary['created'] += save_chunk(pending)
+        pending.clear()
+        if progress_callback:
+            progress_callback(summary)
+
+    def import_rows():
+        for line_number, row in rows:
+            summary['processed'] += 1
+            if not isinstance(row, dict):
+                summary['failed'] += 1
+                summary['errors'].append({'line': line_number, 'errors': {'non_field_errors': ['Row must be an object.']}})
+                continue
+
+            serializer = serializer_class(data=row, context=context)
+            if not serializer.is_valid():
+                summary['failed'] += 1
+                summary['errors'].append({'line': line_number, 'errors': serializer.errors})
+                continue
+
+            pending.append(build_instance(dict(serializer.validated_data)))
+
+            if len(pending) >= chunk_size:
+                flush()
+
+        if pending:
+            flush()
+
+    try:
+        with transaction.atomic() if atomic else nullcontext():
+            import_rows()
+    except ImportFormatError as e:
+        summary['error'] = str(e)
+        if atomic:
+            summary['created'] = 0
+        elif pending:
+            # Keep the rows read before the file became unparseable
+            flush()
+
+    return summary
+
+
+def import_expenses(landlord_id, rows, chunk_size=None, progress_callback=None, atomic=False):
+    """
+    Validate and insert expense rows for a landlord.
+    Ownership is checked against a single prefetched set of the landlord's property IDs
+    and recurring expenses are expanded up to the current horizon.
+    """
+    from .serializers import PropertyExpenseImportSerializer
+    from .tasks import get_recurrence_horizon
+
+    chunk_size = chunk_size or settings.BULK_IMPORT_CHUNK_SIZE
+    property_ids = set(
+        Property.objects.filter(landlord_id=landlord_id).values_list('id', flat=True)
+    )
+    horizon = get_recurrence_horizon()
+
+    def build_instance(data):
+        data['property_id'] = data.pop('property')
+        return PropertyExpense(**data)
+
+    def save_chunk(expenses):
+        created = PropertyExpense.objects.bulk_create(expenses)
+        occurrences = [
+            occurrence
+            for expense in created if expense.is_recurring
+            for occurrence in expense.build_occurrences(horizon)
+        ]
+        if occurrences:
+            PropertyExpense.objects.bulk_create(occurrences, batch_size=chunk_size, ignore_conflicts=True)
+        return len(created)
+
+    return run_import(
+        rows,
+        PropertyExpenseImportSerializer,
+        {'property_ids': property_ids},
+        build_instance,
+        save_chunk,
+        chunk_size,
+        progress_callback,
+        atomic
+    )
+
+
+def import_properties(landlord_id, rows, chunk_size=None, progress_callback=None, atomic=False):
+    """
+    Validate and insert property rows for a landlord.
+    Duplicates (same title and address, within the file or already listed) are
+    detected against one prefetched key set. Properties with embedded base64
+    photos are queued for asynchronous photo processing after each chunk.
+    """
+    from .serializers import PropertyImportSerializer
+    from .tasks import process_property_photos
+
+    chunk_size = chunk_size or settings.BULK_IMPORT_CHUNK_SIZE
+    existing_keys = {
+        PropertyImportSerializer.get_duplicate_key(title, address)
+        for title, address in Property.objects.filter(landlord_id=landlord_id).values_list('title', 'address')
+    }
+
+    def build_instance(data):
+        return Property(landlord_id=landlord_id, **data)
+
+    def save_chunk(properties):
+        created = Property.objects.bulk_create(properties)
+        photo_property_ids = [
+            str(prop.id) for prop in created if has_embedded_photos(prop.photos)
+        ]
+        if photo_property_ids:
+            # Queued on commit, so a rolled-back import does not process its photos
+            transaction.on_commit(lambda: process_property_photos.delay(photo_property_ids))
+        return len(created)
+
+    return run_import(
+        rows,
+        PropertyImportSerializer,
+        {'existing_keys': existing_keys},
+        build_instance,
+        save_chunk,
+        chunk_size,
+        progress_callback,
+        atomic
+    )
+
+
+def get_photo_source(photo):
+    """Return the image source of a photo entry (a URL string or a frontend photo object)."""
+    if isinstance(photo, dict):
+        return photo.get('url') or photo.get('preview')
+    return photo
+
+
+def is_embedded_photo(photo):
+    """Return True if the photo is stored inline as a base64 data URL."""
+    source = get_photo_source(photo)
+    return isinstance(source, str) and source.startswith('data:')
+
+
+def has_embedded_photos(photos):
+    """Return True if any photo still needs to be moved to storage."""
+    return any(is_embedded_photo(photo) for photo in photos or [])
+
+
+# Importers available to the background file import task, keyed by kind
+IMPORTERS = {
+    'expenses': import_expenses,
+    'properties': import_properties,
+}
@@ -0,0 +1,153 @@
+"""
+Benchmark the hot API endpoints in-process and compare with a stored baseline.
+
+Usage:
+    python manage.py seed_scale --landlords 500
+    python manage.py benchmark_endpoints --output benchmarks/baseline.json
+    python manage.py benchmark_endpoints --baseline benchmarks/baseline.json --output benchmarks/latest.json
+    python manage.py benchmark_endpoints --only property_search --only booking_create --iterations 50
+    python manage.py benchmark_endpoints --serialization
+
+--serialization also times rendering and parsing each GET payload with the
+stdlib json module and with orjson (when installed), to compare JSON_BACKEND choices.
+
+Exits with an error when --baseline is given and a benchmark regressed by more
+than --threshold (or runs more queries), so it can gate a deploy.
+"""
+import json
+import logging
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from propertree.benchmarks import (
+    BENCHMARKS,
+    build_context,
+    compare_results,
+    run_benchmarks,
+    run_serialization_benchmarks,
+)
+
+
+class Command(BaseCommand):
+    help = 'Measure p50/p95 latency, query count and response size of hot endpoints'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--only',
+            action='append',
+            choices=list(BENCHMARKS),
+            help='Only run this benchmark (repeatable)',
+        )
+        parser.add_argument('--iterations', type=int, default=20, help='Measured requests per benchmark (default 20)')
+        parser.add_argument('--warmup', type=int, default=2, help='Unmeasured requests first (default 2)')
+        parser.add_argument('--cold', action='store_true', help='Clear the cache before every request')
+        parser.add_argument(
+            '--serialization',
+            action='store_true',
+            help='Also time rendering and parsing of the GET payloads per JSON backend (10x --iterations each)',
+        )
+        parser.add_argument('--domain', default='seed.propertree.test', help='Email domain of the seeded users')
+        parser.add_argument('--landlord', help='Email of the landlord to benchmark as')
+        parser.add_argument('--tenant', help='Email of the tenant to benchmark as')
+        parser.add_argument('--admin', help='Email of the admin to benchmark as')
+        parser.add_argument('--output', help='Write the run as JSON to this file')
+        parser.add_argument('--baseline', help='Compare with a previous --output file')
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=0.2,
+            help='Relative latency/size growth flagged as a regression (default 0.2 = 20%%)',
+        )
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['baseline']:
+            try:
+                with open(options['baseline']) as baseline_file:
+                    baseline = json.load(baseline_file)
+            except (OSError, ValueError) as e:
+                raise CommandError(f'Cannot read baseline: {e}')
+
+        context = build_context(options['domain'], options['landlord'], options['tenant'], options['admin'])
+        if context is None:
+            raise CommandError('No approved property to benchmark; run manage.py seed_scale first')
+        for role in ('landlord', 'tenant', 'admin'):
+            if role not in context:
+                self.stdout.write(self.style.WARNING(f'No {role} user found; skipping {role} benchmarks'))
+
+        self.stdout.write(
+            f'{"benchmark":<24}{"status":>7}{"p50 ms":>10}{"p95 ms":>10}{"cpu ms":>10}{"queries":>9}{"bytes":>10}'
+        )
+
+        def report(name, result):
+            self.stdout.write(
+                f'{name:<24}{result["status"]:>7}{result["p50_ms"]:>10.2f}{result["p95_ms"]:>10.2f}'
+                f'{result["cpu_ms"]:>10.2f}{result["queries"]:>9}{result["bytes"]:>10}'
+            )
+
+        def report_serialization(name, result):
+            timings = '  '.join(
+                f'{backend} render {timing["render_ms"]:.3f} ms ({timing["render_cpu_ms"]:.3f} cpu), '
+                f'parse {timing["parse_ms"]:.3f} ms'
+                for backend, timing in result['backends'].items()
+            )
+            mismatch = '' if result['identical'] else '  OUTPUT DIFFERS'
+            self.stdout.write(f'{name:<24}{result["bytes"]:>10}  {timings}{mismatch}')
+
+        # The request log line and query budget warning of every benchmark request would drown the table
+        request_logger = logging.getLogger('propertree.requests')
+        log_level = request_logger.level
+        request_logger.setLevel(logging.ERROR)
+        try:
+            # Accept the test client's host and keep any outgoing email in memory
+            with override_settings(
+                ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+                EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+            ):
+                run = run_benchmarks(
+                    context,
+                    options['only'],
+                    options['iterations'],
+                    options['warmup'],
+                    options['cold'],
+                    report
+                )
+                if options['serialization']:
+                    self.stdout.write('')
+                    self.stdout.write(f'{"serialization":<24}{"bytes":>10}')
+                    run['serialization'] = run_serialization_benchmarks(
+                        context,
+                        options['only'],
+                        options['iterations'] * 10,
+                        report_serialization
+                    )
+        finally:
+            request_logger.setLevel(log_level)
+
+        if options['output']:
+            os.makedirs(os.path.dirname(os.path.abspath(options['output'])), exist_ok=True)
+            with open(options['output'], 'w') as output_file:
+                json.dump(run, output_file, indent=2)
+            self.stdout.write(f'Wrote {options["output"]}')
+
+        failed = [name for name, result in run['results'].items() if result['status'] >= 400]
+        differing = [name for name, result in run.get('serialization', {}).items() if not result['identical']]
+        if differing:
+            raise CommandError(f'JSON backends produced different output for: {", ".join(differing)}')
+        if failed:
+            raise CommandError(f'Benchmarks returned error responses: {", ".join(failed)}')
+
+        if baseline is not None:
+            regressions = compare_results(run, baseline, options['threshold'])
+            for regression in regressions:
+                change = f' ({regression["change"]:+.0%})' if regression['change'] is not None else ''
+                self.stdout.write(self.style.ERROR(
+                    f'{regression["benchmark"]}: {regression["metric"]} '
+                    f'{regression["baseline"]} -> {regression["current"]}{change}'
+                ))
+            if regressions:
+                raise CommandError(f'{len(regressions)} regressions against {options["baseline"]}')
+            self.stdout.write(self.style.SUCCESS(f'No regressions against {options["baseline"]}'))
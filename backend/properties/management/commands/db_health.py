@@ -0,0 +1,156 @@
+"""
+Report database sizes, index usage, scan hotspots, bloat, slow statements and
+status counts, to decide where indexes and archiving are needed.
+
+Usage:
+    python manage.py db_health
+    python manage.py db_health --limit 30 --min-rows 10000 --archive-after-days 730
+    python manage.py db_health --json > db_health.json
+
+Only the status counts are available on databases other than PostgreSQL.
+Slow statements need the pg_stat_statements extension.
+"""
+import json
+
+from django.core.management.base import BaseCommand
+from django.core.serializers.json import DjangoJSONEncoder
+
+from propertree.db_health import collect_report
+
+
+def format_bytes(size):
+    for unit in ('B', 'kB', 'MB', 'GB'):
+        if size < 1024:
+            return f'{size:.0f} {unit}' if unit == 'B' else f'{size:.1f} {unit}'
+        size /= 1024
+    return f'{size:.1f} TB'
+
+
+class Command(BaseCommand):
+    help = 'Report table/index sizes, unused and missing indexes, seq scans, bloat, slow SQL and status counts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=15, help='Rows per section (default 15)')
+        parser.add_argument(
+            '--min-rows', type=int, default=1000,
+            help='Smallest table reported as a sequential-scan hotspot (default 1000 rows)',
+        )
+        parser.add_argument(
+            '--min-dead-ratio', type=float, default=0.1,
+            help='Dead-row ratio from which a table is reported as bloated (default 0.1)',
+        )
+        parser.add_argument(
+            '--archive-after-days', type=int, default=365,
+            help='Age from which rows in a final status count as archivable (default 365)',
+        )
+        parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+
+    def handle(self, *args, **options):
+        report = collect_report(
+            options['limit'],
+            options['min_rows'],
+            options['min_dead_ratio'],
+            options['archive_after_days']
+        )
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2, cls=DjangoJSONEncoder))
+            return
+
+        if report['tables'] is None:
+            self.stdout.write(self.style.WARNING(
+                f'{report["database"]} database: only the status counts are available (the rest needs PostgreSQL)'
+            ))
+        else:
+            self.stdout.write(f'Statistics collected since {report["stats_reset"] or "the cluster started"}')
+            self.print_tables(report['tables'])
+            self.print_indexes(report['indexes'], options['limit'])
+            self.print_unindexed_foreign_keys(report['unindexed_foreign_keys'])
+            self.print_sequential_scans(report['sequential_scans'])
+            self.print_bloat(report['bloat'])
+            self.print_slow_statements(report['slow_statements'])
+        self.print_status_counts(report['status_counts'], report['archive_after_days'])
+
+    def heading(self, title):
+        self.stdout.write('')
+        self.stdout.write(self.style.MIGRATE_HEADING(title))
+
+    def print_tables(self, tables):
+        self.heading('Largest tables')
+        self.stdout.write(
+            f'{"table":<36}{"rows":>12}{"dead":>10}{"table":>11}{"indexes":>11}{"total":>11}{"seq scans":>11}{"idx scans":>12}'
+        )
+        for table in tables:
+            self.stdout.write(
+                f'{table["table_name"]:<36}{table["live_rows"]:>12}{table["dead_rows"]:>10}'
+                f'{format_bytes(table["table_bytes"]):>11}{format_bytes(table["index_bytes"]):>11}'
+                f'{format_bytes(table["total_bytes"]):>11}{table["seq_scan"]:>11}{table["idx_scan"]:>12}'
+            )
+
+    def print_indexes(self, indexes, limit):
+        unused = [index for index in indexes if index['unused']]
+        self.heading(f'Unused indexes ({len(unused)}, {format_bytes(sum(index["index_bytes"] for index in unused))})')
+        if not unused:
+            self.stdout.write('None')
+        for index in unused[:limit]:
+            self.stdout.write(f'{index["index_name"]:<56} on {index["table_name"]:<32}{format_bytes(index["index_bytes"]):>11}')
+
+        self.heading('Largest indexes')
+        for index in indexes[:limit]:
+            self.stdout.write(
+                f'{index["index_name"]:<56} on {index["table_name"]:<32}'
+                f'{format_bytes(index["index_bytes"]):>11}{index["idx_scan"]:>12} scans'
+            )
+
+    def print_unindexed_foreign_keys(self, foreign_keys):
+        self.heading('Foreign keys without an index (candidate missing indexes)')
+        if not foreign_keys:
+            self.stdout.write('None')
+        for foreign_key in foreign_keys:
+            self.stdout.write(
+                f'{foreign_key["table_name"]}({foreign_key["columns"]}) '
+                f'[{foreign_key["constraint_name"]}], table {format_bytes(foreign_key["table_bytes"])}'
+            )
+
+    def print_sequential_scans(self, tables):
+        self.heading('Sequential-scan hotspots')
+        if not tables:
+            self.stdout.write('None')
+            return
+        self.stdout.write(f'{"table":<36}{"rows":>12}{"seq scans":>11}{"rows read":>15}{"rows/scan":>12}{"idx scans":>12}')
+        for table in tables:
+            self.stdout.write(
+                f'{table["table_name"]:<36}{table["live_rows"]:>12}{table["seq_scan"]:>11}'
+                f'{table["seq_tup_read"]:>15}{table["rows_per_seq_scan"] or 0:>12}{table["idx_scan"]:>12}'
+            )
+
+    def print_bloat(self, tables):
+        self.heading('Bloat estimate (dead rows awaiting vacuum)')
+        if not tables:
+            self.stdout.write('None above the dead-row ratio')
+        for table in tables:
+            self.stdout.write(
+                f'{table["table_name"]:<36}{table["dead_rows"]:>12} dead ({table["dead_ratio"]:.0%}), '
+                f'~{format_bytes(table["estimated_waste_bytes"])}, last vacuum {table["last_vacuum"] or "never"}'
+            )
+
+    def print_slow_statements(self, statements):
+        self.heading('Slowest statements (pg_stat_statements, by total time)')
+        if isinstance(statements, str):
+            self.stdout.write(self.style.WARNING(statements))
+            return
+        for statement in statements:
+            query = ' '.join(statement['query'].split())
+            self.stdout.write(
+                f'{statement["total_ms"]:>12.0f} ms total {statement["calls"]:>10} calls '
+                f'{statement["mean_ms"]:>9.2f} ms mean  {query[:140]}'
+            )
+
+    def print_status_counts(self, status_counts, archive_after_days):
+        self.heading(f'Rows per status (archivable: final status, older than {archive_after_days} days)')
+        for label, rows in status_counts.items():
+            self.stdout.write(f'{label}')
+            for row in rows:
+                self.stdout.write(
+                    f'  {row["status"]:<18}{row["rows"]:>10} rows {row["archivable"]:>10} archivable  '
+                    f'{row["oldest"]:%Y-%m-%d} .. {row["newest"]:%Y-%m-%d}'
+                )
@@ -0,0 +1,189 @@
+"""
+Replay tenant, landlord and admin flows against a running server and report
+throughput, error rate, latency and double bookings.
+
+Usage:
+    python manage.py seed_scale --landlords 200
+    gunicorn propertree.wsgi --workers 4 &
+    python manage.py load_test --base-url http://127.0.0.1:8000 --duration 60 --tenants 50 --landlords 10
+
+Needs httpx (pip install httpx). Users come from the seed_scale dataset and their
+access tokens are minted locally, so the server must use the same database and
+SECRET_KEY, and runs should stay within ACCESS_TOKEN_LIFETIME. The run writes
+bookings, favorites and expenses; run it against a disposable database.
+"""
+import asyncio
+import json
+import random
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from bookings.models import Booking
+from properties.models import Property
+
+User = get_user_model()
+
+# Statuses that hold a property's nights (the same ones the availability search excludes)
+ACTIVE_BOOKING_STATUSES = ['pending', 'confirmed']
+
+
+def find_double_bookings(since):
+    """Return active bookings created since `since` that overlap another active booking of the same property."""
+    overlapping = Booking.objects.filter(
+        property_id=OuterRef('property_id'),
+        status__in=ACTIVE_BOOKING_STATUSES,
+        check_in__lt=OuterRef('check_out'),
+        check_out__gt=OuterRef('check_in'),
+    ).exclude(pk=OuterRef('pk'))
+    return Booking.objects.filter(
+        status__in=ACTIVE_BOOKING_STATUSES,
+        created_at__gte=since,
+    ).filter(Exists(overlapping)).order_by('property_id', 'check_in')
+
+
+class Command(BaseCommand):
+    help = 'Run an async httpx load test of tenant, landlord and admin flows against a running server'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000', help='Server to load (default %(default)s)')
+        parser.add_argument('--duration', type=int, default=60, help='Seconds to run (default 60)')
+        parser.add_argument('--tenants', type=int, default=20, help='Concurrent tenants (default 20)')
+        parser.add_argument('--landlords', type=int, default=5, help='Concurrent landlords (default 5)')
+        parser.add_argument('--admins', type=int, default=1, help='Concurrent admins (default 1)')
+        parser.add_argument(
+            '--think-time', type=float, default=0.5,
+            help='Mean pause between requests in seconds; 0 for closed-loop maximum load (default 0.5)',
+        )
+        parser.add_argument(
+            '--hot-properties', type=int, default=5,
+            help='Properties the tenants compete to book (default 5)',
+        )
+        parser.add_argument('--seed', type=int, default=1, help='Random seed (default 1)')
+        parser.add_argument('--domain', default='seed.propertree.test', help='Email domain of the seeded users')
+        parser.add_argument('--timeout', type=float, default=30.0, help='Request timeout in seconds (default 30)')
+        parser.add_argument('--output', help='Write the report as JSON to this file')
+
+    def handle(self, *args, **options):
+        try:
+            from propertree.loadtest import run_load
+        except ImportError:
+            raise CommandError('load_test needs httpx: pip install httpx')
+
+        rng = random.Random(options['seed'])
+        scenario = self.build_scenario(rng, options)
+
+        self.stdout.write(
+            f'Running {len(scenario["tenants"])} tenants, {len(scenario["landlords"])} landlords and '
+            f'{len(scenario["admins"])} admins against {options["base_url"]} for {options["duration"]}s'
+        )
+        started_at = timezone.now()
+        stats, elapsed = asyncio.run(run_load(
+            options['base_url'],
+            scenario,
+            options['duration'],
+            options['think_time'],
+            options['seed'],
+            options['timeout']
+        ))
+        report = stats.summary(elapsed)
+
+        double_bookings = find_double_bookings(started_at)
+        report['double_bookings'] = double_bookings.count()
+        report['double_booking_samples'] = [
+            {'id': str(booking['id']), 'property_id': str(booking['property_id']),
+             'check_in': booking['check_in'].isoformat(), 'check_out': booking['check_out'].isoformat(),
+             'status': booking['status']}
+            for booking in double_bookings.values('id', 'property_id', 'check_in', 'check_out', 'status')[:10]
+        ]
+
+        self.print_report(report)
+        if options['output']:
+            with open(options['output'], 'w') as output_file:
+                json.dump(report, output_file, indent=2)
+            self.stdout.write(f'Wrote {options["output"]}')
+
+    def build_scenario(self, rng, options):
+        """Pick the virtual users, mint their tokens and choose the contended properties and dates."""
+        domain = options['domain']
+        seeded = User.objects.filter(email__endswith=f'@{domain}', is_active=True)
+
+        hot_ids = list(
+            Property.objects.filter(status='approved', landlord__email__endswith=f'@{domain}')
+            .order_by('id').values_list('id', flat=True)[:1000]
+        )
+        if not hot_ids:
+            raise CommandError('No seeded properties found; run manage.py seed_scale first')
+        hot_ids = rng.sample(hot_ids, min(options['hot_properties'], len(hot_ids)))
+        hot_properties = list(Property.objects.filter(id__in=hot_ids).order_by('id').values('id', 'city', 'landlord_id'))
+
+        # Owners of the hot properties come first so their pending bookings get confirmed
+        landlord_ids = list(dict.fromkeys(prop['landlord_id'] for prop in hot_properties))
+        landlord_ids += list(
+            seeded.filter(role='landlord').exclude(id__in=landlord_ids).order_by('email')
+            .values_list('id', flat=True)[:max(0, options['landlords'] - len(landlord_ids))]
+        )
+        landlords = list(User.objects.filter(id__in=landlord_ids[:options['landlords']]))
+        property_ids = {}
+        for prop in Property.objects.filter(landlord__in=landlords, status='approved').values('id', 'landlord_id'):
+            property_ids.setdefault(prop['landlord_id'], []).append(str(prop['id']))
+
+        tenants = list(seeded.filter(role='tenant').order_by('email')[:options['tenants']])
+        admins = list(User.objects.filter(role='admin', is_active=True).order_by('email')[:options['admins']])
+        if len(tenants) < options['tenants']:
+            self.stdout.write(self.style.WARNING(f'Only {len(tenants)} seeded tenants available'))
+        if len(admins) < options['admins']:
+            self.stdout.write(self.style.WARNING(f'Only {len(admins)} admin users available'))
+
+        # A handful of short stays past all seeded bookings, so contention is between load test sessions
+        first_day = timezone.localdate() + timedelta(days=120)
+        date_windows = [
+            (first_day + timedelta(days=offset), first_day + timedelta(days=offset + nights))
+            for offset, nights in ((0, 3), (2, 4), (7, 2), (10, 5))
+        ]
+
+        return {
+            'tenants': [str(AccessToken.for_user(user)) for user in tenants],
+            'landlords': [(str(AccessToken.for_user(user)), property_ids.get(user.id, [])) for user in landlords],
+            'admins': [str(AccessToken.for_user(user)) for user in admins],
+            'hot_properties': [{'id': str(prop['id']), 'city': prop['city']} for prop in hot_properties],
+            'date_windows': date_windows,
+        }
+
+    def print_report(self, report):
+        self.stdout.write('')
+        self.stdout.write(
+            f'{report["requests"]} requests in {report["duration_s"]}s: {report["throughput_rps"]} req/s, '
+            f'error rate {report["error_rate"]:.2%}, {report["rejected"]} expected rejections'
+        )
+        self.stdout.write('')
+        self.stdout.write(
+            f'{"operation":<26}{"requests":>9}{"errors":>8}{"rejected":>10}{"p50 ms":>9}{"p95 ms":>9}{"p99 ms":>9}{"max ms":>9}'
+        )
+        for name, stats in report['operations'].items():
+            self.stdout.write(
+                f'{name:<26}{stats["requests"]:>9}{stats["errors"]:>8}{stats["rejected"]:>10}'
+                f'{stats["p50_ms"]:>9}{stats["p95_ms"]:>9}{stats["p99_ms"]:>9}{stats["max_ms"]:>9}'
+            )
+
+        self.stdout.write('')
+        self.stdout.write('Latency histogram (all requests)')
+        peak = max([count for _, count in report['histogram']] + [1])
+        for label, count in report['histogram']:
+            self.stdout.write(f'{label:>10} {count:>8} {"#" * round(40 * count / peak)}')
+
+        self.stdout.write('')
+        if report['double_bookings']:
+            self.stdout.write(self.style.ERROR(
+                f'{report["double_bookings"]} bookings overlap another active booking of the same property'
+            ))
+            for sample in report['double_booking_samples']:
+                self.stdout.write(
+                    f'  {sample["property_id"]} {sample["check_in"]} -> {sample["check_out"]} ({sample["status"]})'
+                )
+        else:
+            self.stdout.write(self.style.SUCCESS('No double bookings'))
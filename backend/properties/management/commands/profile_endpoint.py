@@ -0,0 +1,140 @@
+"""
+Profile one endpoint as a given user, against the data of this database.
+
+Usage:
+    python manage.py profile_endpoint /api/analytics/landlord/dashboard/ --as landlord@example.com
+    python manage.py profile_endpoint "/api/properties/?city=Lisbon" --profiler cprofile --output-dir profiles
+    python manage.py profile_endpoint /api/bookings/create/ --as tenant@example.com --method post --data '{"property": "..."}'
+
+The request goes through Django's test client (full middleware, authentication
+and serialization, no network). Writes are rolled back. Sampled profiles are
+written in collapsed-stack format (flamegraph.pl, speedscope); cProfile runs also
+write the raw .prof file. The SQL list is written next to them.
+"""
+import json
+import logging
+import os
+import re
+from contextlib import nullcontext
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import Client
+from django.test.utils import override_settings
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from propertree.profiling import PROFILERS, profile_call
+
+User = get_user_model()
+
+# Queries listed in the console summary, slowest first
+TOP_QUERIES = 10
+
+
+class Command(BaseCommand):
+    help = 'Profile one request as a user and save collapsed stacks (or cProfile stats) plus the SQL list'
+
+    def add_arguments(self, parser):
+        parser.add_argument('url', help='Path with query string, e.g. /api/analytics/landlord/dashboard/')
+        parser.add_argument('--as', dest='email', help='Email of the user to send the request as (anonymous by default)')
+        parser.add_argument('--method', default='get', choices=['get', 'post', 'put', 'patch', 'delete'])
+        parser.add_argument('--data', help='JSON body for non-GET requests')
+        parser.add_argument('--profiler', default='sample', choices=PROFILERS, help='Profiler to use (default sample)')
+        parser.add_argument(
+            '--repeat', type=int, default=1,
+            help='Profile the request this many times into one profile, for more samples of a fast endpoint',
+        )
+        parser.add_argument('--warmup', type=int, default=1, help='Unprofiled requests first (default 1)')
+        parser.add_argument('--output-dir', default='profiles', help='Directory for the output files (default profiles)')
+
+    def handle(self, *args, **options):
+        headers = {}
+        if options['email']:
+            user = User.objects.filter(email=options['email']).first()
+            if user is None:
+                raise CommandError(f'No user with email {options["email"]}')
+            headers['HTTP_AUTHORIZATION'] = f'Bearer {AccessToken.for_user(user)}'
+
+        method = options['method']
+        body = None
+        if method != 'get':
+            try:
+                body = json.loads(options['data'] or '{}')
+            except ValueError as e:
+                raise CommandError(f'--data is not valid JSON: {e}')
+
+        client = Client()
+
+        def send():
+            # Writes are rolled back so the request can be profiled repeatedly on real data
+            rollback = transaction.atomic() if method != 'get' else nullcontext()
+            with rollback:
+                if method == 'get':
+                    response = client.get(options['url'], **headers)
+                else:
+                    response = getattr(client, method)(options['url'], body, content_type='application/json', **headers)
+                if method != 'get':
+                    transaction.set_rollback(True)
+            return response
+
+        def send_repeatedly():
+            for _ in range(options['repeat']):
+                response = send()
+            return response
+
+        # The request log line would interleave with the report
+        request_logger = logging.getLogger('propertree.requests')
+        log_level = request_logger.level
+        request_logger.setLevel(logging.ERROR)
+        try:
+            with override_settings(
+                ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+                EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+            ):
+                for _ in range(options['warmup']):
+                    send()
+                result = profile_call(send_repeatedly, options['profiler'])
+        finally:
+            request_logger.setLevel(log_level)
+
+        response = result.value
+        self.write_files(result, options)
+        summary = result.summary()
+        self.stdout.write(
+            f'{method.upper()} {options["url"]} -> {response.status_code} '
+            f'({options["repeat"]} request(s)): {summary["duration_ms"]:.1f} ms, '
+            f'{summary["query_count"]} queries, {summary["sql_ms"]:.1f} ms SQL'
+            + (f', {summary["samples"]} samples' if 'samples' in summary else '')
+        )
+        slowest = sorted(result.queries, key=lambda query: query['duration_ms'], reverse=True)[:TOP_QUERIES]
+        for query in slowest:
+            self.stdout.write(f'  {query["duration_ms"]:>9.3f} ms  {query["sql"][:160]}')
+        if response.status_code >= 400:
+            self.stdout.write(self.style.WARNING(f'The endpoint answered {response.status_code}'))
+
+    def write_files(self, result, options):
+        os.makedirs(options['output_dir'], exist_ok=True)
+        slug = re.sub(r'[^A-Za-z0-9]+', '_', options['url'].split('?')[0]).strip('_') or 'root'
+        base = os.path.join(
+            options['output_dir'],
+            f'{slug}-{timezone.now().strftime("%Y%m%d-%H%M%S")}-{result.profiler}'
+        )
+        paths = []
+        if result.profiler == 'sample':
+            paths.append(f'{base}.collapsed')
+        else:
+            paths.append(f'{base}.txt')
+            result.save_profile(f'{base}.prof')
+            paths.append(f'{base}.prof')
+        with open(paths[0], 'w') as output_file:
+            output_file.write(result.output())
+
+        sql_path = f'{base}.sql.json'
+        with open(sql_path, 'w') as sql_file:
+            json.dump({**result.summary(), 'url': options['url'], 'queries': result.queries}, sql_file, indent=2)
+        paths.append(sql_path)
+        for path in paths:
+            self.stdout.write(f'Wrote {path}')
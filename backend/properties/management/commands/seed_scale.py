@@ -0,0 +1,490 @@
+"""
+Generate a large synthetic dataset for load tests and query plan checks.
+
+Usage:
+    python manage.py seed_scale
+    python manage.py seed_scale --landlords 2000 --properties-per 5 --bookings-per 12 --years 3
+    python manage.py seed_scale --clear
+
+Rows are built in memory with ids drawn from a seeded random generator and written
+with bulk_create in chunks, so the same --seed and --until always produce the same
+data. bulk_create skips save(): no outbox events, realtime pushes or counter updates
+are generated, the denormalized fields save() maintains (effective_cost, conversation
+last message and unread counts) are filled in directly, and the unread counters of the
+seeded users are rebuilt at the end. Seeded users share the --domain email domain,
+which is what --clear deletes.
+"""
+import random
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from datetime import date, datetime, time as dt_time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from dateutil.relativedelta import relativedelta
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import models, transaction
+
+from bookings.models import Booking
+from communications.counters import rebuild_unread_counters
+from communications.models import Conversation, Message
+from maintenance.models import MaintenanceRequest, ServiceCatalog, ServiceProvider
+from properties.models import Property, PropertyExpense
+from users.models import CustomUser, Profile
+
+
+FIRST_NAMES = [
+    'Ana', 'Ben', 'Chloe', 'Daniel', 'Elena', 'Farid', 'Grace', 'Hugo', 'Ines', 'Jonas',
+    'Kira', 'Liam', 'Maya', 'Nikolai', 'Olivia', 'Pedro', 'Quinn', 'Rosa', 'Samir', 'Tara',
+    'Umar', 'Vera', 'Wei', 'Ximena', 'Yusuf', 'Zoe',
+]
+LAST_NAMES = [
+    'Almeida', 'Brown', 'Costa', 'Dubois', 'Evans', 'Fischer', 'Garcia', 'Hansen', 'Ivanova',
+    'Jensen', 'Kowalski', 'Lopez', 'Martin', 'Novak', 'Okafor', 'Pereira', 'Rossi', 'Silva',
+    'Tanaka', 'Weber',
+]
+# (city, state, country, postal code prefix, price multiplier)
+CITIES = [
+    ('Lisbon', 'Lisbon', 'Portugal', '1000', Decimal('1.0')),
+    ('Porto', 'Porto', 'Portugal', '4000', Decimal('0.8')),
+    ('Madrid', 'Madrid', 'Spain', '280', Decimal('1.1')),
+    ('Barcelona', 'Catalonia', 'Spain', '080', Decimal('1.3')),
+    ('Paris', 'Ile-de-France', 'France', '750', Decimal('1.6')),
+    ('Berlin', 'Berlin', 'Germany', '101', Decimal('1.2')),
+    ('Amsterdam', 'North Holland', 'Netherlands', '101', Decimal('1.5')),
+    ('Austin', 'Texas', 'United States', '787', Decimal('1.2')),
+    ('Denver', 'Colorado', 'United States', '802', Decimal('1.1')),
+]
+STREETS = ['Oak', 'Harbour', 'Market', 'Station', 'Garden', 'River', 'Hill', 'Church', 'Mill', 'Castle']
+PROPERTY_ADJECTIVES = ['Sunny', 'Quiet', 'Modern', 'Charming', 'Spacious', 'Cosy', 'Bright', 'Historic']
+AMENITIES = ['wifi', 'parking', 'pool', 'gym', 'kitchen', 'air_conditioning', 'washer', 'balcony', 'workspace']
+# property type -> (bedroom range, base nightly price)
+PROPERTY_TYPES = {
+    'apartment': ((1, 3), Decimal('70')),
+    'house': ((2, 5), Decimal('120')),
+    'condo': ((1, 3), Decimal('85')),
+    'villa': ((3, 6), Decimal('260')),
+    'studio': ((1, 1), Decimal('55')),
+    'townhouse': ((2, 4), Decimal('110')),
+}
+MESSAGE_LINES = [
+    ('tenant', 'Hi! Is early check-in possible on the first day?'),
+    ('landlord', 'Yes, the flat will be ready from noon.'),
+    ('tenant', 'Great, and is there parking nearby?'),
+    ('landlord', 'There is a public garage two streets away, about 15 per day.'),
+    ('tenant', 'Thanks, see you then.'),
+]
+MAINTENANCE_ISSUES = {
+    'plumbing': 'Leaking tap in the kitchen',
+    'electrical': 'Bedroom sockets stopped working',
+    'hvac': 'Air conditioning blows warm air',
+    'appliance': 'Dishwasher does not drain',
+    'structural': 'Crack in the bathroom ceiling',
+    'cleaning': 'Deep clean needed after checkout',
+    'painting': 'Scuffed walls in the hallway',
+    'locksmith': 'Front door lock is sticking',
+    'pest_control': 'Ants in the kitchen',
+    'other': 'Wobbly balcony railing',
+}
+
+
+@contextmanager
+def manual_timestamps(*model_classes):
+    """Let explicit created/updated timestamps through by disabling auto_now(_add) while seeding."""
+    disabled = []
+    for model_class in model_classes:
+        for field in model_class._meta.concrete_fields:
+            if isinstance(field, models.DateField) and (field.auto_now or field.auto_now_add):
+                disabled.append((field, field.auto_now, field.auto_now_add))
+                field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in disabled:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class ChunkedWriter:
+    """Buffers unsaved rows per model and bulk inserts them in dependency order."""
+
+    def __init__(self, model_classes, chunk_size):
+        self.buffers = {model_class: [] for model_class in model_classes}
+        self.chunk_size = chunk_size
+        self.counts = Counter()
+
+    def add(self, instance):
+        self.buffers[type(instance)].append(instance)
+
+    def is_full(self):
+        return sum(len(rows) for rows in self.buffers.values()) >= self.chunk_size
+
+    def flush(self):
+        with transaction.atomic():
+            for model_class, rows in self.buffers.items():
+                if rows:
+                    model_class.objects.bulk_create(rows, batch_size=self.chunk_size)
+                    self.counts[model_class._meta.label] += len(rows)
+                    rows.clear()
+
+
+class Command(BaseCommand):
+    help = 'Generate a deterministic, production-scale synthetic dataset with bulk inserts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--landlords', type=int, default=10, help='Number of landlords (default 10)')
+        parser.add_argument('--properties-per', type=int, default=5, help='Properties per landlord (default 5)')
+        parser.add_argument(
+            '--bookings-per', type=int, default=12,
+            help='Bookings per approved property per year (default 12)',
+        )
+        parser.add_argument('--years', type=int, default=2, help='Years of history to generate (default 2)')
+        parser.add_argument(
+            '--tenants', type=int,
+            help='Number of tenants (default 10 per landlord)',
+        )
+        parser.add_argument('--seed', type=int, default=42, help='Random seed (default 42)')
+        parser.add_argument(
+            '--until', type=date.fromisoformat,
+            help='Last day of history, YYYY-MM-DD (default today); bookings run 90 days past it',
+        )
+        parser.add_argument('--domain', default='seed.propertree.test', help='Email domain of seeded users')
+        parser.add_argument('--password', default='propertree-seed', help='Password of every seeded user')
+        parser.add_argument('--chunk-size', type=int, default=5000, help='Rows per bulk insert (default 5000)')
+        parser.add_argument('--clear', action='store_true', help='Delete previously seeded users and their data first')
+
+    def handle(self, *args, **options):
+        domain = options['domain']
+        seeded_users = CustomUser.objects.filter(email__endswith=f'@{domain}')
+        if options['clear']:
+            deleted, _ = seeded_users.delete()
+            self.stdout.write(f'Deleted {deleted} seeded rows')
+        elif seeded_users.exists():
+            raise CommandError(f'Users @{domain} already exist; pass --clear or use another --domain')
+
+        self.rng = random.Random(options['seed'])
+        self.until = options['until'] or date.today()
+        self.start = self.until - relativedelta(years=options['years'])
+        self.options = options
+        self.password = make_password(options['password'])
+        self.catalog = list(ServiceCatalog.objects.filter(is_active=True).order_by('name').values_list('id', 'category', 'price'))
+        self.provider_ids = list(ServiceProvider.objects.filter(is_active=True).order_by('name').values_list('id', flat=True))
+        self.writer = ChunkedWriter(
+            [CustomUser, Profile, Property, Booking, Conversation, Message, PropertyExpense, MaintenanceRequest],
+            options['chunk_size']
+        )
+
+        started = time.monotonic()
+        models_with_timestamps = [
+            CustomUser, Profile, Property, Booking, Conversation, Message, PropertyExpense, MaintenanceRequest
+        ]
+        with manual_timestamps(*models_with_timestamps):
+            tenant_count = options['tenants'] or options['landlords'] * 10
+            self.tenant_ids = [self.add_user('tenant', index) for index in range(tenant_count)]
+            for index in range(options['landlords']):
+                landlord_id = self.add_user('landlord', index)
+                for _ in range(options['properties_per']):
+                    self.add_property(landlord_id)
+                if self.writer.is_full():
+                    self.writer.flush()
+            self.writer.flush()
+
+        rebuilt = rebuild_unread_counters(seeded_users.order_by('pk').values_list('pk', flat=True).iterator())
+        for label, count in sorted(self.writer.counts.items()):
+            self.stdout.write(f'  {label}: {count}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeded {sum(self.writer.counts.values())} rows in {time.monotonic() - started:.1f}s '
+            f'(unread counters rebuilt for {rebuilt} users)'
+        ))
+
+    # ----- random helpers -----
+
+    def uuid(self):
+        return uuid.UUID(int=self.rng.getrandbits(128), version=4)
+
+    def moment(self, day, earliest_hour=8, latest_hour=21):
+        """Return an aware UTC datetime at a random time of the given day."""
+        return datetime.combine(day, dt_time(
+            self.rng.randint(earliest_hour, latest_hour), self.rng.randint(0, 59), self.rng.randint(0, 59)
+        ), tzinfo=dt_timezone.utc)
+
+    def day_between(self, first, last):
+        if last <= first:
+            return first
+        return first + timedelta(days=self.rng.randint(0, (last - first).days))
+
+    def money(self, low, high):
+        return Decimal(self.rng.randint(low * 100, high * 100)) / 100
+
+    # ----- row builders -----
+
+    def add_user(self, role, index):
+        """Queue a user with a profile; returns the user id."""
+        first_name, last_name = self.rng.choice(FIRST_NAMES), self.rng.choice(LAST_NAMES)
+        created_at = self.moment(self.day_between(self.start, self.start + timedelta(days=60)))
+        user = CustomUser(
+            id=self.uuid(),
+            email=f'{role}{index:06d}@{self.options["domain"]}',
+            password=self.password,
+            role=role,
+            is_verified=True,
+            email_digest_frequency=self.rng.choices(['immediate', 'hourly', 'daily'], [8, 1, 1])[0],
+            created_at=created_at,
+            updated_at=created_at,
+        )
+        self.writer.add(user)
+        self.writer.add(Profile(
+            id=self.uuid(),
+            user_id=user.id,
+            first_name=first_name,
+            last_name=last_name,
+            phone_number=f'+1555{self.rng.randint(0, 9999999):07d}',
+            created_at=created_at,
+            updated_at=created_at,
+        ))
+        return user.id
+
+    def add_property(self, landlord_id):
+        """Queue a property and, if approved, its bookings, expenses and maintenance history."""
+        rng = self.rng
+        property_type = rng.choice(list(PROPERTY_TYPES))
+        (min_bedrooms, max_bedrooms), base_price = PROPERTY_TYPES[property_type]
+        city, state, country, postal_prefix, multiplier = rng.choice(CITIES)
+        bedrooms = rng.randint(min_bedrooms, max_bedrooms)
+        created_on = self.day_between(self.start, self.start + timedelta(days=180))
+        status = rng.choices(['approved', 'pending_approval', 'draft', 'rejected'], [85, 5, 5, 5])[0]
+        created_at = self.moment(created_on)
+        approved_at = created_at + timedelta(days=rng.randint(1, 5)) if status == 'approved' else None
+
+        prop = Property(
+            id=self.uuid(),
+            landlord_id=landlord_id,
+            title=f'{rng.choice(PROPERTY_ADJECTIVES)} {property_type} in {city}',
+            description=f'{bedrooms} bedroom {property_type} close to the centre of {city}.',
+            property_type=property_type,
+            address=f'{rng.randint(1, 250)} {rng.choice(STREETS)} Street',
+            city=city,
+            state=state,
+            country=country,
+            postal_code=f'{postal_prefix}{rng.randint(10, 99)}',
+            bedrooms=bedrooms,
+            bathrooms=Decimal(max(1, bedrooms - rng.randint(0, 1))),
+            max_guests=bedrooms * 2,
+            price_per_night=(base_price * multiplier + 10 * bedrooms).quantize(Decimal('1.00')),
+            approval_type=rng.choices(['landlord', 'admin'], [4, 1])[0],
+            amenities=rng.sample(AMENITIES, rng.randint(2, 6)),
+            photos=[f'https://picsum.photos/seed/{rng.getrandbits(32)}/1200/800' for _ in range(3)],
+            status=status,
+            rejection_reason='Photos do not match the description.' if status == 'rejected' else '',
+            approved_at=approved_at,
+            created_at=created_at,
+            updated_at=approved_at or created_at,
+        )
+        self.writer.add(prop)
+        if status != 'approved':
+            return
+
+        tenant_ids = self.add_bookings(prop, landlord_id, approved_at.date())
+        self.add_expenses(prop, created_on)
+        self.add_maintenance(prop, landlord_id, approved_at.date(), tenant_ids)
+
+    def add_bookings(self, prop, landlord_id, listed_on):
+        """
+        Queue non-overlapping bookings from the listing date to 90 days past --until.
+        The window is cut into one slot per booking and each stay fits inside its slot.
+        Returns the ids of the tenants who stayed.
+        """
+        rng = self.rng
+        window_start = max(listed_on, self.start)
+        window_end = self.until + timedelta(days=90)
+        window_days = (window_end - window_start).days
+        years = window_days / 365
+        count = min(round(self.options['bookings_per'] * years), window_days // 2)
+        tenant_ids = []
+
+        for slot in range(count):
+            slot_start = window_start + timedelta(days=window_days * slot // count)
+            slot_end = window_start + timedelta(days=window_days * (slot + 1) // count)
+            nights = rng.randint(1, min(14, (slot_end - slot_start).days))
+            check_in = self.day_between(slot_start, slot_end - timedelta(days=nights))
+            check_out = check_in + timedelta(days=nights)
+            tenant_id = rng.choice(self.tenant_ids)
+
+            if check_out <= self.until:
+                status = rng.choices(['completed', 'cancelled'], [85, 15])[0]
+            elif check_in <= self.until:
+                status = 'confirmed'
+            else:
+                status = rng.choices(['confirmed', 'pending', 'cancelled'], [7, 2, 1])[0]
+
+            created_at = self.moment(max(check_in - timedelta(days=rng.randint(3, 90)), listed_on))
+            confirmed_at = cancelled_at = completed_at = None
+            if status in ('confirmed', 'completed'):
+                confirmed_at = created_at + timedelta(hours=rng.randint(1, 48))
+            if status == 'completed':
+                completed_at = self.moment(check_out, 10, 12)
+            if status == 'cancelled':
+                cancelled_at = created_at + timedelta(hours=rng.randint(1, 24 * max(1, (check_in - created_at.date()).days)))
+
+            booking = Booking(
+                id=self.uuid(),
+                property_id=prop.id,
+                tenant_id=tenant_id,
+                check_in=check_in,
+                check_out=check_out,
+                guests_count=rng.randint(1, prop.max_guests),
+                total_price=prop.price_per_night * nights,
+                status=status,
+                confirmed_at=confirmed_at,
+                cancelled_at=cancelled_at,
+                completed_at=completed_at,
+                created_at=created_at,
+                updated_at=completed_at or cancelled_at or confirmed_at or created_at,
+            )
+            self.writer.add(booking)
+            tenant_ids.append(tenant_id)
+
+            if status != 'pending' and rng.random() < 0.4:
+                self.add_conversation(booking, landlord_id)
+
+        return tenant_ids
+
+    def add_conversation(self, booking, landlord_id):
+        """Queue a short tenant/landlord thread about a booking, with its denormalized inbox fields."""
+        rng = self.rng
+        participant1_id, participant2_id = Conversation.ordered_participants(booking.tenant_id, landlord_id)
+        conversation = Conversation(
+            id=self.uuid(),
+            participant1_id=participant1_id,
+            participant2_id=participant2_id,
+            booking_id=booking.id,
+            created_at=booking.created_at,
+        )
+        # Threads about stays that have not started yet may still have an unanswered message
+        recent = booking.check_in > self.until
+        sent_at = booking.created_at
+        messages = []
+        for sender_role, text in MESSAGE_LINES[:rng.randint(2, len(MESSAGE_LINES))]:
+            sent_at += timedelta(minutes=rng.randint(5, 600))
+            sender_id, recipient_id = (
+                (booking.tenant_id, landlord_id) if sender_role == 'tenant' else (landlord_id, booking.tenant_id)
+            )
+            messages.append(Message(
+                id=self.uuid(),
+                booking_id=booking.id,
+                conversation_id=conversation.id,
+                sender_id=sender_id,
+                recipient_id=recipient_id,
+                subject=f'Booking {booking.check_in:%d %b %Y}',
+                message_text=text,
+                is_read=True,
+                read_at=sent_at + timedelta(minutes=rng.randint(1, 120)),
+                sent_at=sent_at,
+            ))
+        last = messages[-1]
+        if recent and rng.random() < 0.5:
+            last.is_read, last.read_at = False, None
+            if last.recipient_id == conversation.participant1_id:
+                conversation.participant1_unread_count = 1
+            else:
+                conversation.participant2_unread_count = 1
+
+        conversation.last_message_at = last.sent_at
+        conversation.last_message_preview = last.message_text[:255]
+        conversation.last_message_sender_id = last.sender_id
+        conversation.updated_at = last.sent_at
+        self.writer.add(conversation)
+        for message in messages:
+            self.writer.add(message)
+
+    def add_expenses(self, prop, created_on):
+        """Queue monthly utilities and annual insurance (with their occurrences) plus one-off repairs."""
+        rng = self.rng
+        first_month = (created_on + relativedelta(months=1)).replace(day=1)
+        recurring = [
+            ('utilities', 'Electricity and water', self.money(60, 220), 'monthly'),
+            ('insurance', 'Buildings and contents insurance', self.money(300, 1200), 'annual'),
+        ]
+        for category, description, amount, frequency in recurring:
+            parent = PropertyExpense(
+                id=self.uuid(),
+                property_id=prop.id,
+                category=category,
+                description=description,
+                amount=amount,
+                expense_date=first_month,
+                is_recurring=True,
+                recurrence_frequency=frequency,
+            )
+            occurrences = parent.build_occurrences(self.until)
+            for occurrence in occurrences:
+                occurrence.id = self.uuid()
+            for row in [parent] + occurrences:
+                row.created_at = row.updated_at = self.moment(row.expense_date)
+                self.writer.add(row)
+
+        one_off_count = round(4 * (self.until - first_month).days / 365)
+        for _ in range(one_off_count):
+            category = rng.choice(['repairs', 'cleaning', 'maintenance', 'other'])
+            expense_date = self.day_between(first_month, self.until)
+            created_at = self.moment(expense_date)
+            self.writer.add(PropertyExpense(
+                id=self.uuid(),
+                property_id=prop.id,
+                category=category,
+                description=f'{category.capitalize()} invoice',
+                amount=self.money(40, 900),
+                expense_date=expense_date,
+                created_at=created_at,
+                updated_at=created_at,
+            ))
+
+    def add_maintenance(self, prop, landlord_id, listed_on, tenant_ids):
+        """Queue about three maintenance requests per year; some are landlord service bookings."""
+        rng = self.rng
+        count = round(3 * (self.until - listed_on).days / 365)
+        for _ in range(count):
+            reported_on = self.day_between(listed_on, self.until)
+            reported_at = self.moment(reported_on)
+            age_days = (self.until - reported_on).days
+            if age_days > 30:
+                status = rng.choices(['resolved', 'closed', 'cancelled'], [7, 2, 1])[0]
+            else:
+                status = rng.choice(['open', 'assigned', 'in_progress', 'resolved'])
+
+            request = MaintenanceRequest(
+                id=self.uuid(),
+                rental_property_id=prop.id,
+                priority=rng.choices(['low', 'medium', 'high', 'urgent'], [3, 4, 2, 1])[0],
+                status=status,
+                reported_at=reported_at,
+            )
+            if self.catalog and rng.random() < 0.3:
+                catalog_id, category, price = rng.choice(self.catalog)
+                request.reported_by_id = landlord_id
+                request.service_catalog_id = catalog_id
+                request.service_price = price
+                request.requested_date = reported_on + timedelta(days=rng.randint(1, 14))
+                request.requested_time = dt_time(rng.choice([9, 11, 14, 16]))
+                request.booking_type = rng.choices(['scheduled', 'emergency'], [9, 1])[0]
+                if category not in MAINTENANCE_ISSUES:
+                    category = 'other'
+            else:
+                category = rng.choice(list(MAINTENANCE_ISSUES))
+                request.reported_by_id = rng.choice(tenant_ids) if tenant_ids and rng.random() < 0.7 else landlord_id
+            request.category = category
+            request.title = MAINTENANCE_ISSUES[category]
+            request.description = f'{MAINTENANCE_ISSUES[category]}. Reported at {prop.address}.'
+
+            if status in ('assigned', 'in_progress', 'resolved', 'closed') and self.provider_ids:
+                request.assigned_to_id = rng.choice(self.provider_ids)
+                request.assigned_at = reported_at + timedelta(hours=rng.randint(1, 48))
+            if status in ('resolved', 'closed'):
+                request.resolved_at = reported_at + timedelta(hours=rng.randint(4, 24 * min(14, max(1, age_days))))
+                request.resolution_notes = 'Fixed on site.'
+                request.cost = self.money(30, 600)
+                request.rating = rng.randint(3, 5)
+            request.effective_cost = request.cost if request.cost is not None else request.service_price
+            request.updated_at = request.resolved_at or request.assigned_at or reported_at
+            self.writer.add(request)
@@ -0,0 +1,28 @@
+# Generated by Django 5.0.1 on 2026-10-19 05:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0005_property_approval_type'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='propertyexpense',
+            name='recurrence_end_date',
+            field=models.DateField(blank=True, help_text='Last date on which a recurring expense may occur', null=True),
+        ),
+        migrations.AddField(
+            model_name='propertyexpense',
+            name='recurrence_parent',
+            field=models.ForeignKey(blank=True, help_text='Recurring expense this occurrence was generated from', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='occurrences', to='properties.propertyexpense'),
+        ),
+        migrations.AddConstraint(
+            model_name='propertyexpense',
+            constraint=models.UniqueConstraint(fields=('recurrence_parent', 'expense_date'), name='unique_expense_occurrence'),
+        ),
+    ]
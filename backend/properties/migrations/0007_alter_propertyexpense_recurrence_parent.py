@@ -0,0 +1,19 @@
+# Generated by Django 5.0.1 on 2026-10-19 14:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0006_propertyexpense_recurrence'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='propertyexpense',
+            name='recurrence_parent',
+            field=models.ForeignKey(blank=True, help_text='Recurring expense this occurrence was generated from', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='occurrences', to='properties.propertyexpense'),
+        ),
+    ]
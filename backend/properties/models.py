@@ -2,9 +2,11 @@
 Simplified Property model for Propertree.
 """
 import uuid
-from django.db import models
+from dateutil.relativedelta import relativedelta
+from django.db import models, transaction
 from django.db.models import Q
 from django.conf import settings
+from events.outbox import record_event
 
 
 class Property(models.Model):
@@ -149,17 +151,37 @@ class Property(models.Model):
     def approve(self, admin_user):
         """Approve the property."""
         from django.utils import timezone
+        previous_status = self.status
         self.status = 'approved'
         self.approved_by = admin_user
         self.approved_at = timezone.now()
         self.rejection_reason = ''
-        self.save()
+        with transaction.atomic():
+            self.save()
+            record_event(
+                'property.approved',
+                self,
+                landlord_id=str(self.landlord_id),
+                approved_by_id=str(admin_user.id),
+                previous_status=previous_status,
+                status=self.status
+            )
     
     def reject(self, reason):
         """Reject the property with a reason."""
+        previous_status = self.status
         self.status = 'rejected'
         self.rejection_reason = reason
-        self.save()
+        with transaction.atomic():
+            self.save()
+            record_event(
+                'property.rejected',
+                self,
+                landlord_id=str(self.landlord_id),
+                reason=reason,
+                previous_status=previous_status,
+                status=self.status
+            )
 
 
 class PropertyExpense(models.Model):
@@ -181,6 +203,14 @@ class PropertyExpense(models.Model):
         ('other', 'Other'),
     ]
     
+    # Months between occurrences for each recurrence frequency
+    RECURRENCE_MONTHS = {
+        'monthly': 1,
+        'quarterly': 3,
+        'semi_annual': 6,
+        'annual': 12,
+    }
+    
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     
     # Foreign Keys
@@ -189,6 +219,14 @@ class PropertyExpense(models.Model):
         on_delete=models.CASCADE,
         related_name='expenses'
     )
+    recurrence_parent = models.ForeignKey(
+        'self',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='occurrences',
+        help_text='Recurring expense this occurrence was generated from'
+    )
     
     # Expense Details
     category = models.CharField(max_length=50, choices=EXPENSE_CATEGORIES)
@@ -211,6 +249,11 @@ class PropertyExpense(models.Model):
         blank=True,
         null=True
     )
+    recurrence_end_date = models.DateField(
+        blank=True,
+        null=True,
+        help_text='Last date on which a recurring expense may occur'
+    )
     
     # Attachments
     receipt_url = models.URLField(blank=True, null=True)
@@ -228,9 +271,58 @@ class PropertyExpense(models.Model):
             models.Index(fields=['property', 'expense_date']),
             models.Index(fields=['property', 'category']),
         ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['recurrence_parent', 'expense_date'],
+                name='unique_expense_occurrence'
+            ),
+        ]
     
     def __str__(self):
         return f"{self.get_category_display()} - €{self.amount:,.2f} ({self.property.title})"
+    
+    def build_occurrences(self, until, after=None):
+        """
+        Build (unsaved) occurrences of a recurring expense up to and including `until`.
+        The expense itself is the first occurrence; dates are stepped from expense_date
+        so month-end dates do not drift. Occurrences on or before `after` are skipped.
+        """
+        months = self.RECURRENCE_MONTHS.get(self.recurrence_frequency)
+        if not self.is_recurring or not months:
+            return []
+        
+        if self.recurrence_end_date and self.recurrence_end_date < until:
+            until = self.recurrence_end_date
+        
+        occurrences = []
+        step = 1
+        occurrence_date = self.expense_date + relativedelta(months=months)
+        while occurrence_date <= until:
+            if after is None or occurrence_date > after:
+                occurrences.append(PropertyExpense(
+                    property_id=self.property_id,
+                    recurrence_parent=self,
+                    category=self.category,
+                    description=self.description,
+                    amount=self.amount,
+                    expense_date=occurrence_date,
+                ))
+            step += 1
+            occurrence_date = self.expense_date + relativedelta(months=months * step)
+        
+        return occurrences
+    
+    def replace_future_occurrences(self, until, today):
+        """
+        Delete the occurrences dated after `today` and rebuild them up to `until`
+        from the current amount and schedule. Occurrences up to `today` are kept
+        as recorded, since those costs have already been incurred.
+        """
+        self.occurrences.filter(expense_date__gt=today).delete()
+        PropertyExpense.objects.bulk_create(
+            self.build_occurrences(until, after=today),
+            ignore_conflicts=True
+        )
 
 
 class Favorite(models.Model):
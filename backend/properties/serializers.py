@@ -4,6 +4,7 @@ Simplified serializers for Properties app.
 from rest_framework import serializers
 from .models import Property, PropertyExpense, Favorite
 from users.serializers import ProfileSerializer
+from propertree.tracing import TracedListSerializer
 
 
 class PropertyListSerializer(serializers.ModelSerializer):
@@ -15,6 +16,7 @@ class PropertyListSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Property
+        list_serializer_class = TracedListSerializer
         fields = [
             'id', 'title', 'description', 'property_type', 'city', 'state', 'country',
             'bedrooms', 'bathrooms', 'max_guests', 'price_per_night', 'approval_type',
@@ -70,6 +72,7 @@ class PropertyDetailSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Property
+        list_serializer_class = TracedListSerializer
         fields = [
             'id', 'landlord', 'landlord_name', 'landlord_email', 'landlord_profile', 'title', 'description',
             'property_type', 'address', 'city', 'state', 'country', 'postal_code',
@@ -149,12 +152,14 @@ class PropertyExpenseSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = PropertyExpense
+        list_serializer_class = TracedListSerializer
         fields = [
             'id', 'property', 'property_title', 'category', 'category_display',
             'description', 'amount', 'expense_date', 'is_recurring',
-            'recurrence_frequency', 'receipt_url', 'created_at', 'updated_at'
+            'recurrence_frequency', 'recurrence_end_date', 'recurrence_parent',
+            'receipt_url', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'recurrence_parent', 'created_at', 'updated_at']
     
     def validate(self, data):
         """Validate expense data."""
@@ -172,7 +177,7 @@ class PropertyExpenseCreateSerializer(serializers.ModelSerializer):
         model = PropertyExpense
         fields = [
             'property', 'category', 'description', 'amount', 'expense_date',
-            'is_recurring', 'recurrence_frequency', 'receipt_url'
+            'is_recurring', 'recurrence_frequency', 'recurrence_end_date', 'receipt_url'
         ]
     
     def validate(self, data):
@@ -194,6 +199,83 @@ class PropertyExpenseCreateSerializer(serializers.ModelSerializer):
         return data
 
 
+class PropertyExpenseImportSerializer(serializers.ModelSerializer):
+    """
+    Serializer for validating a single row of a bulk expense import.
+    Property ownership is checked against the prefetched `property_ids` set in context.
+    """
+    
+    property = serializers.UUIDField()
+    
+    class Meta:
+        model = PropertyExpense
+        fields = [
+            'property', 'category', 'description', 'amount', 'expense_date',
+            'is_recurring', 'recurrence_frequency', 'recurrence_end_date', 'receipt_url'
+        ]
+    
+    def validate_property(self, value):
+        """Ensure the property belongs to the importing landlord."""
+        if value not in self.context['property_ids']:
+            raise serializers.ValidationError('You can only add expenses to your own properties.')
+        return value
+    
+    def validate(self, data):
+        """Validate expense data."""
+        if data.get('is_recurring') and not data.get('recurrence_frequency'):
+            raise serializers.ValidationError({
+                'recurrence_frequency': 'Recurrence frequency is required for recurring expenses.'
+            })
+        return data
+
+
+class DelimitedListField(serializers.ListField):
+    """List field that also accepts a '|'-separated string (as written in CSV cells)."""
+    
+    def to_internal_value(self, data):
+        if isinstance(data, str):
+            data = [item.strip() for item in data.split('|') if item.strip()]
+        return super().to_internal_value(data)
+
+
+class PropertyImportSerializer(serializers.ModelSerializer):
+    """
+    Serializer for validating a single row of a bulk property import.
+    Duplicates are checked against the `existing_keys` set in context, which
+    holds the landlord's current listings and grows with each accepted row.
+    """
+    
+    amenities = DelimitedListField(child=serializers.CharField(), required=False)
+    photos = DelimitedListField(child=serializers.JSONField(), required=False)
+    status = serializers.ChoiceField(
+        choices=[('draft', 'Draft'), ('pending_approval', 'Pending Approval')],
+        default='draft'
+    )
+    
+    class Meta:
+        model = Property
+        fields = [
+            'title', 'description', 'property_type', 'address', 'city', 'state',
+            'country', 'postal_code', 'bedrooms', 'bathrooms', 'max_guests',
+            'price_per_night', 'approval_type', 'amenities', 'photos', 'status'
+        ]
+    
+    @staticmethod
+    def get_duplicate_key(title, address):
+        """Normalized (title, address) pair used to detect duplicate listings."""
+        return (' '.join(title.lower().split()), ' '.join(address.lower().split()))
+    
+    def validate(self, data):
+        """Reject rows that duplicate an existing listing or an earlier row."""
+        key = self.get_duplicate_key(data['title'], data['address'])
+        if key in self.context['existing_keys']:
+            raise serializers.ValidationError(
+                'A property with this title and address already exists.'
+            )
+        self.context['existing_keys'].add(key)
+        return data
+
+
 class FavoriteSerializer(serializers.ModelSerializer):
     """Serializer for favorites."""
     
@@ -202,6 +284,7 @@ class FavoriteSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Favorite
+        list_serializer_class = TracedListSerializer
         fields = ['id', 'property', 'property_id', 'created_at']
         read_only_fields = ['id', 'created_at']
     
@@ -0,0 +1,129 @@
+"""
+Celery tasks for Properties app.
+"""
+import base64
+import mimetypes
+import uuid
+from datetime import timedelta
+
+from celery import shared_task
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models import F, Max, Q
+from django.utils import timezone
+
+from .models import Property, PropertyExpense
+
+
+def get_recurrence_horizon():
+    """Return the last date up to which recurring expenses are materialized."""
+    return timezone.now().date() + timedelta(days=settings.RECURRING_EXPENSE_HORIZON_DAYS)
+
+
+@shared_task
+def materialize_recurring_expenses():
+    """
+    Expand recurring expenses into concrete occurrence rows up to the rolling horizon.
+    Each template resumes from its latest materialized occurrence; the
+    (recurrence_parent, expense_date) unique constraint makes re-runs idempotent.
+    Returns the number of occurrences submitted for insert.
+    """
+    horizon = get_recurrence_horizon()
+    batch_size = settings.RECURRING_EXPENSE_BATCH_SIZE
+
+    templates = PropertyExpense.objects.filter(
+        is_recurring=True,
+        recurrence_frequency__in=PropertyExpense.RECURRENCE_MONTHS.keys(),
+        recurrence_parent__isnull=True,
+        expense_date__lt=horizon
+    ).filter(
+        Q(recurrence_end_date__isnull=True) | Q(recurrence_end_date__gt=F('expense_date'))
+    ).annotate(
+        last_occurrence=Max('occurrences__expense_date')
+    ).order_by()
+
+    submitted = 0
+    pending = []
+    for template in templates.iterator(chunk_size=batch_size):
+        pending.extend(template.build_occurrences(horizon, after=template.last_occurrence))
+        if len(pending) >= batch_size:
+            PropertyExpense.objects.bulk_create(pending, batch_size=batch_size, ignore_conflicts=True)
+            submitted += len(pending)
+            pending = []
+
+    if pending:
+        PropertyExpense.objects.bulk_create(pending, batch_size=batch_size, ignore_conflicts=True)
+        submitted += len(pending)
+
+    return submitted
+
+
+@shared_task(bind=True)
+def import_landlord_file(self, kind, landlord_id, file_name, import_format):
+    """
+    Import a landlord's expense or property file previously saved to default storage.
+    Progress counts are published as task state so the client can poll them.
+    """
+    from .imports import IMPORTERS, iter_import_rows
+
+    def report_progress(summary):
+        self.update_state(state='PROGRESS', meta={
+            'landlord_id': landlord_id,
+            'processed': summary['processed'],
+            'created': summary['created'],
+            'failed': summary['failed'],
+        })
+
+    try:
+        with default_storage.open(file_name, 'rb') as file_obj:
+            summary = IMPORTERS[kind](
+                landlord_id,
+                iter_import_rows(file_obj, import_format),
+                progress_callback=report_progress
+            )
+    finally:
+        default_storage.delete(file_name)
+
+    summary['landlord_id'] = landlord_id
+    return summary
+
+
+def _store_embedded_photo(property_id, index, data_url):
+    """Decode a base64 data URL into media storage and return its public URL."""
+    header, _, encoded = data_url.partition(',')
+    mime_type = header[len('data:'):].split(';')[0]
+    extension = mimetypes.guess_extension(mime_type) or '.jpg'
+    content = base64.b64decode(encoded)
+    file_name = default_storage.save(
+        f'property_photos/{property_id}/{index}_{uuid.uuid4().hex[:8]}{extension}',
+        ContentFile(content)
+    )
+    return default_storage.url(file_name)
+
+
+@shared_task
+def process_property_photos(property_ids):
+    """
+    Move base64-embedded photos of imported properties into media storage.
+    The inline data URLs are replaced with storage URLs so listing payloads stay small.
+    Photos that cannot be decoded are dropped. Returns the number of properties updated.
+    """
+    from .imports import get_photo_source, is_embedded_photo
+
+    updated = []
+    for prop in Property.objects.filter(id__in=property_ids).only('id', 'photos'):
+        photos = []
+        for index, photo in enumerate(prop.photos or []):
+            if not is_embedded_photo(photo):
+                photos.append(photo)
+                continue
+            try:
+                photos.append(_store_embedded_photo(prop.id, index, get_photo_source(photo)))
+            except ValueError:
+                continue
+        prop.photos = photos
+        updated.append(prop)
+
+    Property.objects.bulk_update(updated, ['photos'], batch_size=settings.BULK_IMPORT_CHUNK_SIZE)
+    return len(updated)
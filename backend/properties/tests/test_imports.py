@@ -0,0 +1,121 @@
+"""
+Tests for landlord bulk imports: file parsing, per-line errors and partial failures.
+"""
+import io
+import json
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from propertree.tests.dataset import build_dataset
+
+from ..imports import ImportFormatError, import_expenses, iter_import_rows
+from ..models import PropertyExpense
+
+
+def rows_of(content, import_format):
+    return list(iter_import_rows(io.BytesIO(content.encode()), import_format))
+
+
+class ImportParsingTests(TestCase):
+
+    def test_csv_rows_carry_line_numbers_and_drop_empty_cells(self):
+        rows = rows_of('\ufeffcategory, amount ,description\nutilities, 10.50 ,\n', 'csv')
+        self.assertEqual(rows, [(2, {'category': 'utilities', 'amount': '10.50'})])
+
+    def test_jsonl_skips_blank_lines_and_reports_bad_line(self):
+        with self.assertRaisesMessage(ImportFormatError, 'Line 4'):
+            rows_of('{"a": 1}\n\n{"a": 2}\n{"a": \n', 'jsonl')
+
+    def test_json_must_be_an_array(self):
+        self.assertEqual(rows_of('[{"a": 1}, {"a": 2}]', 'json'), [(1, {'a': 1}), (2, {'a': 2})])
+        with self.assertRaisesMessage(ImportFormatError, 'array'):
+            rows_of('{"a": 1}', 'json')
+
+
+class ExpenseImportTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = build_dataset(rows=1)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.data['landlord'])
+        self.initial_count = PropertyExpense.objects.count()
+
+    def expense_row(self, **overrides):
+        row = {
+            'property': str(self.data['property'].id),
+            'category': 'utilities',
+            'description': 'Electricity',
+            'amount': '45.00',
+            'expense_date': '2026-01-15',
+        }
+        row.update(overrides)
+        return row
+
+    def upload(self, name, content):
+        return self.client.post(
+            reverse('properties:expense_import'),
+            {'file': SimpleUploadedFile(name, content.encode())},
+            format='multipart'
+        )
+
+    def test_valid_rows_are_created_and_invalid_rows_reported_per_line(self):
+        other_property = '00000000-0000-0000-0000-000000000000'
+        content = '\n'.join(json.dumps(row) for row in [
+            self.expense_row(),
+            self.expense_row(amount='not a number'),
+            self.expense_row(property=other_property),
+            self.expense_row(is_recurring=True),
+            self.expense_row(description='Gas'),
+        ])
+
+        response = self.upload('expenses.jsonl', content)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['processed'], response.data['created'], response.data['failed']), (5, 2, 3))
+        self.assertEqual([error['line'] for error in response.data['errors']], [2, 3, 4])
+        self.assertIn('property', response.data['errors'][1]['errors'])
+        self.assertEqual(PropertyExpense.objects.count(), self.initial_count + 2)
+
+    def test_file_that_stops_parsing_creates_nothing(self):
+        content = '\n'.join([json.dumps(self.expense_row()), json.dumps(self.expense_row()), '{"property": '])
+
+        response = self.upload('expenses.jsonl', content)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Line 3', response.data['error'])
+        self.assertEqual(response.data['created'], 0)
+        self.assertEqual(PropertyExpense.objects.count(), self.initial_count)
+
+        # Resending the fixed file imports every row exactly once
+        fixed = '\n'.join(json.dumps(self.expense_row()) for _ in range(3))
+        self.assertEqual(self.upload('expenses.jsonl', fixed).data['created'], 3)
+        self.assertEqual(PropertyExpense.objects.count(), self.initial_count + 3)
+
+    def test_background_import_keeps_committed_chunks(self):
+        def rows():
+            yield 1, self.expense_row()
+            yield 2, self.expense_row()
+            yield 3, self.expense_row()
+            raise ImportFormatError('Line 4: invalid JSON')
+
+        summary = import_expenses(str(self.data['landlord'].id), rows(), chunk_size=2)
+
+        self.assertEqual(summary['created'], 3)
+        self.assertEqual(summary['error'], 'Line 4: invalid JSON')
+        self.assertEqual(PropertyExpense.objects.count(), self.initial_count + 3)
+
+    def test_recurring_rows_are_materialized(self):
+        response = self.upload('expenses.csv', (
+            'property,category,description,amount,expense_date,is_recurring,recurrence_frequency,recurrence_end_date\n'
+            f'{self.data["property"].id},insurance,Policy,30.00,2026-01-01,true,monthly,2026-04-01\n'
+        ))
+
+        self.assertEqual(response.data['created'], 1)
+        template = PropertyExpense.objects.get(description='Policy', recurrence_parent__isnull=True)
+        self.assertEqual(template.occurrences.count(), 3)
@@ -0,0 +1,111 @@
+"""
+Tests for the bulk property import.
+"""
+import base64
+import json
+import shutil
+import tempfile
+from unittest.mock import patch
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from propertree.tests.dataset import build_dataset
+
+from ..models import Property
+from ..tasks import process_property_photos
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+CSV_HEADER = (
+    'title,description,property_type,address,city,state,country,postal_code,'
+    'bedrooms,bathrooms,max_guests,price_per_night,amenities,photos\n'
+)
+
+
+def csv_row(title, address, photos=''):
+    return (
+        f'{title},Bright flat,apartment,{address},Porto,Porto,Portugal,4000-001,'
+        f'2,1.0,4,95.00,wifi | kitchen,{photos}\n'
+    )
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class PropertyImportTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = build_dataset(rows=1)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.data['landlord'])
+
+    def upload(self, name, content):
+        return self.client.post(
+            reverse('properties:landlord_import'),
+            {'file': SimpleUploadedFile(name, content if isinstance(content, bytes) else content.encode())},
+            format='multipart'
+        )
+
+    def test_csv_import_splits_lists_and_rejects_duplicates(self):
+        existing = self.data['property']
+        response = self.upload('properties.csv', CSV_HEADER + ''.join([
+            csv_row('River View', '1 Quay Street'),
+            csv_row('river  view', '1 quay street'),
+            csv_row(existing.title, existing.address),
+            csv_row('Garden House', '2 Park Lane'),
+        ]))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['created'], response.data['failed']), (2, 2))
+        self.assertEqual([error['line'] for error in response.data['errors']], [3, 4])
+
+        imported = Property.objects.get(title='River View')
+        self.assertEqual(imported.landlord, self.data['landlord'])
+        self.assertEqual(imported.amenities, ['wifi', 'kitchen'])
+        self.assertEqual(imported.status, 'draft')
+
+    def test_embedded_photos_are_moved_to_storage_after_commit(self):
+        photo = 'data:image/png;base64,' + base64.b64encode(b'not really a png').decode()
+        rows = [{
+            'title': 'Loft', 'description': 'Open plan', 'property_type': 'apartment',
+            'address': '3 Mill Road', 'city': 'Porto', 'state': 'Porto', 'country': 'Portugal',
+            'postal_code': '4000-002', 'bedrooms': 1, 'bathrooms': '1.0', 'max_guests': 2,
+            'price_per_night': '70.00', 'photos': [photo, 'https://example.com/a.jpg'],
+        }]
+
+        # Run the queued task in-process instead of sending it to the broker
+        with patch.object(process_property_photos, 'delay', side_effect=process_property_photos) as delay:
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                response = self.upload('properties.json', json.dumps(rows))
+
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual(len(callbacks), 1)
+        delay.assert_called_once_with([str(Property.objects.get(title='Loft').id)])
+        photos = Property.objects.get(title='Loft').photos
+        self.assertEqual(len(photos), 2)
+        self.assertTrue(photos[0].startswith('/media/property_photos/'))
+        self.assertEqual(photos[1], 'https://example.com/a.jpg')
+
+    @override_settings(BULK_IMPORT_CHUNK_SIZE=10)
+    def test_unparseable_file_creates_nothing_and_queues_no_photos(self):
+        count = Property.objects.count()
+        # Enough rows to save several chunks before the decoder reaches the bad bytes
+        content = CSV_HEADER + ''.join(
+            csv_row(f'Attic {index}', f'{index} Hill Road', photos='data:image/png;base64,AAAA') for index in range(200)
+        )
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.upload('properties.csv', content.encode() + b'Cellar,\xff\xfe broken\n')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Property.objects.count(), count)
+        self.assertEqual(callbacks, [])
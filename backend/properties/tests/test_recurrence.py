@@ -0,0 +1,147 @@
+"""
+Tests for recurring expense materialization and its effect on analytics.
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+
+from dateutil.relativedelta import relativedelta
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from analytics.utils import LandlordAnalytics
+from propertree.tests.dataset import build_dataset
+
+from ..models import PropertyExpense
+from ..tasks import get_recurrence_horizon, materialize_recurring_expenses
+
+
+@override_settings(RECURRING_EXPENSE_HORIZON_DAYS=90)
+class RecurringExpenseTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = build_dataset(rows=1)
+        cls.property = cls.data['property']
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.data['landlord'])
+        self.today = date.today()
+
+    def create_template(self, months_ago=5, amount='100.00'):
+        """A monthly template starting `months_ago` months back, materialized by the beat task."""
+        template = PropertyExpense.objects.create(
+            property=self.property,
+            category='utilities',
+            description='Water',
+            amount=Decimal(amount),
+            expense_date=self.today - relativedelta(months=months_ago),
+            is_recurring=True,
+            recurrence_frequency='monthly',
+        )
+        materialize_recurring_expenses()
+        return template
+
+    def test_materializes_up_to_horizon_idempotently(self):
+        template = self.create_template()
+        occurrences = list(template.occurrences.order_by('expense_date').values_list('expense_date', flat=True))
+
+        self.assertEqual(occurrences[0], template.expense_date + relativedelta(months=1))
+        self.assertLessEqual(occurrences[-1], get_recurrence_horizon())
+        self.assertGreater(occurrences[-1], self.today)
+
+        materialize_recurring_expenses()
+        self.assertEqual(template.occurrences.count(), len(occurrences))
+
+    def test_undated_totals_leave_out_future_occurrences(self):
+        PropertyExpense.objects.all().delete()
+        template = self.create_template()
+        incurred = PropertyExpense.objects.filter(expense_date__lte=self.today).count()
+        self.assertGreater(template.occurrences.filter(expense_date__gt=self.today).count(), 0)
+
+        analytics = LandlordAnalytics(self.data['landlord'])
+        expenses = analytics.get_property_expenses()
+        performance = {row['property_id']: row for row in analytics.get_property_performance()}
+
+        self.assertEqual(expenses['count'], incurred)
+        self.assertEqual(expenses['total_expenses'], 100.0 * incurred)
+        self.assertEqual(performance[str(self.property.id)]['total_expenses'], 100.0 * incurred)
+
+    def test_annual_summary_counts_the_current_year_to_date(self):
+        PropertyExpense.objects.all().delete()
+        self.create_template(months_ago=14)
+        PropertyExpense.objects.create(
+            property=self.property, category='insurance', description='Policy',
+            amount=Decimal('40.00'), expense_date=self.today + timedelta(days=1),
+        )
+
+        analytics = LandlordAnalytics(self.data['landlord'])
+        summary = analytics.get_annual_expenses_summary()
+        to_date = PropertyExpense.objects.filter(expense_date__year=self.today.year, expense_date__lte=self.today)
+
+        self.assertEqual(summary['through'], self.today.isoformat())
+        self.assertEqual(summary['property_expenses'], 100.0 * to_date.count())
+        self.assertNotIn('insurance', [row['category'] for row in summary['by_category']])
+
+        # Past years are summed in full
+        last_year = analytics.get_annual_expenses_summary(self.today.year - 1)
+        self.assertEqual(last_year['through'], date(self.today.year - 1, 12, 31).isoformat())
+        self.assertEqual(
+            last_year['property_expenses'],
+            100.0 * PropertyExpense.objects.filter(expense_date__year=self.today.year - 1).count()
+        )
+
+    def test_update_rebuilds_only_future_occurrences(self):
+        template = self.create_template()
+        past_count = template.occurrences.filter(expense_date__lte=self.today).count()
+
+        response = self.client.patch(
+            reverse('properties:expense_detail', args=[template.pk]), {'amount': '150.00'}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+
+        past = template.occurrences.filter(expense_date__lte=self.today)
+        future = template.occurrences.filter(expense_date__gt=self.today)
+        self.assertEqual(past.count(), past_count)
+        self.assertTrue(all(amount == Decimal('100.00') for amount in past.values_list('amount', flat=True)))
+        self.assertTrue(future.exists())
+        self.assertTrue(all(amount == Decimal('150.00') for amount in future.values_list('amount', flat=True)))
+
+    def test_ending_recurrence_drops_future_occurrences(self):
+        template = self.create_template()
+
+        response = self.client.patch(
+            reverse('properties:expense_detail', args=[template.pk]),
+            {'recurrence_end_date': str(self.today)},
+            format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(template.occurrences.filter(expense_date__gt=self.today).exists())
+        self.assertTrue(template.occurrences.filter(expense_date__lte=self.today).exists())
+
+        self.client.patch(reverse('properties:expense_detail', args=[template.pk]), {'is_recurring': False}, format='json')
+        materialize_recurring_expenses()
+        self.assertFalse(template.occurrences.filter(expense_date__gt=self.today).exists())
+
+    def test_delete_keeps_past_occurrences(self):
+        template = self.create_template()
+        past_ids = set(template.occurrences.filter(expense_date__lte=self.today).values_list('id', flat=True))
+        future_ids = set(template.occurrences.filter(expense_date__gt=self.today).values_list('id', flat=True))
+
+        response = self.client.delete(reverse('properties:expense_detail', args=[template.pk]))
+        self.assertEqual(response.status_code, 204)
+
+        kept = PropertyExpense.objects.filter(id__in=past_ids | future_ids)
+        self.assertEqual(set(kept.values_list('id', flat=True)), past_ids)
+        self.assertFalse(kept.filter(recurrence_parent__isnull=False).exists())
+        self.assertFalse(PropertyExpense.objects.filter(pk=template.pk).exists())
+
+    def test_occurrence_edit_does_not_touch_siblings(self):
+        template = self.create_template()
+        occurrence = template.occurrences.order_by('expense_date').first()
+
+        self.client.patch(reverse('properties:expense_detail', args=[occurrence.pk]), {'amount': '80.00'}, format='json')
+
+        self.assertEqual(template.occurrences.filter(amount=Decimal('80.00')).count(), 1)
+        self.assertEqual(template.occurrences.count(), len(template.build_occurrences(get_recurrence_horizon())))
@@ -7,10 +7,13 @@ from .views import (
     PropertyDetailView,
     LandlordPropertyListView,
     LandlordPropertyCreateView,
+    LandlordPropertyImportView,
     LandlordPropertyUpdateView,
     PropertySubmitForApprovalView,
     PropertyExpenseListView,
     PropertyExpenseCreateView,
+    PropertyExpenseImportView,
+    ImportStatusView,
     PropertyExpenseDetailView,
     PropertyExpenseListByPropertyView,
     FavoriteListView,
@@ -27,12 +30,16 @@ urlpatterns = [
     # Landlord property management
     path('landlord/', LandlordPropertyListView.as_view(), name='landlord_properties'),
     path('landlord/create/', LandlordPropertyCreateView.as_view(), name='landlord_create_property'),
+    path('landlord/import/', LandlordPropertyImportView.as_view(), name='landlord_import'),
+    path('landlord/import/<str:task_id>/', ImportStatusView.as_view(), name='landlord_import_status'),
     path('landlord/<uuid:pk>/', LandlordPropertyUpdateView.as_view(), name='landlord_update_property'),
     path('landlord/<uuid:pk>/submit/', PropertySubmitForApprovalView.as_view(), name='submit_for_approval'),
     
     # Property expenses management
     path('expenses/', PropertyExpenseListView.as_view(), name='expense_list'),
     path('expenses/create/', PropertyExpenseCreateView.as_view(), name='expense_create'),
+    path('expenses/import/', PropertyExpenseImportView.as_view(), name='expense_import'),
+    path('expenses/import/<str:task_id>/', ImportStatusView.as_view(), name='expense_import_status'),
     path('expenses/<uuid:pk>/', PropertyExpenseDetailView.as_view(), name='expense_detail'),
     path('<uuid:property_id>/expenses/', PropertyExpenseListByPropertyView.as_view(), name='property_expenses'),
     
@@ -5,11 +5,20 @@ from rest_framework import generics, status, filters
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
+from rest_framework.parsers import MultiPartParser, FormParser
 from django_filters.rest_framework import DjangoFilterBackend
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
 from django.db.models import Q
+from django.urls import reverse
+from django.utils import timezone
 from datetime import datetime
+import uuid
 
 from .models import Property, PropertyExpense, Favorite
+from .imports import IMPORTERS, get_import_format, iter_import_rows
+from .tasks import get_recurrence_horizon, import_landlord_file
 from .serializers import (
     PropertyListSerializer,
     PropertyDetailSerializer,
@@ -229,13 +238,115 @@ class PropertyExpenseCreateView(generics.CreateAPIView):
         serializer.is_valid(raise_exception=True)
         self.perform_create(serializer)
         
-        # Return the created expense with full details
+        # Materialize occurrences of a recurring expense up to the horizon right away;
+        # the daily beat task extends them from there
         expense_instance = serializer.instance
+        if expense_instance.is_recurring:
+            PropertyExpense.objects.bulk_create(
+                expense_instance.build_occurrences(get_recurrence_horizon()),
+                ignore_conflicts=True
+            )
+        
+        # Return the created expense with full details
         response_serializer = PropertyExpenseSerializer(expense_instance)
         
         return Response(response_serializer.data, status=status.HTTP_201_CREATED)
 
 
+class BaseImportView(APIView):
+    """
+    Shared upload handling for landlord bulk imports from a CSV or JSON file.
+    Small files are imported in the request, in one transaction, and return a
+    compact summary with a per-line error report. Large files are queued as a
+    Celery task whose progress can be polled at `status_url_name`.
+    """
+    
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser, FormParser]
+    import_kind = None
+    status_url_name = None
+    
+    def post(self, request):
+        """Import rows from the uploaded 'file'."""
+        upload = request.FILES.get('file')
+        if not upload:
+            return Response(
+                {'error': 'A file is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        import_format = get_import_format(upload.name)
+        if not import_format:
+            return Response(
+                {'error': 'Unsupported file format. Use .csv, .json or .jsonl'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        landlord_id = str(request.user.id)
+        
+        if upload.size > settings.BULK_IMPORT_ASYNC_THRESHOLD_BYTES:
+            file_name = default_storage.save(f'imports/{self.import_kind}/{uuid.uuid4()}_{upload.name}', upload)
+            task = import_landlord_file.delay(self.import_kind, landlord_id, file_name, import_format)
+            return Response({
+                'message': 'Import queued',
+                'task_id': task.id,
+                'status_url': reverse(self.status_url_name, args=[task.id])
+            }, status=status.HTTP_202_ACCEPTED)
+        
+        # All or nothing: a file that stops parsing part-way creates no rows, so it can be fixed and resent
+        summary = IMPORTERS[self.import_kind](landlord_id, iter_import_rows(upload, import_format), atomic=True)
+        response_status = status.HTTP_400_BAD_REQUEST if 'error' in summary else status.HTTP_200_OK
+        return Response(summary, status=response_status)
+
+
+class LandlordPropertyImportView(BaseImportView):
+    """
+    API endpoint for landlords to bulk import properties from a CSV or JSON manifest.
+    Rows are validated up front and inserted with bulk_create; embedded photos
+    are processed in the background.
+    """
+    
+    import_kind = 'properties'
+    status_url_name = 'properties:landlord_import_status'
+
+
+class PropertyExpenseImportView(BaseImportView):
+    """
+    API endpoint for landlords to bulk import expenses from a CSV or JSON file.
+    """
+    
+    import_kind = 'expenses'
+    status_url_name = 'properties:expense_import_status'
+
+
+class ImportStatusView(APIView):
+    """
+    API endpoint to poll the progress of a queued bulk import.
+    """
+    
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request, task_id):
+        """Return the state, progress counts and (when finished) the error report."""
+        from celery.result import AsyncResult
+        
+        result = AsyncResult(task_id)
+        info = result.info if isinstance(result.info, dict) else {}
+        
+        # Only the landlord who queued the import may see its details
+        if info and info.get('landlord_id') != str(request.user.id):
+            return Response(
+                {'error': 'Import not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        data = {'task_id': task_id, 'state': result.state}
+        data.update({key: value for key, value in info.items() if key != 'landlord_id'})
+        if result.failed():
+            data['error'] = 'Import failed'
+        return Response(data, status=status.HTTP_200_OK)
+
+
 class PropertyExpenseDetailView(generics.RetrieveUpdateDestroyAPIView):
     """
     API endpoint for landlords to view, update, or delete a specific expense.
@@ -247,6 +358,25 @@ class PropertyExpenseDetailView(generics.RetrieveUpdateDestroyAPIView):
     def get_queryset(self):
         """Return only expenses for properties owned by the current landlord."""
         return PropertyExpense.objects.filter(property__landlord=self.request.user)
+    
+    def perform_update(self, serializer):
+        """
+        Save the expense; for a recurring template, rebuild its future occurrences
+        so changes to the amount or schedule reach them (past ones are kept).
+        """
+        with transaction.atomic():
+            expense = serializer.save()
+            if expense.recurrence_parent_id is None:
+                expense.replace_future_occurrences(get_recurrence_horizon(), timezone.now().date())
+    
+    def perform_destroy(self, instance):
+        """
+        Delete the expense and, for a recurring template, its future occurrences.
+        Past occurrences stay in the ledger as standalone expenses.
+        """
+        with transaction.atomic():
+            instance.occurrences.filter(expense_date__gt=timezone.now().date()).delete()
+            instance.delete()
 
 
 class PropertyExpenseListByPropertyView(generics.ListAPIView):
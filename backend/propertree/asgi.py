@@ -1,5 +1,9 @@
 """
 ASGI config for Propertree project.
+
+The REST API is served over WSGI; this application serves the long-lived
+Server-Sent Events stream (/api/events/stream/), e.g. with
+gunicorn propertree.asgi:application -k uvicorn.workers.UvicornWorker.
 """
 
 import os
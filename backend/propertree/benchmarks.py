@@ -0,0 +1,335 @@
+"""
+In-process endpoint benchmarks.
+
+Each benchmark sends a request through Django's test client (full middleware,
+authentication and serialization, no network) as one role, a number of times,
+and records p50/p95 latency, median CPU time, query count and response size. Requests that write
+(booking create) run in a transaction that is rolled back, so repeated runs see
+the same data and no on_commit work (notifications, realtime pushes) is queued.
+
+run_serialization_benchmarks() times rendering and parsing the payloads of the GET
+benchmarks with each available JSON backend (the stdlib json module and orjson).
+
+Results are plain JSON so runs can be stored and compared with compare_results().
+Users and sample objects come from the seed_scale dataset by default.
+"""
+import io
+import json
+import math
+import statistics
+import time
+from contextlib import nullcontext
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Count, Max
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework_simplejwt.tokens import AccessToken
+
+User = get_user_model()
+
+# Latency changes below this many milliseconds are treated as noise
+LATENCY_NOISE_MS = 1.0
+
+
+def _property_search(context):
+    return '/api/properties/', {'city': context['property'].city}
+
+
+def _property_search_dates(context):
+    check_in = date.today() + timedelta(days=30)
+    return '/api/properties/', {
+        'city': context['property'].city,
+        'check_in': check_in.isoformat(),
+        'check_out': (check_in + timedelta(days=4)).isoformat(),
+    }
+
+
+def _property_detail(context):
+    return f'/api/properties/{context["property"].pk}/', None
+
+
+def _booking_create(context):
+    # Past the property's last booking so every (rolled back) attempt succeeds
+    check_in = context['free_from']
+    return '/api/bookings/create/', {
+        'property': str(context['property'].pk),
+        'check_in': check_in.isoformat(),
+        'check_out': (check_in + timedelta(days=3)).isoformat(),
+        'guests_count': 1,
+    }
+
+
+def _static(path, params=None):
+    return lambda context: (path, params)
+
+
+# name -> (role, HTTP method, request builder returning (path, query params or JSON body))
+BENCHMARKS = {
+    'property_search': ('anonymous', 'get', _property_search),
+    'property_search_dates': ('anonymous', 'get', _property_search_dates),
+    'property_detail': ('anonymous', 'get', _property_detail),
+    'landlord_dashboard': ('landlord', 'get', _static('/api/analytics/landlord/dashboard/')),
+    'admin_analytics': ('admin', 'get', _static('/api/admin/dashboard/analytics/')),
+    'asset_performance': ('admin', 'get', _static('/api/admin/analytics/performance/')),
+    'booking_create': ('tenant', 'post', _booking_create),
+    'tenant_bookings': ('tenant', 'get', _static('/api/bookings/')),
+    'landlord_bookings': ('landlord', 'get', _static('/api/bookings/landlord/')),
+    'admin_bookings': ('admin', 'get', _static('/api/bookings/admin/')),
+}
+
+
+def build_context(domain, landlord_email=None, tenant_email=None, admin_email=None):
+    """
+    Pick the users and sample objects the benchmarks run against.
+    By default the busiest seeded landlord and tenant (@domain) and the first admin
+    are used; roles without a user are left out of the context.
+    """
+    from properties.models import Property
+
+    seeded = User.objects.filter(email__endswith=f'@{domain}')
+    if landlord_email:
+        landlord = User.objects.filter(email=landlord_email).first()
+    else:
+        landlord = seeded.filter(role='landlord').annotate(
+            portfolio=Count('properties')
+        ).order_by('-portfolio', 'email').first()
+    if tenant_email:
+        tenant = User.objects.filter(email=tenant_email).first()
+    else:
+        tenant = seeded.filter(role='tenant').annotate(
+            stays=Count('bookings')
+        ).order_by('-stays', 'email').first()
+    if admin_email:
+        admin = User.objects.filter(email=admin_email).first()
+    else:
+        admin = User.objects.filter(role='admin', is_active=True).order_by('email').first()
+
+    properties = Property.objects.filter(status='approved')
+    if landlord is not None:
+        properties = properties.filter(landlord=landlord)
+    prop = properties.annotate(
+        booking_count=Count('bookings'), last_check_out=Max('bookings__check_out')
+    ).order_by('-booking_count', 'id').first()
+    if prop is None:
+        return None
+
+    context = {'property': prop, 'anonymous': None}
+    context['free_from'] = max(prop.last_check_out or date.today(), date.today()) + timedelta(days=30)
+    for role, user in (('landlord', landlord), ('tenant', tenant), ('admin', admin)):
+        if user is not None:
+            context[role] = user
+    return context
+
+
+def percentile(values, percent):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(percent / 100 * len(ordered)) - 1)]
+
+
+def run_benchmark(name, context, iterations=20, warmup=2, cold=False):
+    """
+    Run one benchmark and return its result dict, or None if its role has no user.
+    With cold=True the cache is cleared before every request.
+    """
+    role, method, build_request = BENCHMARKS[name]
+    if role not in context:
+        return None
+    path, data = build_request(context)
+
+    client = Client()
+    headers = {}
+    if context[role] is not None:
+        headers['HTTP_AUTHORIZATION'] = f'Bearer {AccessToken.for_user(context[role])}'
+
+    timings = []
+    cpu_timings = []
+    query_counts = []
+    status_code = None
+    size = 0
+    for iteration in range(warmup + iterations):
+        if cold:
+            cache.clear()
+        # The query log is a bounded deque; counts would read zero once it is full
+        connection.queries_log.clear()
+        rollback = transaction.atomic() if method != 'get' else nullcontext()
+        with rollback, CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            cpu_started = time.process_time()
+            if method == 'get':
+                response = client.get(path, data, **headers)
+            else:
+                response = getattr(client, method)(path, data, content_type='application/json', **headers)
+            body = b''.join(response.streaming_content) if response.streaming else response.content
+            elapsed = time.perf_counter() - started
+            cpu = time.process_time() - cpu_started
+            if method != 'get':
+                transaction.set_rollback(True)
+        if iteration < warmup:
+            continue
+        timings.append(elapsed * 1000)
+        cpu_timings.append(cpu * 1000)
+        query_counts.append(len(queries))
+        status_code = response.status_code
+        size = len(body)
+
+    return {
+        'role': role,
+        'method': method.upper(),
+        'path': path,
+        'status': status_code,
+        'iterations': iterations,
+        'p50_ms': round(statistics.median(timings), 2),
+        'p95_ms': round(percentile(timings, 95), 2),
+        'mean_ms': round(statistics.fmean(timings), 2),
+        'max_ms': round(max(timings), 2),
+        'cpu_ms': round(statistics.median(cpu_timings), 2),
+        'queries': max(query_counts),
+        'bytes': size,
+    }
+
+
+def run_benchmarks(context, names=None, iterations=20, warmup=2, cold=False, progress_callback=None):
+    """Run the named benchmarks (all by default) and return the run as a JSON-ready dict."""
+    from bookings.models import Booking
+    from properties.models import Property
+
+    results = {}
+    for name in names or BENCHMARKS:
+        result = run_benchmark(name, context, iterations, warmup, cold)
+        if result is None:
+            continue
+        results[name] = result
+        if progress_callback:
+            progress_callback(name, result)
+
+    return {
+        'meta': {
+            'created_at': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'iterations': iterations,
+            'warmup': warmup,
+            'cold_cache': cold,
+            'dataset': {
+                'users': User.objects.count(),
+                'properties': Property.objects.count(),
+                'bookings': Booking.objects.count(),
+            },
+            'users': {
+                role: context[role].email
+                for role in ('landlord', 'tenant', 'admin') if role in context
+            },
+        },
+        'results': results,
+    }
+
+
+def compare_results(run, baseline, threshold=0.2):
+    """
+    Compare a run with a baseline run and return the regressions, one dict per metric.
+    Latency and response size regress when they grow by more than `threshold`
+    (latency also by more than LATENCY_NOISE_MS); any extra query is a regression.
+    Benchmarks missing from either run are ignored.
+    """
+    regressions = []
+    for name, result in run['results'].items():
+        base = baseline.get('results', {}).get(name)
+        if base is None:
+            continue
+        for metric in ('p50_ms', 'p95_ms', 'queries', 'bytes'):
+            before, after = base[metric], result[metric]
+            if metric == 'queries':
+                regressed = after > before
+            else:
+                regressed = after > before * (1 + threshold)
+                if metric.endswith('_ms'):
+                    regressed = regressed and after - before > LATENCY_NOISE_MS
+            if regressed:
+                regressions.append({
+                    'benchmark': name,
+                    'metric': metric,
+                    'baseline': before,
+                    'current': after,
+                    'change': round((after - before) / before, 3) if before else None,
+                })
+    return regressions
+
+
+def get_json_backends():
+    """Return {name: (renderer, parser)} for the JSON backends that can be imported."""
+    backends = {'stdlib': (JSONRenderer(), JSONParser())}
+    try:
+        from .renderers import ORJSONParser, ORJSONRenderer
+    except ImportError:
+        pass
+    else:
+        backends['orjson'] = (ORJSONRenderer(), ORJSONParser())
+    return backends
+
+
+def _time_calls(func, iterations):
+    """Return (median wall ms, median CPU ms) of calling func() `iterations` times."""
+    wall, cpu = [], []
+    for _ in range(iterations):
+        started, cpu_started = time.perf_counter(), time.process_time()
+        func()
+        wall.append((time.perf_counter() - started) * 1000)
+        cpu.append((time.process_time() - cpu_started) * 1000)
+    return round(statistics.median(wall), 3), round(statistics.median(cpu), 3)
+
+
+def run_serialization_benchmark(name, context, iterations=200):
+    """
+    Render and parse the response data of one GET benchmark with every JSON backend.
+    Returns None for write benchmarks and roles without a user. 'identical' tells
+    whether all backends produced the same JSON document.
+    """
+    role, method, build_request = BENCHMARKS[name]
+    if method != 'get' or role not in context:
+        return None
+    path, params = build_request(context)
+    headers = {}
+    if context[role] is not None:
+        headers['HTTP_AUTHORIZATION'] = f'Bearer {AccessToken.for_user(context[role])}'
+    data = Client().get(path, params, **headers).data
+
+    backends = {}
+    documents = []
+    for backend, (renderer, parser) in get_json_backends().items():
+        body = renderer.render(data)
+        documents.append(json.loads(body))
+        render_ms, render_cpu_ms = _time_calls(lambda: renderer.render(data), iterations)
+        parse_ms, parse_cpu_ms = _time_calls(lambda: parser.parse(io.BytesIO(body)), iterations)
+        backends[backend] = {
+            'render_ms': render_ms,
+            'render_cpu_ms': render_cpu_ms,
+            'parse_ms': parse_ms,
+            'parse_cpu_ms': parse_cpu_ms,
+        }
+    return {
+        'path': path,
+        'bytes': len(body),
+        'identical': all(document == documents[0] for document in documents),
+        'backends': backends,
+    }
+
+
+def run_serialization_benchmarks(context, names=None, iterations=200, progress_callback=None):
+    """Run the serialization benchmark of the named GET benchmarks (all by default), largest payload first."""
+    results = {}
+    for name in names or BENCHMARKS:
+        result = run_serialization_benchmark(name, context, iterations)
+        if result is not None:
+            results[name] = result
+    results = dict(sorted(results.items(), key=lambda item: item[1]['bytes'], reverse=True))
+    if progress_callback:
+        for name, result in results.items():
+            progress_callback(name, result)
+    return results
@@ -17,6 +17,9 @@ app.config_from_object('django.conf:settings', namespace='CELERY')
 # Load task modules from all registered Django apps.
 app.autodiscover_tasks()
 
+# Time and trace every task
+from . import metrics, tracing  # noqa: E402,F401
+
 
 @app.task(bind=True)
 def debug_task(self):
@@ -0,0 +1,231 @@
+"""
+Database diagnostics for deciding where indexes and archiving are needed.
+
+collect_report() gathers, for the tables of the current schema:
+- table sizes (heap and indexes) with live and dead row estimates;
+- index sizes and scan counts, flagging unused indexes;
+- foreign keys without an index on their columns (candidate missing indexes);
+- sequential-scan hotspots: large tables read mostly by sequential scans;
+- a bloat estimate from the dead-row ratio and the last (auto)vacuum;
+- the slowest statements from pg_stat_statements, when the extension is installed;
+- row counts per status of bookings, properties and maintenance requests, with
+  how many rows in a final status are older than the archive cutoff.
+
+Everything but the status counts reads PostgreSQL statistics views and is
+skipped on other databases. Scan counts accumulate since the statistics were
+last reset (stats_reset in the report).
+"""
+from datetime import timedelta
+
+from django.apps import apps
+from django.db import DatabaseError, connection, transaction
+from django.db.models import Count, Max, Min, Q
+from django.utils import timezone
+
+TABLE_SIZES_SQL = """
+    SELECT s.relname AS table_name,
+           s.n_live_tup AS live_rows,
+           s.n_dead_tup AS dead_rows,
+           pg_total_relation_size(s.relid) AS total_bytes,
+           pg_relation_size(s.relid) AS table_bytes,
+           pg_indexes_size(s.relid) AS index_bytes,
+           s.seq_scan,
+           COALESCE(s.idx_scan, 0) AS idx_scan,
+           GREATEST(s.last_vacuum, s.last_autovacuum) AS last_vacuum,
+           GREATEST(s.last_analyze, s.last_autoanalyze) AS last_analyze
+    FROM pg_stat_user_tables s
+    WHERE s.schemaname = current_schema()
+    ORDER BY pg_total_relation_size(s.relid) DESC
+    LIMIT %s
+"""
+
+# Unique and primary key indexes enforce constraints, so they are never reported as unused
+INDEX_USAGE_SQL = """
+    SELECT s.relname AS table_name,
+           s.indexrelname AS index_name,
+           pg_relation_size(s.indexrelid) AS index_bytes,
+           s.idx_scan,
+           i.indisunique AS is_unique,
+           i.indisprimary AS is_primary
+    FROM pg_stat_user_indexes s
+    JOIN pg_index i ON i.indexrelid = s.indexrelid
+    WHERE s.schemaname = current_schema()
+    ORDER BY pg_relation_size(s.indexrelid) DESC
+"""
+
+# A foreign key is covered when some index starts with its columns (in any order)
+UNINDEXED_FOREIGN_KEYS_SQL = """
+    SELECT c.conrelid::regclass::text AS table_name,
+           c.conname AS constraint_name,
+           string_agg(a.attname, ', ' ORDER BY k.position) AS columns,
+           pg_relation_size(c.conrelid) AS table_bytes
+    FROM pg_constraint c
+    CROSS JOIN LATERAL unnest(c.conkey) WITH ORDINALITY AS k(attnum, position)
+    JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = k.attnum
+    WHERE c.contype = 'f'
+      AND c.connamespace = current_schema()::regnamespace
+      AND NOT EXISTS (
+          SELECT 1
+          FROM pg_index i
+          WHERE i.indrelid = c.conrelid
+            AND (string_to_array(i.indkey::text, ' ')::int2[])[1:array_length(c.conkey, 1)] @> c.conkey
+      )
+    GROUP BY c.conrelid, c.conname
+    ORDER BY pg_relation_size(c.conrelid) DESC
+"""
+
+SEQUENTIAL_SCANS_SQL = """
+    SELECT relname AS table_name,
+           n_live_tup AS live_rows,
+           seq_scan,
+           seq_tup_read,
+           seq_tup_read / NULLIF(seq_scan, 0) AS rows_per_seq_scan,
+           COALESCE(idx_scan, 0) AS idx_scan
+    FROM pg_stat_user_tables
+    WHERE schemaname = current_schema()
+      AND seq_scan > 0
+      AND n_live_tup >= %s
+    ORDER BY seq_tup_read DESC
+    LIMIT %s
+"""
+
+STATS_RESET_SQL = 'SELECT stats_reset FROM pg_stat_database WHERE datname = current_database()'
+
+PG_STAT_STATEMENTS_INSTALLED_SQL = "SELECT 1 FROM pg_extension WHERE extname = 'pg_stat_statements'"
+
+# PostgreSQL 13 renamed total_time/mean_time to total_exec_time/mean_exec_time
+SLOW_STATEMENTS_SQL = """
+    SELECT query,
+           calls,
+           {total} AS total_ms,
+           {mean} AS mean_ms,
+           rows,
+           shared_blks_hit,
+           shared_blks_read
+    FROM pg_stat_statements
+    WHERE dbid = (SELECT oid FROM pg_database WHERE datname = current_database())
+    ORDER BY {total} DESC
+    LIMIT %s
+"""
+
+# Model label -> (date field giving the age of a row, final statuses whose old rows can be archived)
+STATUS_MODELS = {
+    'bookings.Booking': ('check_out', ['completed', 'cancelled']),
+    'properties.Property': ('updated_at', ['rejected']),
+    'maintenance.MaintenanceRequest': ('reported_at', ['resolved', 'closed', 'cancelled']),
+}
+
+
+def _fetch(sql, params=()):
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def get_table_sizes(limit):
+    return _fetch(TABLE_SIZES_SQL, [limit])
+
+
+def get_index_usage():
+    """Return every index with its size and scans; 'unused' marks droppable candidates."""
+    indexes = _fetch(INDEX_USAGE_SQL)
+    for index in indexes:
+        index['unused'] = index['idx_scan'] == 0 and not (index['is_unique'] or index['is_primary'])
+    return indexes
+
+
+def get_unindexed_foreign_keys():
+    return _fetch(UNINDEXED_FOREIGN_KEYS_SQL)
+
+
+def get_sequential_scan_hotspots(min_rows, limit):
+    return _fetch(SEQUENTIAL_SCANS_SQL, [min_rows, limit])
+
+
+def estimate_bloat(tables, min_dead_ratio):
+    """
+    Estimate bloat from the dead-row ratio of each table, largest waste first.
+    Dead rows are reclaimed by (auto)vacuum; a high ratio on a large table
+    points at autovacuum falling behind or long-running transactions.
+    """
+    bloated = []
+    for table in tables:
+        rows = table['live_rows'] + table['dead_rows']
+        dead_ratio = table['dead_rows'] / rows if rows else 0
+        if dead_ratio >= min_dead_ratio:
+            bloated.append({
+                'table_name': table['table_name'],
+                'dead_rows': table['dead_rows'],
+                'dead_ratio': round(dead_ratio, 3),
+                'estimated_waste_bytes': int(table['table_bytes'] * dead_ratio),
+                'last_vacuum': table['last_vacuum'],
+            })
+    return sorted(bloated, key=lambda table: table['estimated_waste_bytes'], reverse=True)
+
+
+def get_slow_statements(limit):
+    """
+    Return the statements with the most total execution time, or a string
+    saying why pg_stat_statements cannot be read.
+    """
+    if not _fetch(PG_STAT_STATEMENTS_INSTALLED_SQL):
+        return 'pg_stat_statements is not installed (CREATE EXTENSION pg_stat_statements)'
+    for total, mean in (('total_exec_time', 'mean_exec_time'), ('total_time', 'mean_time')):
+        try:
+            # A failed statement aborts the transaction; the savepoint keeps the rest of the report running
+            with transaction.atomic():
+                return _fetch(SLOW_STATEMENTS_SQL.format(total=total, mean=mean), [limit])
+        except DatabaseError as e:
+            error = str(e).strip()
+    return f'pg_stat_statements cannot be read: {error}'
+
+
+def get_status_counts(archive_after_days):
+    """Return {model label: [{status, rows, oldest, newest, archivable}]} for STATUS_MODELS."""
+    cutoff = timezone.now() - timedelta(days=archive_after_days)
+    counts = {}
+    for label, (date_field, final_statuses) in STATUS_MODELS.items():
+        model = apps.get_model(label)
+        field_cutoff = cutoff.date() if model._meta.get_field(date_field).get_internal_type() == 'DateField' else cutoff
+        counts[label] = list(
+            model.objects.order_by().values('status')
+            .annotate(
+                rows=Count('pk'),
+                oldest=Min(date_field),
+                newest=Max(date_field),
+                archivable=Count('pk', filter=Q(status__in=final_statuses, **{f'{date_field}__lt': field_cutoff})),
+            )
+            .order_by('-rows')
+        )
+    return counts
+
+
+def collect_report(limit=15, min_rows=1000, min_dead_ratio=0.1, archive_after_days=365):
+    """Return the full diagnostics report as a dict (PostgreSQL sections are None elsewhere)."""
+    report = {
+        'database': connection.vendor,
+        'collected_at': timezone.now(),
+        'archive_after_days': archive_after_days,
+        'status_counts': get_status_counts(archive_after_days),
+        'stats_reset': None,
+        'tables': None,
+        'indexes': None,
+        'unindexed_foreign_keys': None,
+        'sequential_scans': None,
+        'bloat': None,
+        'slow_statements': None,
+    }
+    if connection.vendor != 'postgresql':
+        return report
+
+    stats_reset = _fetch(STATS_RESET_SQL)
+    report['stats_reset'] = stats_reset[0]['stats_reset'] if stats_reset else None
+    report['tables'] = get_table_sizes(limit)
+    report['indexes'] = get_index_usage()
+    report['unindexed_foreign_keys'] = get_unindexed_foreign_keys()
+    report['sequential_scans'] = get_sequential_scan_hotspots(min_rows, limit)
+    # Bloat is estimated over all tables, not just the largest ones listed
+    report['bloat'] = estimate_bloat(get_table_sizes(None), min_dead_ratio)[:limit]
+    report['slow_statements'] = get_slow_statements(limit)
+    return report
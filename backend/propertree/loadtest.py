@@ -0,0 +1,258 @@
+"""
+Async HTTP load generator for a running server (gunicorn or uvicorn).
+
+Virtual tenants, landlords and admins loop through realistic sessions against the
+API with httpx until the deadline, pausing a random think time between requests:
+- tenants search (with dates), open a listing, sometimes favorite it and book it;
+- landlords open their dashboard and booking list, confirm pending bookings and add expenses;
+- admins approve pending properties, open analytics and confirm admin-approval bookings.
+
+Bookings are concentrated on a few "hot" properties and date windows so concurrent
+requests race for the same nights. Expected rejections (already booked, already
+confirmed, already approved) are counted separately from errors.
+"""
+import asyncio
+import random
+import time
+from collections import Counter, defaultdict
+from datetime import date
+
+import httpx
+
+from .benchmarks import percentile
+
+# Upper bounds of the latency histogram buckets, in milliseconds
+LATENCY_BUCKETS_MS = [10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+
+class LoadStats:
+    """Latencies and outcomes per operation."""
+
+    def __init__(self):
+        self.operations = defaultdict(lambda: {'latencies': [], 'statuses': Counter(), 'errors': 0, 'rejected': 0})
+
+    def record(self, operation, status_code, elapsed_ms, expected=()):
+        """Record one request; `expected` lists 4xx statuses that are normal outcomes under contention."""
+        stats = self.operations[operation]
+        stats['latencies'].append(elapsed_ms)
+        stats['statuses'][status_code or 'transport_error'] += 1
+        if status_code is None or status_code >= 500 or (status_code >= 400 and status_code not in expected):
+            stats['errors'] += 1
+        elif status_code >= 400:
+            stats['rejected'] += 1
+
+    def summary(self, duration):
+        """Return the run totals, per-operation stats and the overall latency histogram."""
+        operations = {}
+        all_latencies = []
+        for name, stats in sorted(self.operations.items()):
+            latencies = stats['latencies']
+            all_latencies.extend(latencies)
+            operations[name] = {
+                'requests': len(latencies),
+                'errors': stats['errors'],
+                'rejected': stats['rejected'],
+                'statuses': {str(status): count for status, count in sorted(stats['statuses'].items(), key=str)},
+                'p50_ms': round(percentile(latencies, 50), 1),
+                'p95_ms': round(percentile(latencies, 95), 1),
+                'p99_ms': round(percentile(latencies, 99), 1),
+                'max_ms': round(max(latencies), 1),
+            }
+        requests = len(all_latencies)
+        errors = sum(stats['errors'] for stats in operations.values())
+        return {
+            'duration_s': round(duration, 1),
+            'requests': requests,
+            'throughput_rps': round(requests / duration, 1) if duration else 0,
+            'errors': errors,
+            'error_rate': round(errors / requests, 4) if requests else 0,
+            'rejected': sum(stats['rejected'] for stats in operations.values()),
+            'operations': operations,
+            'histogram': latency_histogram(all_latencies),
+        }
+
+
+def latency_histogram(latencies):
+    """Return [(bucket label, count)] over LATENCY_BUCKETS_MS plus an overflow bucket."""
+    counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+    for latency in latencies:
+        for index, bound in enumerate(LATENCY_BUCKETS_MS):
+            if latency <= bound:
+                counts[index] += 1
+                break
+        else:
+            counts[-1] += 1
+    labels = [f'<={bound}ms' for bound in LATENCY_BUCKETS_MS] + [f'>{LATENCY_BUCKETS_MS[-1]}ms']
+    return list(zip(labels, counts))
+
+
+def _results(response):
+    """Return the rows of a (paginated or plain) list response."""
+    if response is None:
+        return []
+    data = response.json()
+    return data.get('results', []) if isinstance(data, dict) else data
+
+
+class VirtualUser:
+    """One simulated user with its own token, looping through sessions until the deadline."""
+
+    def __init__(self, client, token, scenario, stats, rng, think_time, deadline):
+        self.client = client
+        self.headers = {'Authorization': f'Bearer {token}'}
+        self.scenario = scenario
+        self.stats = stats
+        self.rng = rng
+        self.think_time = think_time
+        self.deadline = deadline
+
+    async def request(self, operation, method, path, expected=(), **kwargs):
+        """Send a request and record it; returns the response if it succeeded, else None."""
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, path, headers=self.headers, **kwargs)
+            status_code = response.status_code
+        except httpx.HTTPError:
+            response, status_code = None, None
+        self.stats.record(operation, status_code, (time.perf_counter() - started) * 1000, expected)
+        return response if status_code is not None and status_code < 400 else None
+
+    async def think(self):
+        await asyncio.sleep(self.rng.uniform(0, 2 * self.think_time))
+
+    async def run(self):
+        while time.monotonic() < self.deadline:
+            await self.session()
+            await self.think()
+
+    async def session(self):
+        raise NotImplementedError
+
+
+class TenantUser(VirtualUser):
+
+    async def session(self):
+        rng = self.rng
+        hot = rng.choice(self.scenario['hot_properties'])
+        check_in, check_out = rng.choice(self.scenario['date_windows'])
+        search = await self.request('tenant.search', 'GET', '/api/properties/', params={
+            'city': hot['city'],
+            'check_in': check_in.isoformat(),
+            'check_out': check_out.isoformat(),
+        })
+        await self.think()
+
+        # Mostly open the contended listing, otherwise one of the search results
+        listings = _results(search)
+        property_id = hot['id'] if not listings or rng.random() < 0.7 else rng.choice(listings)['id']
+        await self.request('tenant.detail', 'GET', f'/api/properties/{property_id}/')
+        await self.think()
+
+        if rng.random() < 0.3:
+            await self.request(
+                'tenant.favorite', 'POST', '/api/properties/favorites/',
+                expected=(400,), json={'property_id': property_id}
+            )
+            await self.think()
+
+        if rng.random() < 0.5:
+            await self.request('tenant.book', 'POST', '/api/bookings/create/', expected=(400,), json={
+                'property': property_id,
+                'check_in': check_in.isoformat(),
+                'check_out': check_out.isoformat(),
+                'guests_count': 1,
+            })
+
+
+class LandlordUser(VirtualUser):
+
+    def __init__(self, *args, property_ids, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.property_ids = property_ids
+
+    async def session(self):
+        rng = self.rng
+        await self.request('landlord.dashboard', 'GET', '/api/analytics/landlord/dashboard/')
+        await self.think()
+
+        bookings = _results(await self.request('landlord.bookings', 'GET', '/api/bookings/landlord/'))
+        pending = [
+            booking for booking in bookings
+            if booking.get('status') == 'pending' and booking.get('property_approval_type') == 'landlord'
+        ]
+        if pending:
+            await self.think()
+            # 400 when another session confirmed it first
+            await self.request(
+                'landlord.confirm', 'POST', f'/api/bookings/{rng.choice(pending)["id"]}/status/',
+                expected=(400,), json={'status': 'confirmed'}
+            )
+
+        if self.property_ids and rng.random() < 0.3:
+            await self.think()
+            await self.request('landlord.add_expense', 'POST', '/api/properties/expenses/create/', json={
+                'property': rng.choice(self.property_ids),
+                'category': rng.choice(['utilities', 'repairs', 'cleaning', 'maintenance']),
+                'description': 'Load test expense',
+                'amount': f'{rng.randint(20, 400)}.00',
+                'expense_date': date.today().isoformat(),
+            })
+
+
+class AdminUser(VirtualUser):
+
+    async def session(self):
+        rng = self.rng
+        pending = _results(await self.request('admin.pending_properties', 'GET', '/api/admin/properties/pending/'))
+        if pending:
+            await self.think()
+            await self.request(
+                'admin.approve', 'POST', f'/api/admin/properties/{rng.choice(pending)["id"]}/approve/',
+                expected=(400,)
+            )
+        await self.think()
+
+        await self.request('admin.analytics', 'GET', '/api/admin/dashboard/analytics/')
+        await self.think()
+        await self.request('admin.performance', 'GET', '/api/admin/analytics/performance/')
+        await self.think()
+
+        bookings = _results(await self.request('admin.bookings', 'GET', '/api/bookings/admin/'))
+        pending_bookings = [
+            booking for booking in bookings
+            if booking.get('status') == 'pending' and booking.get('property_approval_type') == 'admin'
+        ]
+        if pending_bookings:
+            await self.think()
+            await self.request(
+                'admin.confirm', 'POST', f'/api/bookings/admin/{rng.choice(pending_bookings)["id"]}/confirm/',
+                expected=(400,)
+            )
+
+
+async def run_load(base_url, scenario, duration, think_time=0.5, seed=1, timeout=30.0):
+    """
+    Run the virtual users in `scenario` against base_url for `duration` seconds.
+    scenario holds 'tenants', 'admins' (lists of tokens), 'landlords' (list of
+    (token, property ids)), 'hot_properties' and 'date_windows'.
+    Returns (LoadStats, elapsed seconds).
+    """
+    stats = LoadStats()
+    rng = random.Random(seed)
+    user_count = len(scenario['tenants']) + len(scenario['landlords']) + len(scenario['admins'])
+    limits = httpx.Limits(max_connections=user_count, max_keepalive_connections=user_count)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        deadline = time.monotonic() + duration
+
+        def user_args(token):
+            # Each virtual user gets its own generator so sessions are reproducible per seed
+            return client, token, scenario, stats, random.Random(rng.getrandbits(64)), think_time, deadline
+
+        users = [TenantUser(*user_args(token)) for token in scenario['tenants']]
+        users += [LandlordUser(*user_args(token), property_ids=ids) for token, ids in scenario['landlords']]
+        users += [AdminUser(*user_args(token)) for token in scenario['admins']]
+
+        started = time.monotonic()
+        await asyncio.gather(*(user.run() for user in users))
+        return stats, time.monotonic() - started
@@ -0,0 +1,242 @@
+"""
+Prometheus metrics, served at /metrics in the text exposition format.
+
+- MetricsMiddleware counts and times every request per route, with the number of
+  SQL queries and the SQL time of each one.
+- Celery task signals time every task run by name and final state.
+- Booking creation counts requests rejected because the dates are taken, and the
+  unread counter lookups count cache hits and misses.
+- The depth of the Celery queues is read from the Redis broker at scrape time.
+
+Gunicorn (and Celery prefork) workers each hold their own values. Export the
+PROMETHEUS_MULTIPROC_DIR environment variable (it is read from the process
+environment, not from .env) pointing at a directory shared by all processes on
+the host; every process then writes its samples there and /metrics aggregates
+them. The directory is created on import if missing. Files of exited gunicorn
+workers (gunicorn.conf.py) and Celery pool processes (below) are marked dead.
+Empty the directory in the deploy step that starts the services, before any of
+them runs, never while another process is writing to it.
+"""
+import os
+import time
+
+import redis
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from celery.signals import task_postrun, task_prerun, worker_process_shutdown
+from django.conf import settings
+from django.db import connection
+from django.http import Http404, HttpResponse
+from django.utils.crypto import constant_time_compare
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import GaugeMetricFamily
+
+from .middleware import QueryStats
+
+MULTIPROCESS = 'PROMETHEUS_MULTIPROC_DIR' in os.environ
+if MULTIPROCESS:
+    # Metrics without labels open their sample file as soon as they are defined below
+    os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+TASK_DURATION_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300, 900)
+
+# Kombu's Redis transport keeps messages of priority 3, 6 and 9 in separate lists
+# next to the queue's own list
+BROKER_PRIORITY_SUFFIXES = ('', '\x06\x163', '\x06\x166', '\x06\x169')
+
+REQUESTS = Counter(
+    'propertree_requests_total',
+    'HTTP requests by route and status code',
+    ['method', 'route', 'status'],
+)
+REQUEST_DURATION = Histogram(
+    'propertree_request_duration_seconds',
+    'HTTP request latency by route',
+    ['method', 'route'],
+    buckets=LATENCY_BUCKETS,
+)
+REQUEST_QUERIES = Histogram(
+    'propertree_request_queries',
+    'SQL queries per HTTP request by route',
+    ['method', 'route'],
+    buckets=QUERY_COUNT_BUCKETS,
+)
+REQUEST_SQL_DURATION = Histogram(
+    'propertree_request_sql_duration_seconds',
+    'Time spent in SQL per HTTP request by route',
+    ['method', 'route'],
+    buckets=LATENCY_BUCKETS,
+)
+CACHE_LOOKUPS = Counter(
+    'propertree_cache_lookups_total',
+    'Cache lookups by cache and result (hit or miss)',
+    ['cache', 'result'],
+)
+TASK_DURATION = Histogram(
+    'propertree_celery_task_duration_seconds',
+    'Celery task run time by task and final state',
+    ['task', 'state'],
+    buckets=TASK_DURATION_BUCKETS,
+)
+BOOKING_CONFLICTS = Counter(
+    'propertree_booking_conflicts_total',
+    'Booking requests rejected because the property is already booked for the dates',
+)
+
+
+def get_route(request):
+    """Return the URL pattern a request matched, so label values stay bounded."""
+    match = request.resolver_match
+    return match.route if match else 'unmatched'
+
+
+def record_cache_lookup(cache, hit):
+    """Count one lookup of a cache; the hit ratio is hits / (hits + misses)."""
+    if settings.METRICS_ENABLED:
+        CACHE_LOOKUPS.labels(cache, 'hit' if hit else 'miss').inc()
+
+
+def record_booking_conflict():
+    if settings.METRICS_ENABLED:
+        BOOKING_CONFLICTS.inc()
+
+
+class MetricsMiddleware:
+    """Record the count, latency, query count and SQL time of each request."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not settings.METRICS_ENABLED:
+            return self.get_response(request)
+
+        stats = QueryStats()
+        started = time.perf_counter()
+        with connection.execute_wrapper(stats):
+            response = self.get_response(request)
+        duration = time.perf_counter() - started
+
+        method, route = request.method, get_route(request)
+        REQUESTS.labels(method, route, response.status_code).inc()
+        REQUEST_DURATION.labels(method, route).observe(duration)
+        REQUEST_QUERIES.labels(method, route).observe(stats.count)
+        REQUEST_SQL_DURATION.labels(method, route).observe(stats.duration)
+        return response
+
+    async def __acall__(self, request):
+        # Only the SSE stream is served async; its connections stay open for
+        # minutes and would swamp the latency histograms
+        return await self.get_response(request)
+
+
+_task_started = {}
+
+
+@task_prerun.connect
+def start_task_timer(task_id=None, **kwargs):
+    _task_started[task_id] = time.perf_counter()
+
+
+@task_postrun.connect
+def observe_task_duration(task_id=None, task=None, state=None, **kwargs):
+    started = _task_started.pop(task_id, None)
+    if started is not None and settings.METRICS_ENABLED:
+        TASK_DURATION.labels(task.name, state or 'UNKNOWN').observe(time.perf_counter() - started)
+
+
+@worker_process_shutdown.connect
+def mark_pool_process_dead(pid=None, **kwargs):
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(pid or os.getpid())
+
+
+_broker_client = None
+
+
+def get_broker():
+    """Return a Redis client for the Celery broker, or None if the broker is not Redis."""
+    global _broker_client
+    if _broker_client is None and settings.CELERY_BROKER_URL.startswith(('redis://', 'rediss://')):
+        _broker_client = redis.Redis.from_url(
+            settings.CELERY_BROKER_URL,
+            socket_connect_timeout=1,
+            socket_timeout=1
+        )
+    return _broker_client
+
+
+class CeleryQueueCollector:
+    """Report the number of messages waiting in each Celery queue, read at scrape time."""
+
+    def describe(self):
+        # Keep registration from reading the broker
+        return []
+
+    def collect(self):
+        client = get_broker()
+        if client is None:
+            return
+        gauge = GaugeMetricFamily(
+            'propertree_celery_queue_length',
+            'Messages waiting in a Celery queue',
+            labels=['queue'],
+        )
+        try:
+            pipeline = client.pipeline(transaction=False)
+            for queue in settings.METRICS_CELERY_QUEUES:
+                for suffix in BROKER_PRIORITY_SUFFIXES:
+                    pipeline.llen(queue + suffix)
+            lengths = pipeline.execute()
+        except redis.RedisError:
+            # An unreachable broker leaves the gauge out rather than failing the scrape
+            return
+        step = len(BROKER_PRIORITY_SUFFIXES)
+        for index, queue in enumerate(settings.METRICS_CELERY_QUEUES):
+            gauge.add_metric([queue], sum(lengths[index * step:(index + 1) * step]))
+        yield gauge
+
+
+celery_queue_collector = CeleryQueueCollector()
+if not MULTIPROCESS:
+    REGISTRY.register(celery_queue_collector)
+
+
+def get_registry():
+    """Return the registry to expose: the aggregate of all processes in multiprocess mode."""
+    if not MULTIPROCESS:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    registry.register(celery_queue_collector)
+    return registry
+
+
+def metrics_view(request):
+    """
+    Serve the metrics to a Prometheus scrape, behind METRICS_AUTH_TOKEN. Without a
+    token the endpoint is only served with DEBUG on, so production never exposes it.
+    """
+    token = settings.METRICS_AUTH_TOKEN
+    if not settings.METRICS_ENABLED or not (token or settings.DEBUG):
+        raise Http404
+    if token and not constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return HttpResponse(status=401)
+    return HttpResponse(generate_latest(get_registry()), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,126 @@
+"""
+Per-request SQL and timing instrumentation.
+
+QueryInstrumentationMiddleware wraps the default connection with
+connection.execute_wrapper for the duration of each request and records the
+query count, total SQL time and repeated query shapes. Results are returned in
+a Server-Timing header and logged as one JSON line on the propertree.requests
+logger; requests over QUERY_BUDGET also log a warning with the most repeated
+statements (the usual sign of an N+1).
+
+Queries run while a streaming response is being consumed happen after the
+view returns and are not counted.
+"""
+import json
+import logging
+import re
+import time
+from collections import Counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger('propertree.requests')
+
+# Collapse IN (%s, %s, ...) lists so queries differing only in list length share a shape
+_PLACEHOLDER_LIST = re.compile(r'\(\s*%s(?:\s*,\s*%s)*\s*\)')
+
+TOP_REPEATED_QUERIES = 5
+
+
+def get_query_shape(sql):
+    """Return the SQL with parameter lists collapsed, for grouping repeated queries."""
+    return _PLACEHOLDER_LIST.sub('(...)', sql)
+
+
+class QueryStats:
+    """execute_wrapper callable that counts and times the queries it sees."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            self.shapes[get_query_shape(sql)] += 1
+
+    @property
+    def duplicates(self):
+        """Number of queries that repeated an earlier shape."""
+        return sum(count - 1 for count in self.shapes.values() if count > 1)
+
+    def most_repeated(self, limit=TOP_REPEATED_QUERIES):
+        """Return [(count, sql), ...] for shapes executed more than once."""
+        return [(count, sql) for sql, count in self.shapes.most_common(limit) if count > 1]
+
+
+class QueryInstrumentationMiddleware:
+    """Count, time and budget the SQL queries of each request."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not settings.QUERY_INSTRUMENTATION_ENABLED:
+            return self.get_response(request)
+
+        stats = QueryStats()
+        started = time.perf_counter()
+        with connection.execute_wrapper(stats):
+            response = self.get_response(request)
+        duration = time.perf_counter() - started
+
+        if settings.QUERY_INSTRUMENTATION_SERVER_TIMING:
+            response['Server-Timing'] = self.get_server_timing(stats, duration)
+        self.log_request(request, response, stats, duration)
+        return response
+
+    async def __acall__(self, request):
+        # Async views (the SSE stream) run their queries in sync_to_async threads
+        # this wrapper cannot see, and must not be held up by it
+        return await self.get_response(request)
+
+    def get_server_timing(self, stats, duration):
+        return (
+            f'db;dur={stats.duration * 1000:.1f};desc="{stats.count} queries, {stats.duplicates} repeated", '
+            f'app;dur={(duration - stats.duration) * 1000:.1f}, '
+            f'total;dur={duration * 1000:.1f}'
+        )
+
+    def log_request(self, request, response, stats, duration):
+        match = request.resolver_match
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'route': match.route if match else None,
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            'duration_ms': round(duration * 1000, 1),
+            'queries': stats.count,
+            'sql_ms': round(stats.duration * 1000, 1),
+            'repeated_queries': stats.duplicates,
+        }
+        logger.info(json.dumps(record))
+
+        budget = settings.QUERY_BUDGET
+        if budget and stats.count > budget:
+            record['budget'] = budget
+            record['top_repeated'] = [
+                {'count': count, 'sql': sql[:500]} for count, sql in stats.most_repeated()
+            ]
+            logger.warning(json.dumps(record))
@@ -0,0 +1,223 @@
+"""
+On-demand profiling of a single request.
+
+profile_call() runs a callable under one of two profilers and keeps every SQL
+statement it runs, with its duration:
+- 'sample': a background thread samples the calling thread's stack every
+  PROFILING_SAMPLE_INTERVAL_MS and counts identical stacks. The output is in the
+  collapsed-stack format ("outer;inner;leaf count" per line) read by
+  flamegraph.pl, speedscope and similar tools.
+- 'cprofile': deterministic cProfile; the output is the pstats table sorted by
+  cumulative time (and save_profile() writes the raw .prof file).
+
+Staff can profile a live request by adding ?__profile=1 (or ?__profile=cprofile)
+to it; ProfilingMiddleware then returns the profile as JSON instead of the
+response. manage.py profile_endpoint does the same for any user from a shell.
+"""
+import cProfile
+import io
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connection
+from django.http import JsonResponse
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+
+PROFILERS = ('sample', 'cprofile')
+
+PROFILE_PARAMETER = '__profile'
+
+# Rows of the pstats table kept in cProfile output
+CPROFILE_STATS_LIMIT = 80
+
+# Longest parameter list kept per query
+MAX_PARAMS_LENGTH = 500
+
+
+class QueryLog:
+    """execute_wrapper callable keeping every statement it sees with its duration."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'sql': sql,
+                'params': repr(params)[:MAX_PARAMS_LENGTH] if params else '',
+                'many': many,
+                'duration_ms': round((time.perf_counter() - started) * 1000, 3),
+            })
+
+
+def _frame_label(frame):
+    # Functions rather than lines, so samples anywhere in a function share its frame
+    module = frame.f_globals.get('__name__', '?')
+    return f'{module}:{frame.f_code.co_qualname}'.replace(';', ',')
+
+
+class StackSampler:
+    """Sample one thread's Python stack from a background thread, counting identical stacks."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._thread_id = threading.get_ident()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            stack = []
+            # Stop at the frame that entered the sampler; the server frames above it are the same in every sample
+            while frame is not None and frame is not self._root:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+                self.samples += 1
+
+    def __enter__(self):
+        self._root = sys._getframe(1)
+        # The sampler only runs when the profiled thread releases the GIL;
+        # a shorter switch interval lets it keep up with the sampling interval
+        self._switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(min(self._switch_interval, self.interval))
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        sys.setswitchinterval(self._switch_interval)
+        return False
+
+    def collapsed(self):
+        """Return the samples in collapsed-stack format, most frequent stacks first."""
+        return '\n'.join(f'{stack} {count}' for stack, count in self.stacks.most_common())
+
+
+class ProfileResult:
+    """The outcome of profile_call()."""
+
+    def __init__(self, profiler, value, duration, queries, sampler=None, profile=None):
+        self.profiler = profiler
+        self.value = value
+        self.duration = duration
+        self.queries = queries
+        self.sampler = sampler
+        self.profile = profile
+
+    @property
+    def sql_ms(self):
+        return round(sum(query['duration_ms'] for query in self.queries), 3)
+
+    def output(self):
+        """Return the collapsed stacks ('sample') or the pstats table ('cprofile')."""
+        if self.sampler is not None:
+            return self.sampler.collapsed()
+        stream = io.StringIO()
+        pstats.Stats(self.profile, stream=stream).sort_stats('cumulative').print_stats(CPROFILE_STATS_LIMIT)
+        return stream.getvalue()
+
+    def save_profile(self, path):
+        """Write the raw cProfile data (for snakeviz, pstats or gprof2dot); only for 'cprofile'."""
+        self.profile.dump_stats(path)
+
+    def summary(self):
+        return {
+            'profiler': self.profiler,
+            'duration_ms': round(self.duration * 1000, 3),
+            'query_count': len(self.queries),
+            'sql_ms': self.sql_ms,
+            **({'samples': self.sampler.samples} if self.sampler is not None else {}),
+        }
+
+
+def profile_call(func, profiler='sample', interval=None):
+    """Call func() under the given profiler and return a ProfileResult."""
+    if profiler not in PROFILERS:
+        raise ValueError(f'Unknown profiler {profiler!r}; expected one of {", ".join(PROFILERS)}')
+    if interval is None:
+        interval = settings.PROFILING_SAMPLE_INTERVAL_MS / 1000
+
+    query_log = QueryLog()
+    sampler = profile = None
+    with connection.execute_wrapper(query_log):
+        started = time.perf_counter()
+        if profiler == 'sample':
+            with StackSampler(interval) as sampler:
+                value = func()
+        else:
+            profile = cProfile.Profile()
+            value = profile.runcall(func)
+        duration = time.perf_counter() - started
+    return ProfileResult(profiler, value, duration, query_log.queries, sampler, profile)
+
+
+def get_staff_user(request):
+    """Return the request's staff user (session or JWT), or None."""
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return user if user.is_staff else None
+    authentication = JWTAuthentication()
+    try:
+        authenticated = authentication.authenticate(request)
+    except (InvalidToken, AuthenticationFailed):
+        return None
+    if authenticated is None:
+        return None
+    user = authenticated[0]
+    return user if user.is_active and user.is_staff else None
+
+
+class ProfilingMiddleware:
+    """
+    Profile requests carrying ?__profile=1 (stack sampling) or ?__profile=cprofile
+    from staff users and answer with the profile instead of the response.
+    The parameter is ignored for everyone else.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        mode = request.GET.get(PROFILE_PARAMETER)
+        if not mode or not settings.PROFILING_ENABLED or get_staff_user(request) is None:
+            return self.get_response(request)
+
+        profiler = 'cprofile' if mode == 'cprofile' else 'sample'
+        result = profile_call(lambda: self.get_response(request), profiler)
+        response = result.value
+        return JsonResponse({
+            'method': request.method,
+            'path': request.get_full_path(),
+            'status': response.status_code,
+            **result.summary(),
+            'queries': result.queries,
+            'output': result.output(),
+        })
+
+    async def __acall__(self, request):
+        # The SSE stream never finishes, so there is nothing to profile
+        return await self.get_response(request)
@@ -0,0 +1,87 @@
+"""
+orjson-backed DRF renderer and parser, selected with JSON_BACKEND=orjson.
+
+The output matches rest_framework.renderers.JSONRenderer:
+- datetimes are ISO 8601, with UTC written as 'Z';
+- dates, times and UUIDs are ISO strings;
+- Decimals outside serializers (e.g. aggregates in analytics responses) become
+  numbers; serializer DecimalFields already render strings (COERCE_DECIMAL_TO_STRING);
+- timedeltas become their total seconds as a string;
+- lazy strings and querysets are converted;
+- non-string dict keys are turned into strings;
+- U+2028 and U+2029 are escaped.
+`?indent=` in the Accept header pretty-prints with two spaces (orjson's only indent).
+The parser rejects NaN and Infinity like DRF's strict JSON parser.
+
+orjson is an optional dependency: pip install orjson.
+"""
+import datetime
+import decimal
+
+import orjson
+from django.db.models.query import QuerySet
+from django.utils.encoding import force_str
+from django.utils.functional import Promise
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+from rest_framework.renderers import JSONRenderer
+
+RENDER_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+# U+2028 and U+2029 in UTF-8; escaped so the output stays a strict JavaScript subset
+LINE_SEPARATOR = '\u2028'.encode()
+PARAGRAPH_SEPARATOR = '\u2029'.encode()
+
+
+def default(obj):
+    """Convert the types orjson does not handle natively, as DRF's JSONEncoder does."""
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    if isinstance(obj, Promise):
+        return force_str(obj)
+    if isinstance(obj, datetime.timedelta):
+        return str(obj.total_seconds())
+    if isinstance(obj, QuerySet):
+        return tuple(obj)
+    if isinstance(obj, bytes):
+        return obj.decode()
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    if hasattr(obj, '__getitem__'):
+        try:
+            return list(obj) if isinstance(obj, (list, tuple)) else dict(obj)
+        except Exception:
+            pass
+    elif hasattr(obj, '__iter__'):
+        return tuple(obj)
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+class ORJSONRenderer(JSONRenderer):
+    """JSONRenderer producing the same JSON with orjson."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        options = RENDER_OPTIONS
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            options |= orjson.OPT_INDENT_2
+        ret = orjson.dumps(data, default=default, option=options)
+
+        if LINE_SEPARATOR in ret or PARAGRAPH_SEPARATOR in ret:
+            ret = ret.replace(LINE_SEPARATOR, b'\\u2028').replace(PARAGRAPH_SEPARATOR, b'\\u2029')
+        return ret
+
+
+class ORJSONParser(BaseParser):
+    """Parse JSON request bodies with orjson."""
+
+    media_type = 'application/json'
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
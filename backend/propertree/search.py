@@ -0,0 +1,59 @@
+"""
+Shared PostgreSQL full-text search helpers.
+
+SEARCH_CONFIG is baked into the GIN expression indexes of the searchable models
+(messages and maintenance requests), so changing it needs a migration that
+rebuilds those indexes.
+"""
+from django.contrib.postgres.search import SearchHeadline, SearchQuery
+from django.utils.html import escape
+
+SEARCH_CONFIG = 'english'
+
+SEARCH_DEFAULT_LIMIT = 20
+SEARCH_MAX_LIMIT = 50
+SEARCH_MIN_QUERY_LENGTH = 2
+
+# ts_headline does not escape the document, so matches are delimited with control
+# characters and the snippet is HTML-escaped before they become <mark> tags
+_START_SEL = '\x02'
+_STOP_SEL = '\x03'
+
+
+def build_search_query(text):
+    """Parse user input with websearch syntax ("quoted phrases", or, -exclusions)."""
+    return SearchQuery(text, search_type='websearch', config=SEARCH_CONFIG)
+
+
+def highlight(expression, query, **options):
+    """Return a ts_headline expression for a text field or expression."""
+    return SearchHeadline(
+        expression,
+        query,
+        config=SEARCH_CONFIG,
+        start_sel=_START_SEL,
+        stop_sel=_STOP_SEL,
+        **options
+    )
+
+
+def render_highlight(text):
+    """HTML-escape a headline and wrap its matches in <mark> tags."""
+    if not text:
+        return ''
+    return escape(text).replace(_START_SEL, '<mark>').replace(_STOP_SEL, '</mark>')
+
+
+def get_search_params(request):
+    """
+    Return (text, limit, error) from the q and limit query parameters.
+    error is a message for a 400 response, or None.
+    """
+    text = request.query_params.get('q', '').strip()
+    if len(text) < SEARCH_MIN_QUERY_LENGTH:
+        return None, None, f'Search query "q" must be at least {SEARCH_MIN_QUERY_LENGTH} characters.'
+    try:
+        limit = int(request.query_params.get('limit', SEARCH_DEFAULT_LIMIT))
+    except ValueError:
+        return None, None, 'limit must be an integer.'
+    return text, max(1, min(limit, SEARCH_MAX_LIMIT)), None
@@ -5,6 +5,7 @@ Django settings for Propertree project.
 from pathlib import Path
 from datetime import timedelta
 from decouple import config
+from celery.schedules import crontab
 import os
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -26,6 +27,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 
     # Third party apps
     'rest_framework',
@@ -38,9 +40,14 @@ INSTALLED_APPS = [
     'properties',
     'bookings',
     'maintenance',
+    'analytics',
+    'events',
+    'communications',
 ]
 
 MIDDLEWARE = [
+    'propertree.metrics.MetricsMiddleware',
+    'propertree.tracing.TracingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -49,6 +56,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'propertree.middleware.QueryInstrumentationMiddleware',
+    'propertree.profiling.ProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'propertree.urls'
@@ -140,8 +149,24 @@ REST_FRAMEWORK = {
     'DEFAULT_RENDERER_CLASSES': (
         'rest_framework.renderers.JSONRenderer',
     ),
+    'DEFAULT_PARSER_CLASSES': (
+        'rest_framework.parsers.JSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
 }
 
+# JSON backend of the API: 'stdlib' (json module) or 'orjson' (faster; pip install orjson).
+# Both produce the same JSON (propertree/renderers.py)
+JSON_BACKEND = config('JSON_BACKEND', default='stdlib')
+if JSON_BACKEND == 'orjson':
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'] = ('propertree.renderers.ORJSONRenderer',)
+    REST_FRAMEWORK['DEFAULT_PARSER_CLASSES'] = (
+        'propertree.renderers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    )
+
 # JWT Settings
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(hours=1),
@@ -206,6 +231,83 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
 
+# Periodic tasks (run with: celery -A propertree beat)
+CELERY_BEAT_SCHEDULE = {
+    'expire-stale-pending-bookings': {
+        'task': 'bookings.tasks.expire_stale_pending_bookings',
+        'schedule': crontab(minute='*/15'),
+    },
+    'complete-past-bookings': {
+        'task': 'bookings.tasks.complete_past_bookings',
+        'schedule': crontab(minute=30, hour=0),
+    },
+    'materialize-recurring-expenses': {
+        'task': 'properties.tasks.materialize_recurring_expenses',
+        'schedule': crontab(minute=0, hour=1),
+    },
+    'delete-expired-export-files': {
+        'task': 'analytics.tasks.delete_expired_export_files',
+        'schedule': crontab(minute=45),
+    },
+    'write-analytics-extracts': {
+        'task': 'analytics.tasks.write_analytics_extracts',
+        'schedule': crontab(minute=0, hour=2),
+    },
+    'relay-outbox-events': {
+        'task': 'events.tasks.relay_outbox_events',
+        'schedule': timedelta(seconds=config('OUTBOX_RELAY_INTERVAL_SECONDS', default=10, cast=int)),
+    },
+    'send-hourly-notification-digests': {
+        'task': 'communications.tasks.send_notification_digests',
+        'schedule': crontab(minute=0),
+        'args': ('hourly',),
+    },
+    'send-daily-notification-digests': {
+        'task': 'communications.tasks.send_notification_digests',
+        'schedule': crontab(minute=0, hour=config('NOTIFICATION_DAILY_DIGEST_HOUR', default=8, cast=int)),
+        'args': ('daily',),
+    },
+    'purge-processed-outbox-events': {
+        'task': 'events.tasks.purge_processed_outbox_events',
+        'schedule': crontab(minute=30, hour=3),
+    },
+}
+
+# Transactional outbox: consumers receive each batch of pending events in order
+OUTBOX_CONSUMERS = [
+    'events.consumers.log_events',
+    'communications.notifications.enqueue_notifications',
+]
+OUTBOX_BATCH_SIZE = config('OUTBOX_BATCH_SIZE', default=200, cast=int)
+OUTBOX_MAX_BATCHES_PER_RUN = config('OUTBOX_MAX_BATCHES_PER_RUN', default=50, cast=int)
+OUTBOX_MAX_ATTEMPTS = config('OUTBOX_MAX_ATTEMPTS', default=5, cast=int)
+OUTBOX_RETENTION_DAYS = config('OUTBOX_RETENTION_DAYS', default=14, cast=int)
+
+# Booking lifecycle
+BOOKING_PENDING_TTL_HOURS = config('BOOKING_PENDING_TTL_HOURS', default=48, cast=int)
+BOOKING_EXPIRY_BATCH_SIZE = config('BOOKING_EXPIRY_BATCH_SIZE', default=500, cast=int)
+
+# Recurring expenses are materialized this many days ahead of today
+RECURRING_EXPENSE_HORIZON_DAYS = config('RECURRING_EXPENSE_HORIZON_DAYS', default=90, cast=int)
+RECURRING_EXPENSE_BATCH_SIZE = config('RECURRING_EXPENSE_BATCH_SIZE', default=1000, cast=int)
+
+# Bulk imports: rows per bulk_create, and uploads above this size run as a Celery task
+BULK_IMPORT_CHUNK_SIZE = config('BULK_IMPORT_CHUNK_SIZE', default=500, cast=int)
+BULK_IMPORT_ASYNC_THRESHOLD_BYTES = config('BULK_IMPORT_ASYNC_THRESHOLD_BYTES', default=1024 * 1024, cast=int)
+
+# Exports: rows fetched per server-side cursor round trip; XLSX files are kept
+# outside MEDIA_ROOT and deleted after the retention period
+EXPORT_CHUNK_SIZE = config('EXPORT_CHUNK_SIZE', default=2000, cast=int)
+EXPORT_ROOT = config('EXPORT_ROOT', default=str(BASE_DIR / 'exports'))
+EXPORT_RETENTION_HOURS = config('EXPORT_RETENTION_HOURS', default=24, cast=int)
+
+# BI extracts: month-partitioned Parquet (CSV when pyarrow is not installed), outside MEDIA_ROOT
+ANALYTICS_EXTRACT_ROOT = config('ANALYTICS_EXTRACT_ROOT', default=str(BASE_DIR / 'extracts'))
+ANALYTICS_EXTRACT_FORMAT = config('ANALYTICS_EXTRACT_FORMAT', default='parquet')
+ANALYTICS_EXTRACT_BATCH_SIZE = config('ANALYTICS_EXTRACT_BATCH_SIZE', default=5000, cast=int)
+# Re-read before the watermark to catch rows committed after the previous run
+ANALYTICS_EXTRACT_OVERLAP_MINUTES = config('ANALYTICS_EXTRACT_OVERLAP_MINUTES', default=10, cast=int)
+
 # Email Configuration
 EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.console.EmailBackend')
 EMAIL_HOST = config('EMAIL_HOST', default='smtp.gmail.com')
@@ -215,6 +317,64 @@ EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
 DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='noreply@propertree.com')
 
+# Notifications: rows per bulk insert, and the SPA base URL used for notification links
+NOTIFICATION_BATCH_SIZE = config('NOTIFICATION_BATCH_SIZE', default=500, cast=int)
+FRONTEND_URL = config('FRONTEND_URL', default='http://localhost:3000')
+
+# Realtime push: Redis pub/sub feeding the ASGI Server-Sent Events stream
+REALTIME_ENABLED = config('REALTIME_ENABLED', default=True, cast=bool)
+REALTIME_REDIS_URL = config('REALTIME_REDIS_URL', default=CELERY_BROKER_URL)
+REALTIME_CHANNEL_PREFIX = config('REALTIME_CHANNEL_PREFIX', default='propertree')
+SSE_KEEPALIVE_SECONDS = config('SSE_KEEPALIVE_SECONDS', default=15, cast=int)
+SSE_RETRY_MILLISECONDS = config('SSE_RETRY_MILLISECONDS', default=5000, cast=int)
+SSE_TICKET_TTL_SECONDS = config('SSE_TICKET_TTL_SECONDS', default=30, cast=int)
+# Origin of the ASGI service that serves the stream; empty means the API's own host
+REALTIME_STREAM_BASE_URL = config('REALTIME_STREAM_BASE_URL', default='')
+
+# Request instrumentation: per-request SQL count/time in Server-Timing and logs,
+# with a warning (and the most repeated statements) above QUERY_BUDGET queries
+QUERY_INSTRUMENTATION_ENABLED = config('QUERY_INSTRUMENTATION_ENABLED', default=True, cast=bool)
+QUERY_INSTRUMENTATION_SERVER_TIMING = config('QUERY_INSTRUMENTATION_SERVER_TIMING', default=True, cast=bool)
+QUERY_BUDGET = config('QUERY_BUDGET', default=50, cast=int)
+
+# Prometheus metrics at /metrics (propertree/metrics.py). Set PROMETHEUS_MULTIPROC_DIR
+# in the environment to aggregate all gunicorn and Celery worker processes.
+# With DEBUG off the endpoint answers 404 until METRICS_AUTH_TOKEN is set
+METRICS_ENABLED = config('METRICS_ENABLED', default=True, cast=bool)
+METRICS_AUTH_TOKEN = config('METRICS_AUTH_TOKEN', default='')
+METRICS_CELERY_QUEUES = config('METRICS_CELERY_QUEUES', default='celery', cast=lambda v: [s.strip() for s in v.split(',')])
+
+# Sampled tracing of requests, analytics, list serialization and Celery tasks
+# (propertree/tracing.py); the exporter is 'log' (propertree.tracing logger) or 'file' (OTLP/JSON lines)
+TRACING_SAMPLE_RATE = config('TRACING_SAMPLE_RATE', default=0.0, cast=float)
+TRACING_EXPORTER = config('TRACING_EXPORTER', default='log')
+TRACING_FILE = config('TRACING_FILE', default=str(BASE_DIR / 'traces' / 'traces.jsonl'))
+
+# On-demand profiling: ?__profile=1 (staff only) and manage.py profile_endpoint (propertree/profiling.py)
+PROFILING_ENABLED = config('PROFILING_ENABLED', default=True, cast=bool)
+PROFILING_SAMPLE_INTERVAL_MS = config('PROFILING_SAMPLE_INTERVAL_MS', default=1.0, cast=float)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'root': {
+        'handlers': ['console'],
+        'level': 'WARNING',
+    },
+    'loggers': {
+        'propertree': {
+            'handlers': ['console'],
+            'level': config('LOG_LEVEL', default='INFO'),
+            'propagate': False,
+        },
+    },
+}
+
 # Security settings for production
 if not DEBUG:
     SECURE_SSL_REDIRECT = True
@@ -0,0 +1,161 @@
+"""
+Representative dataset for endpoint query budget tests.
+
+build_dataset() creates one tenant, landlord and admin with a small portfolio
+and names the objects the budgeted URLs point at; grow_dataset() adds more rows
+of every kind for the same users so tests can check that query counts do not
+depend on how many rows a page or a portfolio holds.
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+
+from bookings.models import Booking
+from communications.models import Message, Notification
+from maintenance.models import (
+    MaintenanceRequest,
+    MaintenanceSchedule,
+    ServiceCatalog,
+    ServiceProvider,
+)
+from properties.models import Favorite, Property, PropertyExpense
+from users.models import AdminProfile, CustomUser, Profile
+
+
+def create_user(email, role):
+    """Create an active user with the profile their role expects."""
+    user = CustomUser.objects.create_user(email=email, password='budget-pass-123', role=role, is_verified=True)
+    first_name, last_name = email.split('@')[0].split('.', 1)
+    if role == 'admin':
+        AdminProfile.objects.create(user=user, first_name=first_name, last_name=last_name)
+    else:
+        Profile.objects.create(user=user, first_name=first_name, last_name=last_name)
+    return user
+
+
+def _create_property(landlord, index):
+    return Property.objects.create(
+        landlord=landlord,
+        title=f'Budget Flat {index}',
+        description='Two bedroom flat near the station.',
+        property_type='apartment',
+        address=f'{index} Budget Street',
+        city='Lisbon',
+        state='Lisbon',
+        country='Portugal',
+        postal_code='1000-001',
+        bedrooms=2,
+        bathrooms=Decimal('1.0'),
+        max_guests=4,
+        price_per_night=Decimal('80.00'),
+        amenities=['wifi', 'kitchen'],
+        photos=[f'https://example.com/photos/{index}.jpg'],
+        status='approved',
+        # Alternate approval types so both the landlord and the admin booking flows have rows
+        approval_type='admin' if index % 2 == 0 else 'landlord',
+    )
+
+
+def _create_rows(data, start, count):
+    """Create `count` rows of every list-visible kind, numbered from `start`."""
+    tenant, landlord, admin = data['tenant'], data['landlord'], data['admin']
+    catalog, provider = data['catalog'], data['provider']
+    today = date.today()
+
+    for index in range(start, start + count):
+        rental = _create_property(landlord, index)
+        check_in = today + timedelta(days=10 * index)
+        for status in ('confirmed', 'pending'):
+            Booking.objects.create(
+                property=rental,
+                tenant=tenant,
+                check_in=check_in,
+                check_out=check_in + timedelta(days=3),
+                guests_count=2,
+                total_price=Decimal('240.00'),
+                status=status,
+            )
+            check_in += timedelta(days=4)
+        PropertyExpense.objects.create(
+            property=rental,
+            category='maintenance',
+            description=f'Boiler service {index}',
+            amount=Decimal('120.00'),
+            expense_date=today - timedelta(days=index),
+        )
+        Favorite.objects.create(user=tenant, property=rental)
+        MaintenanceRequest.objects.create(
+            rental_property=rental,
+            reported_by=tenant,
+            title=f'Leaking tap {index}',
+            description='The kitchen tap leaks when turned off.',
+            category='plumbing',
+        )
+        MaintenanceRequest.objects.create(
+            rental_property=rental,
+            reported_by=landlord,
+            title=f'Deep clean {index}',
+            description='End of season deep clean.',
+            category='cleaning',
+            service_catalog=catalog,
+            requested_date=today + timedelta(days=index),
+        )
+        MaintenanceSchedule.objects.create(
+            rental_property=rental,
+            service_provider=provider,
+            title=f'Gutter check {index}',
+            description='Clear gutters before winter.',
+            frequency='annual',
+            next_due_date=today + timedelta(days=30 + index),
+        )
+        Message.objects.create(sender=tenant, recipient=landlord, message_text=f'Is the flat free in May? ({index})')
+        Message.objects.create(sender=landlord, recipient=tenant, message_text=f'Yes, from the 3rd. ({index})')
+        for user in (tenant, landlord, admin):
+            Notification.objects.create(
+                user=user,
+                notification_type='system',
+                title=f'Notice {index}',
+                message='Scheduled maintenance tonight.',
+            )
+        data['properties'].append(rental)
+
+
+def build_dataset(rows=2):
+    """Create the base users, catalog and `rows` rows of everything; return the named objects."""
+    data = {
+        'tenant': create_user('tina.tenant@example.com', 'tenant'),
+        'landlord': create_user('larry.landlord@example.com', 'landlord'),
+        'admin': create_user('ada.admin@example.com', 'admin'),
+        'properties': [],
+    }
+    data['catalog'] = ServiceCatalog.objects.create(
+        name='Deep Clean',
+        category='cleaning',
+        description='Full property clean.',
+        price=Decimal('90.00'),
+        estimated_duration_minutes=180,
+    )
+    data['provider'] = ServiceProvider.objects.create(
+        name='Sparkle Ltd',
+        email='jobs@sparkle.example.com',
+        phone='+351000000000',
+        service_type='cleaner',
+    )
+    _create_rows(data, 1, rows)
+
+    tenant = data['tenant']
+    data['property'] = data['properties'][0]
+    data['booking'] = Booking.objects.filter(tenant=tenant).order_by('check_in').first()
+    data['admin_booking'] = Booking.objects.filter(property__approval_type='admin').first()
+    data['expense'] = PropertyExpense.objects.filter(property=data['property']).first()
+    data['favorite'] = Favorite.objects.filter(user=tenant).first()
+    data['maintenance_request'] = MaintenanceRequest.objects.filter(service_catalog__isnull=True).first()
+    data['service_booking'] = MaintenanceRequest.objects.filter(service_catalog__isnull=False).first()
+    data['message'] = Message.objects.filter(recipient=tenant).first()
+    data['conversation'] = data['message'].conversation
+    data['notification'] = Notification.objects.filter(user=tenant).first()
+    return data
+
+
+def grow_dataset(data, rows):
+    """Add `rows` more rows of everything for the same users."""
+    _create_rows(data, len(data['properties']) + 1, rows)
@@ -0,0 +1,71 @@
+"""
+Tests for the endpoint benchmark runner and baseline comparison.
+"""
+import json
+import os
+from io import StringIO
+from tempfile import TemporaryDirectory
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from propertree.benchmarks import BENCHMARKS, compare_results
+from users.models import CustomUser
+
+
+def _run(**metrics):
+    return {'results': {'property_detail': {'p50_ms': 10.0, 'p95_ms': 20.0, 'queries': 4, 'bytes': 1000, **metrics}}}
+
+
+class CompareResultsTests(TestCase):
+
+    def test_small_changes_are_not_regressions(self):
+        self.assertEqual(compare_results(_run(p50_ms=11.5, p95_ms=20.9, bytes=1100), _run()), [])
+
+    def test_latency_within_noise_floor_is_not_a_regression(self):
+        baseline = _run(p50_ms=1.0)
+        self.assertEqual(compare_results(_run(p50_ms=1.9), baseline), [])
+
+    def test_regressions_are_reported_per_metric(self):
+        regressions = compare_results(_run(p95_ms=30.0, queries=5, bytes=2000), _run())
+        self.assertEqual(
+            [(regression['metric'], regression['baseline'], regression['current']) for regression in regressions],
+            [('p95_ms', 20.0, 30.0), ('queries', 4, 5), ('bytes', 1000, 2000)]
+        )
+        self.assertEqual(regressions[0]['change'], 0.5)
+
+    def test_benchmarks_missing_from_baseline_are_ignored(self):
+        self.assertEqual(compare_results(_run(queries=50), {'results': {}}), [])
+
+
+class BenchmarkCommandTests(TestCase):
+
+    def test_run_writes_results_and_flags_regressions(self):
+        call_command(
+            'seed_scale', landlords=1, properties_per=3, bookings_per=4, years=1, tenants=3, stdout=StringIO()
+        )
+        CustomUser.objects.create_user(email='bench.admin@example.com', password='bench-pass-123', role='admin')
+
+        with TemporaryDirectory() as directory:
+            output = os.path.join(directory, 'run.json')
+            call_command('benchmark_endpoints', iterations=2, warmup=0, output=output, stdout=StringIO())
+            with open(output) as output_file:
+                run = json.load(output_file)
+
+            self.assertEqual(set(run['results']), set(BENCHMARKS))
+            for name, result in run['results'].items():
+                self.assertLess(result['status'], 400, name)
+                self.assertGreater(result['queries'], 0, name)
+                self.assertLessEqual(result['p50_ms'], result['p95_ms'], name)
+
+            # A baseline that ran fewer queries makes the next run fail
+            run['results']['property_detail']['queries'] -= 1
+            baseline = os.path.join(directory, 'baseline.json')
+            with open(baseline, 'w') as baseline_file:
+                json.dump(run, baseline_file)
+            with self.assertRaises(CommandError):
+                call_command(
+                    'benchmark_endpoints', only=['property_detail'], iterations=1, warmup=0,
+                    baseline=baseline, stdout=StringIO()
+                )
@@ -0,0 +1,40 @@
+"""
+Tests for the database diagnostics report (status counts run on any database).
+"""
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from bookings.models import Booking
+from propertree.db_health import collect_report
+
+from .dataset import build_dataset
+
+
+class DbHealthTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = build_dataset()
+
+    def test_status_counts_flag_old_final_rows_as_archivable(self):
+        old = timezone.localdate() - timedelta(days=400)
+        Booking.objects.filter(pk=self.data['booking'].pk).update(status='completed', check_in=old, check_out=old + timedelta(days=2))
+
+        counts = {row['status']: row for row in collect_report()['status_counts']['bookings.Booking']}
+
+        self.assertEqual(sum(row['rows'] for row in counts.values()), Booking.objects.count())
+        self.assertEqual(counts['completed']['archivable'], 1)
+        self.assertEqual(counts['completed']['oldest'], old + timedelta(days=2))
+        self.assertTrue(all(row['archivable'] == 0 for status, row in counts.items() if status != 'completed'))
+
+    def test_command_prints_report(self):
+        output = StringIO()
+        call_command('db_health', stdout=output)
+        self.assertIn('Rows per status', output.getvalue())
+        if connection.vendor == 'postgresql':
+            self.assertIn('Largest tables', output.getvalue())
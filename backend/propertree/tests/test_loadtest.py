@@ -0,0 +1,75 @@
+"""
+Tests for the load test statistics and the double booking check.
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from bookings.models import Booking
+from properties.management.commands.load_test import find_double_bookings
+from propertree.loadtest import LoadStats
+
+from .dataset import build_dataset
+
+
+class LoadStatsTests(SimpleTestCase):
+
+    def test_expected_4xx_are_rejections_and_the_rest_errors(self):
+        stats = LoadStats()
+        stats.record('tenant.book', 201, 40.0, expected=(400, 409))
+        stats.record('tenant.book', 400, 20.0, expected=(400, 409))
+        stats.record('tenant.book', 409, 30.0, expected=(400, 409))
+        stats.record('tenant.book', 403, 10.0, expected=(400, 409))
+        stats.record('tenant.book', 500, 900.0, expected=(400, 409))
+        stats.record('tenant.book', None, 3000.0, expected=(400, 409))
+        stats.record('tenant.search', 200, 5.0)
+
+        summary = stats.summary(duration=2.0)
+
+        book = summary['operations']['tenant.book']
+        self.assertEqual((book['requests'], book['rejected'], book['errors']), (6, 2, 3))
+        self.assertEqual(book['statuses'], {'201': 1, '400': 1, '403': 1, '409': 1, '500': 1, 'transport_error': 1})
+        self.assertEqual(book['max_ms'], 3000.0)
+        self.assertEqual((summary['requests'], summary['errors'], summary['rejected']), (7, 3, 2))
+        self.assertEqual(summary['throughput_rps'], 3.5)
+        self.assertEqual(summary['error_rate'], round(3 / 7, 4))
+        self.assertEqual(dict(summary['histogram'])['<=10ms'], 2)
+        self.assertEqual(dict(summary['histogram'])['>5000ms'], 0)
+
+    def test_empty_run(self):
+        summary = LoadStats().summary(duration=0)
+        self.assertEqual((summary['requests'], summary['throughput_rps'], summary['error_rate']), (0, 0, 0))
+
+
+class FindDoubleBookingsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = build_dataset(rows=1)
+
+    def book(self, check_in, nights, status='pending'):
+        return Booking.objects.create(
+            property=self.data['property'],
+            tenant=self.data['tenant'],
+            check_in=check_in,
+            check_out=check_in + timedelta(days=nights),
+            guests_count=1,
+            total_price=Decimal('100.00') * nights,
+            status=status,
+        )
+
+    def test_reports_overlapping_active_bookings_only(self):
+        started_at = timezone.now()
+        check_in = date.today() + timedelta(days=400)
+        first = self.book(check_in, 3, status='confirmed')
+        second = self.book(check_in + timedelta(days=2), 3)
+        # Back to back with the second, and overlapping only a cancelled one
+        self.book(check_in + timedelta(days=5), 2)
+        self.book(check_in + timedelta(days=20), 2, status='cancelled')
+        self.book(check_in + timedelta(days=21), 2)
+
+        self.assertEqual(list(find_double_bookings(started_at)), [first, second])
+        # Only bookings created during the run are reported
+        self.assertEqual(list(find_double_bookings(timezone.now())), [])
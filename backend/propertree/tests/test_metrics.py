@@ -0,0 +1,93 @@
+"""
+Tests for the Prometheus metrics middleware and /metrics endpoint.
+"""
+import os
+import subprocess
+import sys
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+
+from django.test import TestCase, override_settings
+from prometheus_client import REGISTRY
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .dataset import build_dataset
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class MetricsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = build_dataset()
+
+    def test_requests_are_counted_and_timed_per_route(self):
+        labels = {'method': 'GET', 'route': 'api/properties/<uuid:pk>/'}
+        before = sample('propertree_requests_total', status='200', **labels)
+        queries_before = sample('propertree_request_queries_count', **labels)
+
+        response = self.client.get(f'/api/properties/{self.data["property"].pk}/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sample('propertree_requests_total', status='200', **labels), before + 1)
+        self.assertEqual(sample('propertree_request_queries_count', **labels), queries_before + 1)
+        self.assertGreater(sample('propertree_request_queries_sum', **labels), 0)
+
+    def test_booking_conflicts_are_counted(self):
+        booking = self.data['booking']
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.data["tenant"])}')
+        before = sample('propertree_booking_conflicts_total')
+
+        response = client.post('/api/bookings/create/', {
+            'property': str(booking.property_id),
+            'check_in': booking.check_in.isoformat(),
+            'check_out': (booking.check_in + timedelta(days=1)).isoformat(),
+            'guests_count': 1,
+        }, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(sample('propertree_booking_conflicts_total'), before + 1)
+
+    @override_settings(METRICS_AUTH_TOKEN='scrape-secret')
+    def test_metrics_endpoint_serves_prometheus_text(self):
+        self.client.get('/')
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer scrape-secret')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        self.assertIn(b'propertree_requests_total{method="GET",route="",status="200"}', response.content)
+
+    @override_settings(METRICS_AUTH_TOKEN='scrape-secret')
+    def test_metrics_endpoint_requires_token_when_configured(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 401)
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer scrape-secret')
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(METRICS_ENABLED=False)
+    def test_metrics_endpoint_is_hidden_when_disabled(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 404)
+
+    @override_settings(METRICS_AUTH_TOKEN='', DEBUG=False)
+    def test_metrics_endpoint_is_hidden_without_token_in_production(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 404)
+
+    @override_settings(METRICS_AUTH_TOKEN='', DEBUG=True)
+    def test_metrics_endpoint_is_open_without_token_in_debug(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 200)
+
+    def test_multiprocess_directory_is_created_on_import(self):
+        # A Celery worker or manage.py command can be the first process to start
+        with tempfile.TemporaryDirectory() as root:
+            metrics_dir = Path(root) / 'metrics'
+            env = {**os.environ, 'PROMETHEUS_MULTIPROC_DIR': str(metrics_dir)}
+            result = subprocess.run(
+                [sys.executable, '-c', 'import propertree.metrics'],
+                cwd=Path(__file__).resolve().parents[2], env=env, capture_output=True, text=True,
+            )
+            self.assertEqual(result.returncode, 0, result.stderr)
+            self.assertTrue(metrics_dir.is_dir())
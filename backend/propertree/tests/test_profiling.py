@@ -0,0 +1,72 @@
+"""
+Tests for ?__profile=1 and manage.py profile_endpoint.
+"""
+import json
+import os
+from io import StringIO
+from tempfile import TemporaryDirectory
+
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .dataset import build_dataset
+
+
+def auth(user):
+    return {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(user)}'}
+
+
+class ProfileParameterTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = build_dataset()
+        cls.data['admin'].is_staff = True
+        cls.data['admin'].save(update_fields=['is_staff'])
+
+    def test_staff_get_collapsed_stacks_and_sql(self):
+        response = self.client.get('/api/properties/?__profile=1', **auth(self.data['admin']))
+
+        self.assertEqual(response.status_code, 200)
+        profile = response.json()
+        self.assertEqual(profile['status'], 200)
+        self.assertEqual(profile['profiler'], 'sample')
+        self.assertEqual(profile['query_count'], len(profile['queries']))
+        self.assertTrue(any('FROM "properties"' in query['sql'] for query in profile['queries']))
+        for line in filter(None, profile['output'].splitlines()):
+            stack, count = line.rsplit(' ', 1)
+            self.assertTrue(int(count) > 0 and stack)
+
+    def test_staff_can_choose_cprofile(self):
+        response = self.client.get('/api/properties/?__profile=cprofile', **auth(self.data['admin']))
+        profile = response.json()
+        self.assertEqual(profile['profiler'], 'cprofile')
+        self.assertIn('cumulative', profile['output'])
+
+    def test_parameter_is_ignored_for_other_users(self):
+        for headers in ({}, auth(self.data['landlord'])):
+            response = self.client.get('/api/properties/?__profile=1', **headers)
+            self.assertEqual(response.status_code, 200)
+            self.assertIn('results', response.json())
+
+
+class ProfileEndpointCommandTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = build_dataset()
+
+    def test_command_writes_profile_and_sql(self):
+        with TemporaryDirectory() as directory:
+            call_command(
+                'profile_endpoint', '/api/analytics/landlord/dashboard/',
+                '--as', self.data['landlord'].email, '--output-dir', directory, stdout=StringIO()
+            )
+            files = sorted(os.listdir(directory))
+            self.assertEqual([name.rsplit('-', 1)[1] for name in files], ['sample.collapsed', 'sample.sql.json'])
+            with open(os.path.join(directory, files[1])) as sql_file:
+                report = json.load(sql_file)
+
+        self.assertGreater(report['query_count'], 0)
+        self.assertEqual(len(report['queries']), report['query_count'])
@@ -0,0 +1,177 @@
+"""
+Query budget assertions for every GET endpoint.
+
+Each API route is requested as every role listed for it in query_budgets.json,
+first against the base dataset and then after grow_dataset() has added more rows
+for the same users. A request fails the test when it runs more queries than its
+budget, or when its query count grows with the data (an N+1). Routes with a known
+N+1 are listed under "known_growth" and fail once the growth is gone, so the entry
+gets removed together with the fix.
+
+Run with:
+    python manage.py test propertree.tests
+
+Regenerate the budgets after an intended change with:
+    UPDATE_QUERY_BUDGETS=1 python manage.py test propertree.tests
+"""
+import json
+import os
+import re
+from pathlib import Path
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver, get_resolver
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .dataset import build_dataset, grow_dataset
+
+
+BUDGETS_PATH = Path(__file__).with_name('query_budgets.json')
+
+# Rows of everything in the base dataset and added by grow_dataset(); the total
+# stays under the default page size so larger pages show up as growth
+BASE_ROWS = 2
+GROWTH_ROWS = 3
+
+# Router routes are regexes; turn them into the same form as path() routes
+ROUTER_CONVERTER = re.compile(r'\(\?P<(\w+)>[^)]*\)')
+
+
+def normalize_route(route):
+    """Return a router regex route in path() form, e.g. 'service-catalog/<pk>/'."""
+    return ROUTER_CONVERTER.sub(r'<\1>', route.replace('^', '').replace('$', ''))
+
+
+def iter_routes(patterns, prefix=''):
+    """Yield (route, callback) for every URL pattern below `patterns`."""
+    for pattern in patterns:
+        route = prefix + str(pattern.pattern)
+        if isinstance(pattern, URLResolver):
+            yield from iter_routes(pattern.url_patterns, route)
+        else:
+            yield route, pattern.callback
+
+
+def accepts_get(callback):
+    """Return True if a view callback answers GET requests."""
+    actions = getattr(callback, 'actions', None)
+    if actions is not None:
+        return 'get' in actions
+    view_class = getattr(callback, 'cls', None) or getattr(callback, 'view_class', None)
+    if view_class is not None:
+        return hasattr(view_class, 'get')
+    # Plain function views
+    return True
+
+
+def get_api_routes():
+    """Return the normalized routes of all GET endpoints, in URLconf order."""
+    routes = []
+    for route, callback in iter_routes(get_resolver().url_patterns):
+        # Format suffix variants of router routes share their view with the plain route
+        if '(?P<format>' in route:
+            continue
+        route = normalize_route(route)
+        if route != '' and not route.startswith('api/'):
+            continue
+        if accepts_get(callback) and route not in routes:
+            routes.append(route)
+    return routes
+
+
+def load_budgets():
+    with open(BUDGETS_PATH) as budgets_file:
+        return json.load(budgets_file)
+
+
+class QueryBudgetTests(TestCase):
+    """Checks every GET endpoint against its checked-in query budget."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.budgets = load_budgets()
+
+    def build_url(self, route, spec, data):
+        """Fill in the route's converters from the dataset objects named in `spec`."""
+        values = dict(spec.get('kwargs', {}))
+        for name, key in spec.get('objects', {}).items():
+            values[name] = str(data[key].pk)
+        url = '/' + re.sub(r'<(?:\w+:)?(\w+)>', lambda match: values[match.group(1)], route)
+        return url
+
+    def measure(self, url, query, user):
+        """Return (status code, query count) for one GET request as `user`."""
+        client = APIClient(raise_request_exception=False)
+        if user is not None:
+            client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+        # Start every request cold so cached responses cannot hide queries
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url, query)
+            if response.streaming:
+                b''.join(response.streaming_content)
+        return response.status_code, len(queries)
+
+    def measure_all(self, data):
+        """Return {(route, role): (status code, query count)} for every budgeted request."""
+        results = {}
+        for route, spec in self.budgets['endpoints'].items():
+            if spec.get('vendor', connection.vendor) != connection.vendor:
+                continue
+            url = self.build_url(route, spec, data)
+            for role in spec['roles']:
+                user = None if role == 'anonymous' else data[role]
+                results[route, role] = self.measure(url, spec.get('query', {}), user)
+        return results
+
+    def test_every_get_endpoint_is_budgeted(self):
+        routes = get_api_routes()
+        covered = set(self.budgets['endpoints']) | set(self.budgets['skip'])
+        self.assertEqual([route for route in routes if route not in covered], [], 'GET endpoints without a query budget')
+        self.assertEqual(sorted(covered - set(routes)), [], 'Budget entries for routes that no longer exist')
+        self.assertEqual(
+            sorted(set(self.budgets['known_growth']) - set(self.budgets['endpoints'])), [],
+            'known_growth entries without a budget'
+        )
+
+    def test_query_budgets(self):
+        data = build_dataset(BASE_ROWS)
+        small = self.measure_all(data)
+        grow_dataset(data, GROWTH_ROWS)
+        large = self.measure_all(data)
+
+        if os.environ.get('UPDATE_QUERY_BUDGETS'):
+            for (route, role), (_, count) in large.items():
+                self.budgets['endpoints'][route]['roles'][role] = max(count, small[route, role][1])
+            with open(BUDGETS_PATH, 'w') as budgets_file:
+                json.dump(self.budgets, budgets_file, indent=2)
+                budgets_file.write('\n')
+
+        for (route, role), (status_code, count) in large.items():
+            small_count = small[route, role][1]
+            budget = self.budgets['endpoints'][route]['roles'][role]
+            with self.subTest(route=route, role=role):
+                self.assertLess(status_code, 400, f'GET /{route} as {role} returned {status_code}')
+                self.assertLessEqual(max(count, small_count), budget, f'GET /{route} as {role} is over budget')
+                if route in self.budgets['known_growth']:
+                    continue
+                # Counts may drop once first-request work is done (lazy counters, read receipts)
+                self.assertLessEqual(
+                    count, small_count,
+                    f'GET /{route} as {role} went from {small_count} to {count} queries as the data grew'
+                )
+
+        for route in self.budgets['known_growth']:
+            counts = [
+                (small[route, role][1], large[route, role][1])
+                for role in self.budgets['endpoints'][route]['roles'] if (route, role) in large
+            ]
+            with self.subTest(route=route, known_growth=True):
+                self.assertTrue(
+                    not counts or any(after > before for before, after in counts),
+                    f'GET /{route} no longer grows with the data; remove it from known_growth'
+                )
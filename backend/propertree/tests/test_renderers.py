@@ -0,0 +1,67 @@
+"""
+Tests that the orjson renderer and parser match DRF's stdlib JSON ones.
+"""
+import io
+import uuid
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from unittest import skipIf
+
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict
+
+try:
+    from propertree.renderers import ORJSONParser, ORJSONRenderer
+except ImportError:
+    ORJSONRenderer = None
+
+
+@skipIf(ORJSONRenderer is None, 'orjson is not installed')
+class ORJSONRendererTests(SimpleTestCase):
+
+    def assertSameJSON(self, data, accepted_media_type=None):
+        expected = JSONRenderer().render(data, accepted_media_type)
+        rendered = ORJSONRenderer().render(data, accepted_media_type)
+        self.assertEqual(JSONParser().parse(io.BytesIO(rendered)), JSONParser().parse(io.BytesIO(expected)))
+        return rendered
+
+    def test_types_render_like_drf(self):
+        rendered = self.assertSameJSON(ReturnDict({
+            'id': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+            'price': Decimal('1234.50'),
+            'check_in': date(2026, 5, 1),
+            'created_at': datetime(2026, 5, 1, 12, 30, 15, 123456, tzinfo=dt_timezone.utc),
+            'local_time': datetime(2026, 5, 1, 12, 30, tzinfo=dt_timezone(timedelta(hours=2))),
+            'naive': datetime(2026, 5, 1, 12, 30),
+            'opens_at': time(9, 30),
+            'duration': timedelta(hours=1, seconds=5),
+            'label': gettext_lazy('Pending'),
+            'by_month': {1: Decimal('10'), 2: None},
+            'note': 'line\u2028break',
+            'rows': [{'a': 1}, ('b', 2)],
+        }, serializer=None))
+
+        self.assertIn(b'"created_at":"2026-05-01T12:30:15.123456Z"', rendered)
+        self.assertIn(b'"local_time":"2026-05-01T12:30:00+02:00"', rendered)
+        self.assertIn(b'"price":1234.5', rendered)
+        self.assertIn(b'line\\u2028break', rendered)
+
+    def test_none_renders_empty_body(self):
+        self.assertEqual(ORJSONRenderer().render(None), b'')
+
+    def test_indent_in_accept_header_pretty_prints(self):
+        rendered = self.assertSameJSON({'a': [1]}, 'application/json; indent=4')
+        self.assertEqual(rendered, b'{\n  "a": [\n    1\n  ]\n}')
+
+    def test_parser_matches_drf(self):
+        body = b'{"property": "12345678-1234-5678-1234-567812345678", "guests_count": 2, "note": "\xc3\xa9"}'
+        self.assertEqual(ORJSONParser().parse(io.BytesIO(body)), JSONParser().parse(io.BytesIO(body)))
+
+    def test_parser_rejects_invalid_json_and_nan(self):
+        for body in (b'{"a": ', b'{"a": NaN}', b''):
+            with self.assertRaises(ParseError):
+                ORJSONParser().parse(io.BytesIO(body))
@@ -0,0 +1,86 @@
+"""
+Tests for sampled tracing and its exporters.
+"""
+import json
+import os
+from tempfile import TemporaryDirectory
+
+from django.test import TestCase, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from bookings.tasks import complete_past_bookings
+from propertree.tracing import span
+
+from .dataset import build_dataset
+
+
+def logged_traces(logs):
+    return [json.loads(record.getMessage()) for record in logs.records]
+
+
+@override_settings(TRACING_SAMPLE_RATE=1.0, TRACING_EXPORTER='log')
+class TracingTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = build_dataset()
+
+    def test_dashboard_trace_has_a_span_per_analytics_call(self):
+        token = AccessToken.for_user(self.data['landlord'])
+        with self.assertLogs('propertree.tracing', 'INFO') as logs:
+            response = self.client.get('/api/analytics/landlord/dashboard/', HTTP_AUTHORIZATION=f'Bearer {token}')
+
+        self.assertEqual(response.status_code, 200)
+        [trace] = logged_traces(logs)
+        root = trace['spans'][0]
+        self.assertEqual(trace['name'], 'GET api/analytics/landlord/dashboard/')
+        self.assertIsNone(root['parent_id'])
+        self.assertEqual(root['attributes']['http.status_code'], 200)
+
+        occupancy = next(item for item in trace['spans'] if item['name'] == 'LandlordAnalytics.get_occupancy_rate')
+        self.assertEqual(occupancy['parent_id'], root['span_id'])
+        self.assertGreater(occupancy['queries'], 0)
+        self.assertLessEqual(occupancy['queries'], root['queries'])
+
+    def test_list_serialization_is_a_span(self):
+        with self.assertLogs('propertree.tracing', 'INFO') as logs:
+            self.client.get('/api/properties/')
+
+        [trace] = logged_traces(logs)
+        serialize = next(item for item in trace['spans'] if item['name'] == 'serialize PropertyListSerializer')
+        self.assertEqual(serialize['attributes']['items'], len(self.data['properties']))
+
+    def test_celery_tasks_are_traced(self):
+        with self.assertLogs('propertree.tracing', 'INFO') as logs:
+            complete_past_bookings.apply()
+
+        [trace] = logged_traces(logs)
+        self.assertEqual(trace['name'], 'celery bookings.tasks.complete_past_bookings')
+        self.assertEqual(trace['spans'][0]['attributes']['celery.state'], 'SUCCESS')
+
+    @override_settings(TRACING_SAMPLE_RATE=0.0)
+    def test_unsampled_traces_are_not_exported(self):
+        with self.assertNoLogs('propertree.tracing', 'INFO'):
+            self.client.get('/api/properties/')
+            with span('outside a request'):
+                pass
+
+    def test_file_exporter_writes_otlp_json_lines(self):
+        with TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'traces.jsonl')
+            with override_settings(TRACING_EXPORTER='file', TRACING_FILE=path):
+                with span('parent', {'rows': 3}):
+                    with span('child'):
+                        pass
+                self.client.get('/')
+
+            with open(path) as trace_file:
+                lines = [json.loads(line) for line in trace_file]
+
+        self.assertEqual(len(lines), 2)
+        [child, parent] = lines[0]['resourceSpans'][0]['scopeSpans'][0]['spans']
+        self.assertEqual(child['traceId'], parent['traceId'])
+        self.assertEqual(child['parentSpanId'], parent['spanId'])
+        self.assertNotIn('parentSpanId', parent)
+        self.assertIn({'key': 'rows', 'value': {'intValue': '3'}}, parent['attributes'])
+        self.assertGreater(int(parent['endTimeUnixNano']), int(parent['startTimeUnixNano']))
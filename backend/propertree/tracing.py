@@ -0,0 +1,288 @@
+"""
+Sampled tracing of the request, analytics, serializer and Celery task hot paths.
+
+A trace starts at an outermost span: the request (TracingMiddleware), a Celery
+task, or any span opened outside of both. Whether it is recorded is decided
+once for the whole trace with TRACING_SAMPLE_RATE, so unsampled work only pays
+for a context variable lookup. Each recorded span keeps its wall time and the
+number and duration of the SQL queries run inside it (nested spans included).
+
+    with span('import rows', attributes={'rows': len(rows)}):
+        ...
+
+    @traced()
+    def get_occupancy_rate(self, ...):
+        ...
+
+When the outermost span ends, the trace is exported with TRACING_EXPORTER:
+- 'log': one compact JSON line per trace on the propertree.tracing logger;
+- 'file': one OTLP/JSON ExportTraceServiceRequest per line, appended to
+  TRACING_FILE, which OpenTelemetry collectors can read with the otlpjsonfile
+  receiver.
+"""
+import functools
+import json
+import logging
+import os
+import random
+import secrets
+import threading
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from celery.signals import task_postrun, task_prerun
+from django.conf import settings
+from django.db import connection
+from rest_framework import serializers
+
+from .middleware import QueryStats
+
+logger = logging.getLogger('propertree.tracing')
+
+SERVICE_NAME = 'propertree-backend'
+
+# OTLP span kinds
+KIND_INTERNAL = 1
+KIND_SERVER = 2
+KIND_CONSUMER = 5
+
+# Marks the context of an unsampled trace so nested spans are skipped too
+_UNSAMPLED = object()
+
+_current_span = ContextVar('propertree_current_span', default=None)
+
+
+class _Trace:
+    """The finished spans of one sampled trace."""
+
+    def __init__(self):
+        self.trace_id = secrets.token_hex(16)
+        self.spans = []
+
+
+class span:
+    """
+    Context manager recording one span of the current trace.
+    Outside of a trace it starts one, subject to TRACING_SAMPLE_RATE; inside an
+    unsampled trace it does nothing.
+    """
+
+    def __init__(self, name, attributes=None, kind=KIND_INTERNAL):
+        self.name = name
+        self.attributes = dict(attributes or {})
+        self.kind = kind
+        self.recording = False
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def __enter__(self):
+        parent = _current_span.get()
+        if parent is _UNSAMPLED:
+            return self
+        if parent is None:
+            if random.random() >= settings.TRACING_SAMPLE_RATE:
+                self._token = _current_span.set(_UNSAMPLED)
+                return self
+            self.trace, self.parent_id = _Trace(), None
+        else:
+            self.trace, self.parent_id = parent.trace, parent.span_id
+
+        self.recording = True
+        self.span_id = secrets.token_hex(8)
+        self.queries = QueryStats()
+        self._wrapper = connection.execute_wrapper(self.queries)
+        self._wrapper.__enter__()
+        self._token = _current_span.set(self)
+        self.start_ns = time.time_ns()
+        self._started = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if not hasattr(self, '_token'):
+            return False
+        _current_span.reset(self._token)
+        if not self.recording:
+            return False
+
+        duration_ns = time.perf_counter_ns() - self._started
+        self._wrapper.__exit__(exc_type, exc, tb)
+        self.trace.spans.append({
+            'name': self.name,
+            'kind': self.kind,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'start_ns': self.start_ns,
+            'end_ns': self.start_ns + duration_ns,
+            'queries': self.queries.count,
+            'sql_ns': int(self.queries.duration * 1e9),
+            'attributes': self.attributes,
+            'error': exc_type.__name__ if exc_type else None,
+        })
+        if self.parent_id is None:
+            export_trace(self.trace)
+        return False
+
+
+def traced(name=None, attributes=None):
+    """Decorator running the function in a span named after it (its qualified name by default)."""
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name, attributes):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class TracedListSerializer(serializers.ListSerializer):
+    """ListSerializer recording the serialization of each list in a span (Meta.list_serializer_class)."""
+
+    def to_representation(self, data):
+        with span(f'serialize {type(self.child).__name__}') as list_span:
+            representation = super().to_representation(data)
+            list_span.set_attribute('items', len(representation))
+        return representation
+
+
+class TracingMiddleware:
+    """Open the root span of each request."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        with span(request.method, {'http.method': request.method}, kind=KIND_SERVER) as request_span:
+            response = self.get_response(request)
+            match = request.resolver_match
+            if match:
+                # Named after the route rather than the path, so traces of one endpoint group together
+                request_span.name = f'{request.method} {match.route}'
+                request_span.set_attribute('http.route', match.route)
+            request_span.set_attribute('http.status_code', response.status_code)
+        return response
+
+    async def __acall__(self, request):
+        # The SSE stream's connections last for minutes and would never be exported
+        return await self.get_response(request)
+
+
+_task_spans = {}
+
+
+@task_prerun.connect
+def start_task_span(task_id=None, task=None, **kwargs):
+    task_span = span(f'celery {task.name}', {'celery.task_id': task_id}, kind=KIND_CONSUMER)
+    _task_spans[task_id] = task_span.__enter__()
+
+
+@task_postrun.connect
+def end_task_span(task_id=None, state=None, **kwargs):
+    task_span = _task_spans.pop(task_id, None)
+    if task_span is not None:
+        task_span.set_attribute('celery.state', state)
+        task_span.__exit__(None, None, None)
+
+
+def export_trace(trace):
+    """Send a finished trace to the configured exporter; tracing never fails the traced work."""
+    try:
+        if settings.TRACING_EXPORTER == 'file':
+            write_otlp_file(trace)
+        else:
+            log_trace(trace)
+    except Exception:
+        logger.exception('Could not export trace %s', trace.trace_id)
+
+
+def log_trace(trace):
+    """Log the trace as one compact JSON line, spans in start order."""
+    spans = sorted(trace.spans, key=lambda item: item['start_ns'])
+    root = spans[0]
+    logger.info(json.dumps({
+        'trace_id': trace.trace_id,
+        'name': root['name'],
+        'duration_ms': round((root['end_ns'] - root['start_ns']) / 1e6, 2),
+        'spans': [
+            {
+                'name': item['name'],
+                'span_id': item['span_id'],
+                'parent_id': item['parent_id'],
+                'offset_ms': round((item['start_ns'] - root['start_ns']) / 1e6, 2),
+                'duration_ms': round((item['end_ns'] - item['start_ns']) / 1e6, 2),
+                'queries': item['queries'],
+                'sql_ms': round(item['sql_ns'] / 1e6, 2),
+                **({'attributes': item['attributes']} if item['attributes'] else {}),
+                **({'error': item['error']} if item['error'] else {}),
+            }
+            for item in spans
+        ],
+    }, default=str))
+
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+def _otlp_attributes(attributes):
+    return [{'key': key, 'value': _otlp_value(value)} for key, value in attributes.items()]
+
+
+def to_otlp(trace):
+    """Return the trace as an OTLP/JSON ExportTraceServiceRequest."""
+    spans = []
+    for item in trace.spans:
+        otlp_span = {
+            'traceId': trace.trace_id,
+            'spanId': item['span_id'],
+            'name': item['name'],
+            'kind': item['kind'],
+            'startTimeUnixNano': str(item['start_ns']),
+            'endTimeUnixNano': str(item['end_ns']),
+            'attributes': _otlp_attributes({
+                **item['attributes'],
+                'db.query_count': item['queries'],
+                'db.duration_ms': round(item['sql_ns'] / 1e6, 3),
+            }),
+            # 2 is STATUS_CODE_ERROR
+            'status': {'code': 2, 'message': item['error']} if item['error'] else {},
+        }
+        if item['parent_id']:
+            otlp_span['parentSpanId'] = item['parent_id']
+        spans.append(otlp_span)
+    return {
+        'resourceSpans': [{
+            'resource': {'attributes': _otlp_attributes({'service.name': SERVICE_NAME})},
+            'scopeSpans': [{'scope': {'name': 'propertree.tracing'}, 'spans': spans}],
+        }],
+    }
+
+
+_file_lock = threading.Lock()
+
+
+def write_otlp_file(trace):
+    """Append the trace to TRACING_FILE as one line of OTLP/JSON."""
+    line = json.dumps(to_otlp(trace), separators=(',', ':'), default=str) + '\n'
+    path = settings.TRACING_FILE
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    # One write per trace in append mode keeps lines from concurrent workers whole
+    with _file_lock, open(path, 'a') as trace_file:
+        trace_file.write(line)
@@ -7,6 +7,7 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.http import JsonResponse
 from .admin_runner import create_superuser
+from .metrics import metrics_view
 
 def api_root(request):
     """Root endpoint with API information"""
@@ -20,18 +21,23 @@ def api_root(request):
             'bookings': '/api/bookings/',
             'maintenance': '/api/maintenance/',
             'analytics': '/api/analytics/',
+            'messages': '/api/messages/',
+            'events': '/api/events/stream/',
         }
     })
 
 urlpatterns = [
     path('', api_root, name='api-root'),
     path('admin/', admin.site.urls),
+    path('metrics', metrics_view, name='metrics'),  # Prometheus scrape target
     path('api/auth/', include('users.urls')),
     path('api/properties/', include('properties.urls')),
     path('api/admin/', include('properties.admin_urls')),  # Admin portal endpoints
     path('api/bookings/', include('bookings.urls')),
     path('api/maintenance/', include('maintenance.urls')),  # Maintenance & service bookings
     path('api/analytics/', include('analytics.urls')),  # Analytics endpoints
+    path('api/messages/', include('communications.urls')),  # Messages & notifications
+    path('api/events/', include('events.urls')),  # Realtime SSE stream (ASGI only)
     # Temporary admin endpoint (for free tier - no shell access)
     path('api/create-superuser/', create_superuser, name='create-superuser'),
 ]
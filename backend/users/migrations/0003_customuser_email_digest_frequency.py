@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-19 05:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_alter_profile_profile_photo'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='email_digest_frequency',
+            field=models.CharField(choices=[('immediate', 'Immediate'), ('hourly', 'Hourly digest'), ('daily', 'Daily digest')], default='immediate', help_text='Send notification emails one by one or as an hourly/daily digest', max_length=20),
+        ),
+    ]
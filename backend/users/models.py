@@ -43,6 +43,12 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
         ('admin', 'Admin'),
     ]
     
+    EMAIL_DIGEST_CHOICES = [
+        ('immediate', 'Immediate'),
+        ('hourly', 'Hourly digest'),
+        ('daily', 'Daily digest'),
+    ]
+    
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     email = models.EmailField(unique=True, max_length=255)
     role = models.CharField(max_length=20, choices=ROLE_CHOICES, default='tenant')
@@ -52,6 +58,14 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
     is_verified = models.BooleanField(default=False)
     is_staff = models.BooleanField(default=False)
     
+    # Notification preferences
+    email_digest_frequency = models.CharField(
+        max_length=20,
+        choices=EMAIL_DIGEST_CHOICES,
+        default='immediate',
+        help_text='Send notification emails one by one or as an hourly/daily digest'
+    )
+    
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -87,7 +87,7 @@ class UserDetailSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = CustomUser
-        fields = ['id', 'email', 'role', 'is_active', 'is_verified', 'profile', 'admin_profile', 'created_at']
+        fields = ['id', 'email', 'role', 'is_active', 'is_verified', 'email_digest_frequency', 'profile', 'admin_profile', 'created_at']
         read_only_fields = ['id', 'email', 'created_at']
 
 
@@ -99,7 +99,7 @@ class UserProfileUpdateSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = CustomUser
-        fields = ['email', 'profile', 'admin_profile']
+        fields = ['email', 'email_digest_frequency', 'profile', 'admin_profile']
         read_only_fields = ['email']
 
     def update(self, instance, validated_data):